@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Acesso e processamento do banco de dados *Bank Marketing* (UCI)."""
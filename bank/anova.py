@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""Teste F da ANOVA por estatísticas suficientes, em blocos.
+
+O F-value de `sklearn.feature_selection.f_classif` depende apenas, para
+cada característica e cada classe do alvo, do número de linhas, da soma e da
+soma dos quadrados dos valores. Esses momentos são acumulados bloco a bloco
+(`update`), somados entre blocos, partes do banco de dados ou processos
+(`merge`), ou obtidos das tabelas de contagem (característica, alvo) de
+`bank.stream` (`from_tables`), sem materializar a matriz das
+características. As características categóricas utilizam o código da
+categoria, como nas questões.
+
+Os momentos de todos os pares (característica, alvo) são empilhados em
+matrizes `(pares, classes)`, completadas com zeros, sobre as quais os
+F-values e os P-valores são calculados de uma vez (`test`), com as mesmas
+somas do Scikit-learn.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import crosstab
+
+
+# Alvos analisados por padrão
+TARGETS = ('y', 'default', 'housing', 'loan')
+
+
+def empty(features, targets, levels):
+    """Momentos nulos das características `features` para cada alvo de
+    `targets`.
+
+    `levels` associa a cada coluna categórica (características e alvos) as
+    suas categorias, que definem os códigos utilizados.
+    """
+    moments = OrderedDict()
+    for target in targets:
+        shape = (len(features), len(levels[target]))
+        moments[target] = OrderedDict([
+            ('count', np.zeros(shape, dtype=np.int64)),
+            ('sum', np.zeros(shape, dtype=np.float64)),
+            ('sumsq', np.zeros(shape, dtype=np.float64)),
+        ])
+    return OrderedDict([
+        ('features', list(features)),
+        ('targets', list(targets)),
+        ('levels', OrderedDict((col, list(lv)) for col, lv in levels.items())),
+        ('moments', moments),
+    ])
+
+
+def _codes(values, levels):
+    # Códigos das categorias `levels`, -1 para valores ausentes
+    codes, found = crosstab.factorize(values)
+    if list(found) != levels:
+        codes = pd.Categorical(values, categories=levels).codes
+    return np.asarray(codes, dtype=np.intp)
+
+
+def _values(acc, chunk):
+    # Matriz `(características, linhas)` dos valores de `chunk`
+    x = np.empty((len(acc['features']), len(chunk)), dtype=np.float64)
+    for i, feature in enumerate(acc['features']):
+        if feature in acc['levels']:
+            codes = _codes(chunk[feature], acc['levels'][feature])
+            x[i] = np.where(codes >= 0, codes, np.nan)
+        else:
+            x[i] = np.asarray(chunk[feature], dtype=np.float64)
+    return x
+
+
+def update(acc, chunk):
+    """Acumula em `acc` os momentos das linhas de `chunk`."""
+    x = _values(acc, chunk)
+    n_features = x.shape[0]
+    for target, moments in acc['moments'].items():
+        k = moments['count'].shape[1]
+        y = _codes(chunk[target], acc['levels'][target])
+        index = (np.arange(n_features, dtype=np.intp) * k)[:, None] + y
+        valid = (y >= 0) & ~np.isnan(x)
+        index, values = index[valid], x[valid]
+        size = n_features * k
+        moments['count'] += np.bincount(
+            index, minlength=size).reshape(n_features, k)
+        moments['sum'] += np.bincount(
+            index, weights=values, minlength=size).reshape(n_features, k)
+        moments['sumsq'] += np.bincount(
+            index, weights=values * values,
+            minlength=size).reshape(n_features, k)
+    return acc
+
+
+def build(chunks, features, targets=TARGETS, levels=None):
+    """Momentos das características `features` para cada alvo de `targets`,
+    acumulados sobre os blocos `chunks`.
+
+    Sem `levels`, as categorias são as das colunas categóricas do primeiro
+    bloco.
+    """
+    acc = None
+    for chunk in chunks:
+        if acc is None:
+            if levels is None:
+                levels = OrderedDict(
+                    (col, list(chunk[col].cat.categories))
+                    for col in list(features) + list(targets)
+                    if chunk[col].dtype.name == 'category')
+            acc = empty(features, targets, levels)
+        update(acc, chunk)
+    return acc
+
+
+def merge(a, b):
+    """Soma os momentos de `a` e `b`, com as mesmas características, alvos
+    e categorias.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a['features'] != b['features'] or a['targets'] != b['targets'] or \
+            a['levels'] != b['levels']:
+        raise ValueError('Momentos com colunas ou categorias diferentes')
+    result = empty(a['features'], a['targets'], a['levels'])
+    for target, moments in result['moments'].items():
+        for name in moments:
+            moments[name] = a['moments'][target][name] + \
+                b['moments'][target][name]
+    return result
+
+
+def from_tables(pairs, target):
+    """Momentos obtidos das tabelas de contagem (valor, classe) de cada
+    característica com `target`, `pairs` associa a característica à tabela.
+    """
+    tables = [table.unstack(fill_value=0) for table in pairs.values()]
+    classes = tables[0].columns if tables else []
+    levels = OrderedDict([(target, list(classes))])
+    acc = empty(list(pairs), [target], levels)
+    moments = acc['moments'][target]
+    for i, counts in enumerate(tables):
+        counts = counts.reindex(columns=classes, fill_value=0)
+        x = counts.index
+        x = x.values if x.dtype.kind in 'iuf' else np.arange(len(x))
+        x = x.astype(np.float64)[:, None]
+        counts = counts.values.astype(np.int64)
+        moments['count'][i] = counts.sum(axis=0)
+        moments['sum'][i] = (x * counts).sum(axis=0)
+        moments['sumsq'][i] = (x * x * counts).sum(axis=0)
+    return acc
+
+
+def statistic(count, sums, sumsq):
+    """F-value e graus de liberdade de cada linha das matrizes de momentos
+    `(pares, classes)`. As classes sem linhas são ignoradas.
+    """
+    present = np.asarray(count) > 0
+    k = present.sum(axis=1)
+    n = np.asarray(count).sum(axis=1)
+    count = np.asarray(count, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        square_all = sums.sum(axis=1) ** 2
+        sstot = sumsq.sum(axis=1) - square_all / n
+        ssbn = np.where(present, sums ** 2 / count, 0).sum(axis=1) - \
+            square_all / n
+        sswn = sstot - ssbn
+        dfbn, dfwn = k - 1, n - k
+        f = (ssbn / dfbn) / (sswn / dfwn)
+    return f, dfbn, dfwn
+
+
+def pvalue(f, dfbn, dfwn):
+    """P-valor da distribuição F, `nan` quando indefinido."""
+    from scipy.special import fdtrc
+
+    with np.errstate(invalid='ignore'):
+        valid = (dfbn > 0) & (dfwn > 0)
+        return np.where(valid, fdtrc(np.maximum(dfbn, 1),
+                                     np.maximum(dfwn, 1), f), np.nan)
+
+
+def _stack(acc):
+    # Matrizes `(pares, classes)` de todos os pares, completadas com zeros
+    pairs, stacks = [], OrderedDict((name, []) for name in
+                                    ('count', 'sum', 'sumsq'))
+    depth = max(len(acc['levels'][t]) for t in acc['targets'])
+    for target, moments in acc['moments'].items():
+        keep = [i for i, f in enumerate(acc['features']) if f != target]
+        pairs.extend((acc['features'][i], target) for i in keep)
+        for name, values in moments.items():
+            padded = np.zeros((len(keep), depth), dtype=values.dtype)
+            padded[:, :values.shape[1]] = values[keep]
+            stacks[name].append(padded)
+    stacks = [np.concatenate(s) if s else np.empty((0, depth))
+              for s in stacks.values()]
+    return pairs, stacks
+
+
+def test(acc, pvalues=True):
+    """F-value e P-valor de cada par (característica, alvo) de `acc`.
+
+    Os pares de uma coluna com ela mesma são ignorados. Retorna um DataFrame
+    na ordem dos alvos e das características.
+    """
+    pairs, (count, sums, sumsq) = _stack(acc)
+    f, dfbn, dfwn = statistic(count, sums, sumsq)
+    result = pd.DataFrame(pairs, columns=['feature', 'target'])
+    result['f'] = f
+    result['dof_between'] = dfbn
+    result['dof_within'] = dfwn
+    if pvalues:
+        result['p'] = pvalue(f, dfbn, dfwn)
+    return result
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Intervalos de confiança *bootstrap* calculados sobre contagens.
+
+Como as estatísticas das questões dependem apenas de quantas vezes cada
+valor ocorre em cada grupo, uma reamostragem com reposição das linhas de um
+grupo equivale a sortear um novo vetor de contagens de uma distribuição
+multinomial, com o número de linhas do grupo e as frequências observadas.
+Cada bloco de réplicas é uma matriz `(réplicas, valores)` sorteada de uma
+vez, sobre a qual as estatísticas são calculadas de forma vetorizada:
+
+* a média é um produto matricial com os valores;
+* os quantis são obtidos das somas acumuladas de cada linha, já que o
+  número de linhas de cada réplica é o mesmo do grupo;
+* os percentuais são somas das colunas selecionadas.
+
+Os blocos são independentes, com sementes derivadas de `seed`, e são
+distribuídos entre os processos de trabalho. O resultado depende apenas de
+`seed`, e não do número de processos.
+"""
+
+import multiprocessing
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Número de réplicas, réplicas por bloco e nível de significância padrão
+REPLICATES = 10000
+BLOCK = 200
+ALPHA = 0.05
+
+
+def resample(counts, size, rng):
+    """Sorteia `size` vetores de contagens com o mesmo total e as mesmas
+    frequências esperadas de `counts`. Retorna uma matriz `(size, len)`.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n = int(counts.sum())
+    return rng.multinomial(n, counts / n, size=size)
+
+
+def mean(values, samples):
+    """Média de cada réplica."""
+    samples = np.asarray(samples, dtype=np.float64)
+    return samples.dot(np.asarray(values, dtype=np.float64)) / \
+        samples.sum(axis=1)
+
+
+def _position(cum, k):
+    # Índice do valor na posição `k` (a partir de 0) de cada réplica
+    return (cum <= k).sum(axis=1)
+
+
+def median(values, samples):
+    """Mediana de cada réplica, a média dos dois valores centrais quando o
+    número de linhas é par.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    cum = np.cumsum(samples, axis=1)
+    n = int(cum[0, -1])
+    upper = values[_position(cum, n // 2)]
+    if n % 2:
+        return upper
+    return (values[_position(cum, n // 2 - 1)] + upper) / 2
+
+
+def share(values, samples, lim, strict=True, above=True):
+    """Fração das linhas de cada réplica com valor acima de `lim` (ou
+    abaixo, com `above=False`). `lim` pode ser um valor por réplica.
+    """
+    values = np.asarray(values, dtype=np.float64)[None, :]
+    lim = np.asarray(lim, dtype=np.float64).reshape(-1, 1)
+    if above:
+        mask = values > lim if strict else values >= lim
+    else:
+        mask = values < lim if strict else values <= lim
+    samples = np.asarray(samples)
+    return (samples * mask).sum(axis=1) / samples.sum(axis=1)
+
+
+def _block(args):
+    # Um bloco de réplicas de todos os grupos e as suas estatísticas
+    groups, statistic, size, seed = args
+    rng = np.random.RandomState(seed)
+    samples = [resample(counts, size, rng) for _, counts in groups]
+    return statistic([values for values, _ in groups], samples)
+
+
+def replicate(groups, statistic, replicates=REPLICATES, seed=0, jobs=1):
+    """Calcula `statistic` sobre `replicates` reamostragens dos grupos.
+
+    `groups` é uma lista de `(valores, contagens)`, e `statistic` uma função
+    (definida em um módulo, para ser enviada aos processos) que recebe a
+    lista dos valores e a lista das matrizes de contagens reamostradas de
+    cada grupo e retorna um dicionário com um array por estatística.
+    Retorna um dicionário com as `replicates` réplicas de cada estatística.
+    """
+    groups = [(np.asarray(values), np.asarray(counts))
+              for values, counts in groups]
+    tasks = [(groups, statistic, min(BLOCK, replicates - start), seed + i)
+             for i, start in enumerate(range(0, replicates, BLOCK))]
+    jobs = min(jobs or multiprocessing.cpu_count(), len(tasks))
+    if jobs <= 1:
+        blocks = [_block(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            blocks = pool.map(_block, tasks)
+    return OrderedDict((name, np.concatenate([b[name] for b in blocks]))
+                       for name in blocks[0])
+
+
+def interval(values, alpha=ALPHA):
+    """Intervalo de confiança percentil de nível `1 - alpha`."""
+    lo, hi = np.percentile(values, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return float(lo), float(hi)
+
+
+def intervals(groups, statistic, replicates=REPLICATES, seed=0, jobs=1,
+              alpha=ALPHA):
+    """Intervalos de confiança de cada estatística de `statistic`, ver
+    `replicate`.
+    """
+    result = replicate(groups, statistic, replicates, seed, jobs)
+    return OrderedDict((name, interval(values, alpha))
+                       for name, values in result.items())
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Cache colunar binário do DataFrame já processado.
+
+Cada *snapshot* é um diretório identificado por uma chave derivada do hash do
+arquivo de origem. Cada coluna é armazenada em um arquivo binário de largura
+fixa e os metadados (tipos, número de linhas e categorias) em `meta.json`.
+As colunas categóricas são armazenadas pelos seus códigos, dessa forma a
+leitura não requer nenhuma interpretação de texto.
+
+Os arquivos das colunas são lidos com `np.memmap`, sem cópia: as páginas são
+carregadas sob demanda pelo sistema operacional e compartilhadas entre todos
+os processos que leem o mesmo snapshot.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Versão do formato, alterações invalidam os snapshots existentes
+VERSION = 1
+
+META = 'meta.json'
+
+
+def key(*parts):
+    """Gera a chave de um snapshot a partir do hash da origem dos dados."""
+    digest = hashlib.sha256('v{}'.format(VERSION).encode())
+    for part in parts:
+        digest.update(str(part).encode())
+    return digest.hexdigest()
+
+
+def _column(path, i):
+    return os.path.join(path, '{}.bin'.format(i))
+
+
+def save(df, path, name):
+    """Salva o DataFrame `df` como o snapshot `name` no diretório `path`."""
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    # Escreve-se em um diretório temporário que é renomeado ao final, assim
+    # um snapshot incompleto nunca é lido
+    tmp = tempfile.mkdtemp(dir=path, suffix='.part')
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        info = {'name': col}
+        if series.dtype.name == 'category':
+            values = series.cat.codes.values
+            info['categories'] = series.cat.categories.tolist()
+            info['ordered'] = bool(series.cat.ordered)
+        else:
+            values = series.values
+        info['dtype'] = values.dtype.str
+        np.ascontiguousarray(values).tofile(_column(tmp, i))
+        columns.append(info)
+
+    with open(os.path.join(tmp, META), 'w') as f:
+        json.dump({'version': VERSION, 'rows': len(df),
+                   'columns': columns}, f)
+
+    dst = os.path.join(path, name)
+    try:
+        os.rename(tmp, dst)
+    except OSError:
+        # Outro processo já salvou o mesmo snapshot
+        shutil.rmtree(tmp)
+    return dst
+
+
+def _meta(src):
+    try:
+        with open(os.path.join(src, META)) as f:
+            meta = json.load(f)
+    except (IOError, ValueError):
+        return None
+    if meta.get('version') != VERSION:
+        return None
+    return meta
+
+
+def columns(path, name):
+    """Colunas do snapshot `name` mapeadas em memória, somente leitura.
+
+    Retorna um dicionário com o array de cada coluna, os códigos no caso das
+    colunas categóricas, e um dicionário com o `CategoricalDtype` de cada
+    coluna categórica. Retorna `None` caso o snapshot não exista.
+    """
+    src = os.path.join(path, name)
+    meta = _meta(src)
+    if meta is None:
+        return None
+
+    arrays = OrderedDict()
+    categories = OrderedDict()
+    for i, info in enumerate(meta['columns']):
+        dtype = np.dtype(info['dtype'])
+        filename = _column(src, i)
+        if os.path.getsize(filename) != meta['rows'] * dtype.itemsize:
+            return None
+        if meta['rows'] == 0:
+            values = np.empty(0, dtype=dtype)
+        else:
+            values = np.memmap(filename, dtype=dtype, mode='r')
+        arrays[info['name']] = values
+        if 'categories' in info:
+            categories[info['name']] = pd.api.types.CategoricalDtype(
+                info['categories'], ordered=info['ordered'])
+    return arrays, categories
+
+
+def load(path, name):
+    """Carrega o snapshot `name`, retorna `None` caso ele não exista."""
+    store = columns(path, name)
+    if store is None:
+        return None
+    arrays, categories = store
+
+    data = OrderedDict()
+    for col, values in arrays.items():
+        if col in categories:
+            dtype = categories[col]
+            values = pd.Categorical.from_codes(values, dtype.categories,
+                                               ordered=dtype.ordered)
+        data[col] = values
+    return pd.DataFrame(data, columns=list(arrays))
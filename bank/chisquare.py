@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""Testes de independência chi-quadrado entre pares de colunas categóricas.
+
+As tabelas de contingência de todas as características contra um alvo são
+obtidas em uma única contagem: o código de cada característica é deslocado
+para uma faixa própria do índice linear, `início_f + código_f * k + alvo`,
+e todas as características são contadas juntas com `np.bincount`. As
+tabelas são empilhadas em um tensor `(pares, níveis, níveis do alvo)`,
+completado com zeros, sobre o qual as estatísticas, os P-valores e o V de
+Cramér de todos os pares são calculados de uma vez.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import cube as olap
+from . import crosstab
+
+
+# Alvos analisados por padrão
+TARGETS = ('y', 'default', 'housing', 'loan')
+
+# Correções para múltiplos testes
+CORRECTIONS = ('holm', 'bonferroni', 'fdr_bh', 'none')
+
+
+def categorical(df):
+    """Colunas categóricas de `df`."""
+    return [col for col in df.columns if df[col].dtype.name == 'category']
+
+
+def _codes(df, cols):
+    # Matriz `(colunas, linhas)` com os códigos de cada coluna e o número de
+    # níveis de cada uma
+    factors = [crosstab.factorize(df[col]) for col in cols]
+    codes = np.empty((len(cols), len(df)), dtype=np.intp)
+    for i, (values, _) in enumerate(factors):
+        codes[i] = values
+    return codes, [len(levels) for _, levels in factors]
+
+
+def _tensor(codes, width, y, k):
+    # Conta todas as características de `codes` contra o alvo `y` com uma
+    # única chamada de `np.bincount` por bloco de linhas
+    n_features = codes.shape[0]
+    offsets = (np.arange(n_features, dtype=np.intp) * width * k)[:, None]
+
+    counts = np.zeros(n_features * width * k, dtype=np.int64)
+    for start in range(0, codes.shape[1], crosstab.BLOCK):
+        block = codes[:, start:start + crosstab.BLOCK]
+        y_block = y[start:start + crosstab.BLOCK]
+        index = offsets + block * k + y_block
+        valid = (block >= 0) & (y_block >= 0)
+        counts += np.bincount(index[valid], minlength=counts.size)
+    return counts.reshape(n_features, width, k)
+
+
+def tensor(df, features, target):
+    """Tabelas de contingência de cada característica com `target`.
+
+    Retorna um `ndarray` `(características, níveis, níveis do alvo)`, onde
+    as características com menos níveis são completadas com zeros.
+    """
+    codes, widths = _codes(df, features)
+    y, (k,) = _codes(df, [target])
+    return _tensor(codes, max(widths), y[0], k)
+
+
+def statistic(counts):
+    """Estatística chi-quadrado e graus de liberdade de tabelas empilhadas.
+
+    As linhas e colunas sem nenhuma ocorrência (inclusive as completadas com
+    zeros) não contam nos graus de liberdade.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    rows = counts.sum(axis=2, keepdims=True)
+    cols = counts.sum(axis=1, keepdims=True)
+    n = rows.sum(axis=1, keepdims=True)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = rows * cols / n
+        terms = np.where(expected > 0, (counts - expected) ** 2 / expected, 0)
+    chi = terms.sum(axis=(1, 2))
+
+    r = (rows[:, :, 0] > 0).sum(axis=1)
+    c = (cols[:, 0, :] > 0).sum(axis=1)
+    dof = (r - 1) * (c - 1)
+    return chi, dof, n.ravel(), np.minimum(r, c)
+
+
+def pvalue(chi, dof):
+    """P-valor da distribuição chi-quadrado, `nan` para `dof=0`."""
+    from scipy.special import chdtrc
+
+    chi = np.asarray(chi, dtype=np.float64)
+    dof = np.asarray(dof)
+    with np.errstate(invalid='ignore'):
+        return np.where(dof > 0, chdtrc(np.maximum(dof, 1), chi), np.nan)
+
+
+def cramers_v(chi, n, k):
+    """V de Cramér, com `k` o menor número de níveis de cada tabela."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.sqrt(chi / (n * (np.asarray(k) - 1)))
+
+
+def correct(p, method='holm'):
+    """Corrige os P-valores `p` para múltiplos testes.
+
+    Os métodos são `holm` (Holm-Bonferroni), `bonferroni`, `fdr_bh`
+    (Benjamini-Hochberg) e `none`. Os valores `nan` são ignorados.
+    """
+    if method not in CORRECTIONS:
+        raise ValueError('Correção desconhecida: {}'.format(method))
+    p = np.asarray(p, dtype=np.float64)
+    adjusted = np.full(p.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    m = valid.size
+    if method == 'none' or m == 0:
+        adjusted[valid] = p[valid]
+        return adjusted
+
+    order = valid[np.argsort(p[valid], kind='mergesort')]
+    ranked = p[order]
+    if method == 'bonferroni':
+        ranked = ranked * m
+    elif method == 'holm':
+        ranked = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    else:
+        ranked = ranked * m / np.arange(1, m + 1)
+        ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+    adjusted[order] = np.minimum(ranked, 1)
+    return adjusted
+
+
+def scan(df, features=None, targets=TARGETS, method='holm'):
+    """Testa a independência de cada característica com cada alvo.
+
+    Com `features=None` são utilizadas todas as colunas categóricas, e com
+    `targets=None` todos os pares de colunas categóricas são testados. Os
+    pares de uma coluna com ela mesma são ignorados, e cada par de colunas
+    é testado uma única vez: um alvo já testado não é característica dos
+    alvos seguintes. Retorna um DataFrame ordenado pelo P-valor corrigido
+    por `method`.
+    """
+    if features is None:
+        features = categorical(df)
+    if targets is None:
+        targets = categorical(df)
+
+    # Cada coluna é convertida em códigos uma única vez
+    columns = list(features) + [t for t in targets if t not in features]
+    codes, widths = _codes(df, columns)
+    width = max(widths)
+    features = list(features)
+
+    # Todas as tabelas em um único tensor, completado com zeros
+    pairs, tables, scanned = [], [], set()
+    for target in targets:
+        t = columns.index(target)
+        table = _tensor(codes[:len(features)], width, codes[t], widths[t])
+        keep = [i for i, col in enumerate(features)
+                if col != target and col not in scanned]
+        pairs.extend((features[i], target) for i in keep)
+        tables.append(table[keep])
+        scanned.add(target)
+
+    return _summary(pairs, tables, width, method)
+
+
+def _summary(pairs, tables, width, method):
+    # Empilha as tabelas de cada alvo em um único tensor, completado com
+    # zeros, e calcula as estatísticas de todos os pares
+    depth = max(table.shape[2] for table in tables)
+    counts = np.zeros((len(pairs), width, depth), dtype=np.int64)
+    start = 0
+    for table in tables:
+        counts[start:start + table.shape[0], :table.shape[1],
+               :table.shape[2]] = table
+        start += table.shape[0]
+
+    chi, dof, n, k = statistic(counts)
+    p = pvalue(chi, dof)
+
+    result = pd.DataFrame(pairs, columns=['feature', 'target'])
+    result['chi2'] = chi
+    result['dof'] = dof
+    result['p'] = p
+    result['p_adj'] = correct(p, method)
+    result['cramers_v'] = cramers_v(chi, n, k)
+    result = result.sort_values(['p_adj', 'cramers_v'],
+                                ascending=[True, False], kind='mergesort')
+    return result.reset_index(drop=True)
+
+
+def scan_cube(cube, features=None, targets=TARGETS, method='holm'):
+    """Mesmo resultado de `scan`, com as tabelas obtidas do cubo de
+    agregados `cube` (ver `bank.cube`) em vez das linhas do banco de dados.
+    As características e os alvos devem ser dimensões do cubo.
+    """
+    dims = cube['dimensions']
+    features = list(dims if features is None else features)
+    targets = list(dims if targets is None else targets)
+    width = max(len(cube['levels'][dims.index(f)]) for f in features)
+
+    pairs, tables, scanned = [], [], set()
+    for target in targets:
+        keep = [f for f in features if f != target and f not in scanned]
+        pairs.extend((f, target) for f in keep)
+        scanned.add(target)
+        k = len(cube['levels'][dims.index(target)])
+        table = np.zeros((len(keep), width, k), dtype=np.int64)
+        for i, f in enumerate(keep):
+            counts = olap.table(cube, [f, target]).values.reshape(-1, k)
+            table[i, :counts.shape[0]] = counts
+        tables.append(table)
+    return _summary(pairs, tables, width, method)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Tabelas de contingência calculadas sobre os códigos das categorias.
+
+Em vez de filtrar o DataFrame com uma máscara booleana para cada valor e
+contar as ocorrências de cada fatia, as colunas são convertidas em códigos
+inteiros e combinadas em um único índice linear, `código_a * k_b + código_b`,
+cujas ocorrências são contadas com `np.bincount`. Assim, a tabela completa é
+obtida em uma única passagem pelos dados, sem criar cópias das colunas.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Número de linhas processadas por vez, limita a memória do índice linear
+BLOCK = 1 << 20
+
+# Amplitude máxima de uma coluna inteira utilizada diretamente como código
+DENSE = 1 << 20
+
+
+def _factorize(values):
+    # Retorna os códigos, o deslocamento a ser subtraído deles e os níveis
+    if getattr(values, 'dtype', None) is not None and \
+            values.dtype.name == 'category':
+        values = pd.Categorical(values)
+        return values.codes, 0, pd.Index(values.categories)
+
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu' and values.shape[0] > 0:
+        lo, hi = int(values.min()), int(values.max())
+        if hi - lo < DENSE:
+            return values, lo, pd.Index(np.arange(lo, hi + 1), dtype='int64')
+
+    levels, codes = np.unique(values, return_inverse=True)
+    return codes, 0, pd.Index(levels)
+
+
+def factorize(values):
+    """Retorna os códigos inteiros e os níveis dos valores de uma coluna.
+
+    Para colunas categóricas utiliza-se os próprios códigos. Colunas inteiras
+    com amplitude pequena utilizam o valor deslocado do mínimo como código,
+    portanto os níveis incluem os valores intermediários não observados.
+    """
+    codes, offset, levels = _factorize(values)
+    if offset:
+        codes = codes.astype(np.intp) - offset
+    return codes, levels
+
+
+def crosstab(*columns):
+    """Conta as ocorrências de cada combinação dos valores das colunas.
+
+    Retorna um `ndarray` com uma dimensão por coluna e a lista dos níveis de
+    cada dimensão. Linhas com valores nulos (código -1) são ignoradas.
+    """
+    factors = [_factorize(col) for col in columns]
+    levels = [lv for _, _, lv in factors]
+    shape = tuple(len(lv) for lv in levels)
+    size = int(np.prod(shape))
+
+    # O índice linear é calculado em blocos para limitar a memória
+    counts = np.zeros(size, dtype=np.int64)
+    for start in range(0, len(factors[0][0]), BLOCK):
+        index = None
+        for codes, offset, lv in factors:
+            # `astype` cria uma cópia, os dados originais não são alterados
+            block = codes[start:start + BLOCK].astype(np.intp)
+            if offset:
+                block -= offset
+            if index is None:
+                index = block
+            else:
+                # Um índice negativo permanece negativo
+                index = index * len(lv) + block
+                index[block < 0] = -1
+        counts += np.bincount(index[index >= 0], minlength=size)
+
+    return counts.reshape(shape), levels
+
+
+def table(df, keys):
+    """Tabela de contingência das colunas `keys` como uma `Series`.
+
+    O índice contém todas as combinações dos níveis das colunas, inclusive as
+    não observadas, assim como `df.groupby(keys, observed=False).size()`.
+    """
+    keys = list(keys)
+    counts, levels = crosstab(*(df[key] for key in keys))
+    if len(keys) == 1:
+        index = levels[0].rename(keys[0])
+    else:
+        index = pd.MultiIndex.from_product(levels, names=keys)
+    return pd.Series(counts.ravel(), index=index)
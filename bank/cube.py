@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""Cubo de agregados pré-calculado sobre as colunas categóricas.
+
+Cada célula do cubo é uma combinação dos níveis das dimensões (as colunas
+categóricas) e guarda o número de linhas e, para cada medida numérica, a
+soma e a soma dos quadrados dos valores, suficientes para médias e
+variâncias. Apenas as células observadas são armazenadas, identificadas
+pelo índice linear da combinação (como em `bank.crosstab`) em ordem
+crescente. Com as 10 dimensões do banco de dados o produto completo tem
+331.776 células, das quais apenas uma fração é observada.
+
+Qualquer agrupamento por um subconjunto das dimensões, com ou sem filtros
+sobre as demais, é obtido do cubo (`rollup`) sem ler novamente as linhas.
+Novas linhas são agregadas a um cubo existente com `update`, e dois cubos
+podem ser somados com `merge`.
+"""
+
+import os
+import json
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import crosstab
+
+
+# Dimensões e medidas do cubo
+DIMENSIONS = ('job', 'marital', 'education', 'default', 'housing', 'loan',
+              'contact', 'month', 'poutcome', 'y')
+MEASURES = ('balance', 'age', 'duration', 'campaign')
+
+# Versão do formato, alterações invalidam os cubos salvos
+VERSION = 1
+
+
+def empty(levels, dimensions=DIMENSIONS, measures=MEASURES):
+    """Cubo vazio com os níveis `levels` de cada dimensão."""
+    return OrderedDict([
+        ('dimensions', list(dimensions)),
+        ('measures', list(measures)),
+        ('levels', [list(lv) for lv in levels]),
+        ('cells', np.empty(0, dtype=np.int64)),
+        ('count', np.empty(0, dtype=np.int64)),
+        ('sum', np.empty((0, len(measures)), dtype=np.int64)),
+        ('sumsq', np.empty((0, len(measures)), dtype=np.float64)),
+    ])
+
+
+def _shape(cube):
+    return tuple(len(lv) for lv in cube['levels'])
+
+
+def _aggregate(cube, chunk):
+    # Agrega as linhas de `chunk` por célula, retorna um cubo apenas com as
+    # células observadas no bloco
+    codes = []
+    for dim, levels in zip(cube['dimensions'], cube['levels']):
+        values, found = crosstab.factorize(chunk[dim])
+        if list(found) != levels:
+            # Os códigos são convertidos para os níveis do cubo
+            values = pd.Categorical(chunk[dim], categories=levels).codes
+        codes.append(np.asarray(values, dtype=np.intp))
+    codes = np.vstack(codes) if codes else np.empty((0, len(chunk)))
+    valid = (codes >= 0).all(axis=0)
+    index = np.ravel_multi_index(codes[:, valid], _shape(cube))
+
+    cells, inverse = np.unique(index, return_inverse=True)
+    part = empty(cube['levels'], cube['dimensions'], cube['measures'])
+    part['cells'] = cells.astype(np.int64)
+    part['count'] = np.bincount(inverse, minlength=cells.size)
+    sums, sumsq = [], []
+    for col in cube['measures']:
+        values = np.asarray(chunk[col])[valid].astype(np.float64)
+        sums.append(np.bincount(inverse, weights=values, minlength=cells.size))
+        sumsq.append(np.bincount(inverse, weights=values * values,
+                                 minlength=cells.size))
+    part['sum'] = np.round(np.column_stack(sums)).astype(np.int64) \
+        if sums else part['sum']
+    part['sumsq'] = np.column_stack(sumsq) if sumsq else part['sumsq']
+    return part
+
+
+def merge(a, b):
+    """Soma dois cubos com as mesmas dimensões, medidas e níveis."""
+    cells = np.union1d(a['cells'], b['cells'])
+    result = empty(a['levels'], a['dimensions'], a['measures'])
+    result['cells'] = cells
+    for name in ('count', 'sum', 'sumsq'):
+        shape = (cells.size,) + a[name].shape[1:]
+        total = np.zeros(shape, dtype=a[name].dtype)
+        for cube in (a, b):
+            total[np.searchsorted(cells, cube['cells'])] += cube[name]
+        result[name] = total
+    return result
+
+
+def update(cube, chunk):
+    """Agrega as linhas de `chunk` ao cubo, retorna o novo cubo."""
+    return merge(cube, _aggregate(cube, chunk))
+
+
+def build(chunks, levels=None, dimensions=DIMENSIONS, measures=MEASURES):
+    """Constrói o cubo a partir dos blocos `chunks`.
+
+    Os níveis de cada dimensão são obtidos de `levels` ou, se omitidos, das
+    categorias das colunas do primeiro bloco.
+    """
+    cube = None
+    for chunk in chunks:
+        if cube is None:
+            if levels is None:
+                levels = [chunk[dim].cat.categories for dim in dimensions]
+            cube = empty(levels, dimensions, measures)
+        cube = update(cube, chunk)
+    return cube
+
+
+def rollup(cube, by=(), where=None):
+    """Agrega o cubo pelas dimensões `by`.
+
+    `where` associa dimensões a um nível ou a uma lista de níveis aceitos.
+    Retorna um DataFrame indexado por todas as combinações dos níveis de
+    `by` (inclusive as não observadas), com o número de linhas e, para cada
+    medida, a soma, a soma dos quadrados, a média e a variância amostral.
+    Dimensões ou níveis desconhecidos resultam em `ValueError`.
+    """
+    by = list(by)
+    where = where or {}
+    unknown = [dim for dim in by + list(where)
+               if dim not in cube['dimensions']]
+    if unknown:
+        raise ValueError('Dimensões inválidas: {}'.format(', '.join(unknown)))
+
+    shape = _shape(cube)
+    codes = np.unravel_index(cube['cells'], shape) if shape else ()
+    keep = np.ones(cube['cells'].size, dtype=bool)
+    for dim, accepted in where.items():
+        i = cube['dimensions'].index(dim)
+        if isinstance(accepted, str):
+            accepted = [accepted]
+        levels = cube['levels'][i]
+        unknown = [lv for lv in accepted if lv not in levels]
+        if unknown:
+            raise ValueError('Níveis inválidos de {}: {}'.format(
+                dim, ', '.join(unknown)))
+        keep &= np.isin(codes[i], [levels.index(lv) for lv in accepted])
+
+    axes = [cube['dimensions'].index(dim) for dim in by]
+    size = int(np.prod([shape[i] for i in axes]))
+    if axes:
+        index = np.ravel_multi_index([codes[i][keep] for i in axes],
+                                     [shape[i] for i in axes])
+    else:
+        index = np.zeros(int(keep.sum()), dtype=np.intp)
+
+    columns = OrderedDict()
+    count = np.bincount(index, weights=cube['count'][keep], minlength=size)
+    columns['count'] = count.astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j, col in enumerate(cube['measures']):
+            total = np.bincount(index, weights=cube['sum'][keep, j],
+                                minlength=size)
+            sumsq = np.bincount(index, weights=cube['sumsq'][keep, j],
+                                minlength=size)
+            columns[col + '_sum'] = total
+            columns[col + '_sumsq'] = sumsq
+            columns[col + '_mean'] = total / count
+            columns[col + '_var'] = (sumsq - total * total / count) / \
+                (count - 1)
+
+    if len(by) > 1:
+        index = pd.MultiIndex.from_product(
+            [pd.Index(cube['levels'][i]) for i in axes], names=by)
+    elif by:
+        index = pd.Index(cube['levels'][axes[0]], name=by[0])
+    else:
+        index = None
+    return pd.DataFrame(columns, index=index)
+
+
+def table(cube, keys, where=None):
+    """Tabela de contagem das dimensões `keys`, no mesmo formato de
+    `bank.crosstab.table`.
+    """
+    return rollup(cube, keys, where)['count']
+
+
+def save(cube, path, name):
+    """Salva o cubo comprimido no diretório `path`."""
+    if not os.path.exists(path):
+        os.makedirs(path)
+    meta = {'version': VERSION, 'dimensions': cube['dimensions'],
+            'measures': cube['measures'], 'levels': cube['levels']}
+    fd, tmp = tempfile.mkstemp(dir=path, suffix='.npz')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)),
+                            cells=cube['cells'], count=cube['count'],
+                            sum=cube['sum'], sumsq=cube['sumsq'])
+    dst = os.path.join(path, name + '.npz')
+    os.replace(tmp, dst)
+    return dst
+
+
+def load(path, name):
+    """Carrega o cubo `name`, retorna `None` caso ele não exista."""
+    try:
+        with np.load(os.path.join(path, name + '.npz')) as f:
+            meta = json.loads(str(f['meta']))
+            if meta.get('version') != VERSION:
+                return None
+            cube = empty(meta['levels'], meta['dimensions'],
+                         meta['measures'])
+            for name in ('cells', 'count', 'sum', 'sumsq'):
+                cube[name] = f[name]
+    except (IOError, ValueError, KeyError):
+        return None
+    return cube
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""Obtenção do banco de dados com cache local.
+
+O arquivo `bank.zip` é baixado apenas quando não existe uma cópia válida no
+diretório `data/`. Cada arquivo baixado é armazenado em `data/cache/` com o
+nome igual ao seu hash SHA-256 e registrado em um manifesto, que guarda também
+os cabeçalhos `ETag` e `Last-Modified` usados na atualização condicional.
+
+No modo *offline* (argumento `offline=True` ou variável de ambiente
+`DESAFIO_OFFLINE=1`) nenhum acesso à rede é feito e apenas os arquivos locais
+são utilizados.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import urllib.error
+import urllib.request as ur
+from zipfile import ZipFile, BadZipFile
+
+import pandas as pd
+
+from . import cube as olap
+from . import cache
+from . import instrument
+from . import schema
+
+
+# Especificações do banco de dados.
+URL = \
+    'https://archive.ics.uci.edu/ml/machine-learning-databases/00222/bank.zip'
+DATASET = 'bank-full.csv'
+
+# SHA-256 do `bank.zip` utilizado na análise (`data/data.zip`)
+SHA256 = '99d7e8eb12401ed278b793984423915411ea8df099e1795f9fefe254f513fe5e'
+
+# Armazenamento do banco de dados
+PATH_DATA = os.path.join(os.path.relpath(os.getcwd()), 'data')
+ARCHIVE = 'data.zip'
+CACHE = 'cache'
+FRAMES = 'frames'
+CUBES = 'cubes'
+MANIFEST = 'manifest.json'
+
+# Tamanho do bloco de leitura/escrita
+BLOCK = 1 << 20
+
+
+def is_offline():
+    """Retorna `True` se a variável `DESAFIO_OFFLINE` estiver ativa."""
+    return os.environ.get('DESAFIO_OFFLINE', '').lower() in ('1', 'true',
+                                                             'yes')
+
+
+def sha256(path):
+    """Calcula o hash SHA-256 de um arquivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_valid(path, checksum=None):
+    # Um arquivo é válido se for um zip íntegro e, caso informado, possuir o
+    # hash esperado
+    if not os.path.isfile(path):
+        return False
+    if checksum is not None and sha256(path) != checksum:
+        return False
+    try:
+        with ZipFile(path) as zfile:
+            return zfile.testzip() is None
+    except BadZipFile:
+        return False
+
+
+def _read_manifest(path_cache):
+    path = os.path.join(path_cache, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(path_cache, manifest):
+    # Escrita atômica para não corromper o manifesto em execuções paralelas
+    fd, tmp = tempfile.mkstemp(dir=path_cache, suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(path_cache, MANIFEST))
+
+
+def _copy(src, dst):
+    # Cópia atômica, o destino nunca fica parcialmente escrito
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst) or '.')
+    os.close(fd)
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _download(url, path_cache, entry):
+    # Faz a requisição condicional, retorna `None` se o arquivo não mudou
+    request = ur.Request(url)
+    if entry.get('etag'):
+        request.add_header('If-None-Match', entry['etag'])
+    if entry.get('last_modified'):
+        request.add_header('If-Modified-Since', entry['last_modified'])
+
+    try:
+        response = ur.urlopen(request)
+    except urllib.error.HTTPError as err:
+        if err.code == 304:
+            return None
+        raise
+
+    digest = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=path_cache, suffix='.part')
+    with response, os.fdopen(fd, 'wb') as f:
+        for block in iter(lambda: response.read(BLOCK), b''):
+            digest.update(block)
+            f.write(block)
+
+    checksum = digest.hexdigest()
+    blob = os.path.join(path_cache, checksum + '.zip')
+    os.replace(tmp, blob)
+
+    return {
+        'sha256': checksum,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+
+
+def fetch(url=URL, path=PATH_DATA, offline=None, refresh=False,
+          checksum=SHA256):
+    """Obtém o arquivo zip do banco de dados e retorna o seu caminho.
+
+    A cópia local `path/data.zip` é reutilizada sempre que for válida. Com
+    `refresh=True` é feita uma requisição condicional ao servidor, que só
+    transfere o arquivo se ele tiver sido alterado. O arquivo precisa
+    possuir o hash SHA-256 `checksum`, por padrão o do arquivo utilizado na
+    análise, e com `checksum=None` qualquer zip íntegro é aceito.
+
+    Um arquivo alterado obtido com `refresh=True` é aceito com qualquer
+    hash, que é registrado no manifesto e passa a ser o hash exigido da
+    cópia local nas execuções seguintes.
+    """
+    if offline is None:
+        offline = is_offline()
+
+    path_file = os.path.join(path, ARCHIVE)
+    path_cache = os.path.join(path, CACHE)
+    if not os.path.exists(path_cache):
+        os.makedirs(path_cache)
+
+    manifest = _read_manifest(path_cache)
+    entry = manifest.get(url, {})
+    if entry.get('refreshed') and checksum == SHA256:
+        # O arquivo aceito na última atualização substitui o hash fixado
+        checksum = entry['sha256']
+    expected = checksum or entry.get('sha256')
+
+    # Restaura a cópia de trabalho a partir do cache caso esteja ausente ou
+    # corrompida
+    valid = _is_valid(path_file, expected)
+    if not valid and expected is not None:
+        blob = os.path.join(path_cache, expected + '.zip')
+        if _is_valid(blob, expected):
+            _copy(blob, path_file)
+            valid = True
+
+    if valid:
+        if not entry:
+            # Arquivo já existente no diretório, registra-se no manifesto
+            entry = {'sha256': sha256(path_file)}
+            _copy(path_file, os.path.join(path_cache,
+                                          entry['sha256'] + '.zip'))
+            manifest[url] = entry
+            _write_manifest(path_cache, manifest)
+        if offline or not refresh:
+            return path_file
+    elif offline:
+        raise IOError('Modo offline: não há uma cópia válida de {} em '
+                      '{}.'.format(ARCHIVE, path))
+    else:
+        # Sem uma cópia válida a requisição não pode ser condicional
+        entry = {}
+
+    with instrument.stage('data.download'):
+        new = _download(url, path_cache, entry)
+    if new is None:
+        return path_file
+
+    blob = os.path.join(path_cache, new['sha256'] + '.zip')
+    if not _is_valid(blob, None if refresh else checksum):
+        os.remove(blob)
+        raise IOError('Arquivo inválido obtido de {}.'.format(url))
+    if refresh:
+        new['refreshed'] = True
+
+    _copy(blob, path_file)
+    manifest[url] = new
+    _write_manifest(path_cache, manifest)
+    return path_file
+
+
+def open_dataset(dataset=DATASET, path=PATH_DATA, **kwargs):
+    """Abre o arquivo CSV do banco de dados para leitura binária.
+
+    Caso o arquivo já tenha sido extraído em `path` ele é aberto diretamente,
+    senão é lido em *streaming* de dentro do zip, sem extraí-lo. Os demais
+    argumentos são repassados para `fetch`.
+    """
+    path_csv = os.path.join(path, dataset)
+    if os.path.isfile(path_csv):
+        return open(path_csv, 'rb')
+
+    # O membro permanece legível após o fechamento do zip
+    with ZipFile(fetch(path=path, **kwargs)) as zfile:
+        return zfile.open(dataset)
+
+
+def source_hash(dataset=DATASET, path=PATH_DATA, **kwargs):
+    """Retorna um hash do conteúdo do arquivo CSV do banco de dados.
+
+    Para o arquivo extraído calcula-se o SHA-256, já para o arquivo dentro do
+    zip utiliza-se o CRC-32 e o tamanho registrados no próprio zip, que não
+    requerem a leitura dos dados.
+    """
+    path_csv = os.path.join(path, dataset)
+    if os.path.isfile(path_csv):
+        return sha256(path_csv)
+
+    with ZipFile(fetch(path=path, **kwargs)) as zfile:
+        info = zfile.getinfo(dataset)
+    return 'crc32:{:08x}:{}'.format(info.CRC, info.file_size)
+
+
+def categorize(df):
+    """Converte as colunas não numéricas para o tipo 'category'."""
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def read_schema(dataset=DATASET, path=PATH_DATA, **kwargs):
+    """Obtém os tipos dos atributos a partir da descrição do banco de dados."""
+    with open_dataset(schema.names_file(dataset), path, **kwargs) as f:
+        text = f.read().decode('utf-8')
+    return schema.dtypes(schema.parse(text))
+
+
+def _snapshot(dataset, path, types, **kwargs):
+    # Diretório e nome do snapshot do banco de dados no cache colunar
+    name = cache.key(dataset, source_hash(dataset, path, **kwargs),
+                     schema.VERSION, sorted(types.items()))
+    return os.path.join(path, CACHE, FRAMES), name
+
+
+def load(dataset=DATASET, path=PATH_DATA, use_cache=True, **kwargs):
+    """Carrega o banco de dados como um DataFrame com colunas categóricas.
+
+    Os tipos de cada coluna são declarados na leitura a partir da descrição
+    do banco de dados (ver `bank.schema`). O resultado é armazenado em um
+    cache colunar binário, identificado pelo hash do arquivo de origem. Nas
+    execuções seguintes o DataFrame é lido diretamente do cache, sem
+    interpretar o CSV novamente.
+    """
+    types = read_schema(dataset, path, **kwargs)
+    path_frames, name = _snapshot(dataset, path, types, **kwargs)
+    if use_cache:
+        with instrument.stage('data.snapshot') as record:
+            df = cache.load(path_frames, name)
+            record['rows'] = None if df is None else len(df)
+        if df is not None:
+            return df
+
+    with instrument.stage('data.read_csv') as record:
+        with open_dataset(dataset, path, **kwargs) as f:
+            df = schema.read_csv(f, types)
+        record['rows'] = len(df)
+
+    if df.isnull().values.any():
+        print('Removendo linhas com NaN.')
+        df = df.dropna()
+
+    # Colunas não descritas no esquema
+    with instrument.stage('data.categorize') as record:
+        df = categorize(df)
+        record['rows'] = len(df)
+    if use_cache:
+        with instrument.stage('data.save_snapshot'):
+            cache.save(df, path_frames, name)
+    return df
+
+
+def codes(dataset=DATASET, path=PATH_DATA, **kwargs):
+    """Colunas do banco de dados mapeadas em memória, sem cópia.
+
+    Retorna um dicionário com o array de cada coluna (os códigos das colunas
+    categóricas) e um dicionário com o `CategoricalDtype` de cada coluna
+    categórica, ver `bank.cache.columns`. O snapshot é criado caso ainda não
+    exista.
+    """
+    types = read_schema(dataset, path, **kwargs)
+    path_frames, name = _snapshot(dataset, path, types, **kwargs)
+    store = cache.columns(path_frames, name)
+    if store is None:
+        load(dataset, path, **kwargs)
+        store = cache.columns(path_frames, name)
+    return store
+
+
+def cube(dataset=DATASET, path=PATH_DATA, use_cache=True, **kwargs):
+    """Cubo de agregados do banco de dados (ver `bank.cube`).
+
+    O cubo é identificado pelo mesmo hash do snapshot colunar e armazenado
+    comprimido no cache, assim ele só é construído uma vez para cada versão
+    do banco de dados.
+    """
+    types = read_schema(dataset, path, **kwargs)
+    _, name = _snapshot(dataset, path, types, **kwargs)
+    path_cubes = os.path.join(path, CACHE, CUBES)
+    if use_cache:
+        result = olap.load(path_cubes, name)
+        if result is not None:
+            return result
+
+    result = olap.build([load(dataset, path, use_cache, **kwargs)])
+    if use_cache:
+        olap.save(result, path_cubes, name)
+    return result
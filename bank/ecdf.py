@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Índice ordenado de uma coluna numérica por grupo.
+
+Para cada grupo (ex.: cada classe de `default`) o índice guarda os valores
+distintos da coluna em ordem crescente e o número acumulado de linhas até
+cada valor. Dessa forma, por busca binária nos valores, obtém-se em
+O(log n), sem percorrer as linhas:
+
+* o número e a fração de linhas abaixo ou acima de um limite (`share`);
+* a função de distribuição empírica em qualquer ponto (`cdf`);
+* os quantis exatos, com a mesma interpolação de `np.percentile`
+  (`quantile`).
+
+Todas as consultas aceitam arrays de limites, assim uma varredura de
+limites, como a dos histogramas cumulativos, é uma única busca vetorizada.
+O índice é obtido das tabelas de contagem (valor, grupo) de `bank.stream`
+(`from_table`) ou das colunas do DataFrame (`build`), e os índices de partes
+diferentes do banco de dados podem ser somados (`merge`).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _group(values, counts):
+    # Índice de um grupo a partir dos valores distintos e das contagens
+    values = np.asarray(values)
+    counts = np.asarray(counts, dtype=np.int64)
+    order = np.argsort(values, kind='mergesort')
+    keep = counts[order] > 0
+    return OrderedDict([
+        ('values', values[order][keep]),
+        ('cum', np.cumsum(counts[order][keep])),
+    ])
+
+
+def from_table(table):
+    """Índice de cada grupo a partir da tabela de contagem `table`, uma
+    `Series` indexada por (valor, grupo).
+    """
+    counts = table.unstack(fill_value=0)
+    values = counts.index.values
+    return OrderedDict((level, _group(values, counts[level].values))
+                       for level in counts.columns)
+
+
+def build(df, col, by):
+    """Índice da coluna `col` de `df` para cada nível da coluna `by`."""
+    result = OrderedDict()
+    groups = df.groupby(by, sort=True, observed=True)[col]
+    for level, values in groups:
+        values, counts = np.unique(np.asarray(values), return_counts=True)
+        result[level] = _group(values, counts)
+    return result
+
+
+def merge(a, b):
+    """Soma os índices de dois grupos."""
+    values = np.union1d(a['values'], b['values'])
+    counts = np.zeros(len(values), dtype=np.int64)
+    for group in (a, b):
+        counts[np.searchsorted(values, group['values'])] += counts_of(group)
+    return _group(values, counts)
+
+
+def size(group):
+    """Número de linhas do grupo."""
+    return int(group['cum'][-1]) if len(group['cum']) else 0
+
+
+def counts_of(group):
+    """Número de linhas de cada valor distinto do grupo."""
+    return np.diff(np.concatenate([[0], group['cum']]))
+
+
+def rank(group, x, strict=True):
+    """Número de linhas com valor menor que `x` (ou menor ou igual, com
+    `strict=False`).
+    """
+    side = 'left' if strict else 'right'
+    i = np.searchsorted(group['values'], x, side=side)
+    cum = np.concatenate([[0], group['cum']])
+    return cum[i]
+
+
+def share(group, x, above=True, strict=True):
+    """Fração das linhas com valor acima de `x` (ou abaixo, com
+    `above=False`), estritamente ou não.
+    """
+    n = size(group)
+    if above:
+        return (n - rank(group, x, strict=not strict)) / n
+    return rank(group, x, strict=strict) / n
+
+
+def cdf(group, x):
+    """Função de distribuição empírica, fração das linhas com valor menor ou
+    igual a `x`.
+    """
+    return rank(group, x, strict=False) / size(group)
+
+
+def value(group, k):
+    """Valor na posição `k` (a partir de 0) das linhas ordenadas."""
+    return group['values'][np.searchsorted(group['cum'], k, side='right')]
+
+
+def quantile(group, q):
+    """Quantil `q` exato, com a interpolação linear de `np.percentile`."""
+    h = (size(group) - 1) * np.asarray(q, dtype=np.float64)
+    lower, upper = np.floor(h).astype(np.int64), np.ceil(h).astype(np.int64)
+    a = value(group, lower).astype(np.float64)
+    b = value(group, upper).astype(np.float64)
+    result = a + (b - a) * (h - lower)
+    return float(result) if result.ndim == 0 else result
+
+
+def mean(group):
+    """Média dos valores do grupo."""
+    return (group['values'] * counts_of(group)).sum() / size(group)
+
+
+def summary(index, at=(), quantiles=()):
+    """Tabela com, para cada grupo, o número de linhas, a fração abaixo, a
+    fração acima e a distribuição empírica em cada limite de `at`, e os
+    quantis `quantiles`.
+    """
+    rows = OrderedDict()
+    for level, group in index.items():
+        row = OrderedDict([('count', size(group))])
+        for x in at:
+            row['below_{:g}'.format(x)] = share(group, x, above=False)
+            row['above_{:g}'.format(x)] = share(group, x)
+            row['cdf_{:g}'.format(x)] = cdf(group, x)
+        for q in quantiles:
+            row['q_{:g}'.format(q)] = quantile(group, q)
+        rows[level] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
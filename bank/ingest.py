@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Ingestão incremental de novos registros, apenas por acréscimo.
+
+Novas linhas (por exemplo as ligações de uma semana) são recebidas em
+arquivos CSV no mesmo formato do banco de dados. Cada arquivo é validado
+pelo esquema e copiado, sem alteração, para `data/batches/`, numerado na
+ordem de chegada. O banco de dados armazenado é o arquivo original seguido
+desses lotes.
+
+Em vez de processar novamente todas as linhas, um estado com os agregados
+mantidos, as tabelas de contagem das questões (`bank.stream.TABLES`) e o
+cubo de agregados (`bank.cube`, do qual se obtém as tabelas dos testes
+chi-quadrado), é atualizado com as contagens do novo lote apenas. O tempo
+da ingestão depende portanto do tamanho do lote, e não do banco de dados.
+
+`check` compara o estado com os agregados recalculados de todas as linhas,
+e `load` carrega as mesmas linhas como um DataFrame.
+"""
+
+import os
+import glob
+import json
+import shutil
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import cube
+from . import data
+from . import shard
+from . import schema
+from . import stream
+
+
+# Versão do formato, alterações invalidam o estado salvo
+VERSION = 1
+
+# Diretório dos lotes, em `data/`, e arquivo do estado, em `data/cache/`
+BATCHES = 'batches'
+STATE = 'ingest.pkl'
+
+
+def batches(path=data.PATH_DATA):
+    """Arquivos dos lotes já ingeridos, na ordem de chegada."""
+    return sorted(glob.glob(os.path.join(path, BATCHES, '*' + shard.SUFFIX)))
+
+
+def _levels(types):
+    return [types[dim].categories for dim in cube.DIMENSIONS]
+
+
+def _layout():
+    # Identifica os agregados mantidos: o estado salvo com outras tabelas
+    # ou outro cubo é recriado
+    text = json.dumps([list(stream.TABLES.items()), cube.VERSION,
+                       list(cube.DIMENSIONS), list(cube.MEASURES)])
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _aggregate(chunks, types):
+    # Tabelas de contagem e cubo de agregados dos blocos `chunks`, em uma
+    # única passagem
+    tables = None
+    result = cube.empty(_levels(types))
+    for chunk in chunks:
+        tables = stream.combine(tables, stream.aggregate([chunk]))
+        result = cube.update(result, chunk)
+    return tables, result
+
+
+def chunks(dataset=data.DATASET, path=data.PATH_DATA,
+           chunksize=schema.CHUNKSIZE, **kwargs):
+    """Itera sobre o banco de dados armazenado, o arquivo original seguido
+    dos lotes ingeridos, em blocos de `chunksize` linhas.
+    """
+    for chunk in stream.chunks(dataset, path, chunksize, **kwargs):
+        yield chunk
+    types = data.read_schema(dataset, path, **kwargs)
+    for filename in batches(path):
+        for chunk in shard.chunks(filename, types, chunksize):
+            yield chunk
+
+
+def load(dataset=data.DATASET, path=data.PATH_DATA, use_cache=True,
+         chunksize=schema.CHUNKSIZE, **kwargs):
+    """Carrega o banco de dados armazenado, o arquivo original seguido dos
+    lotes ingeridos, como um DataFrame com colunas categóricas.
+
+    Sem lotes o resultado é o mesmo de `bank.data.load`, inclusive o uso do
+    snapshot colunar. Os lotes são lidos com os tipos do esquema e
+    acrescentados ao DataFrame original.
+    """
+    df = data.load(dataset, path, use_cache, **kwargs)
+    filenames = batches(path)
+    if not filenames:
+        return df
+
+    types = data.read_schema(dataset, path, **kwargs)
+    parts = [df]
+    for filename in filenames:
+        parts.extend(shard.chunks(filename, types, chunksize))
+    return data.categorize(pd.concat(parts, ignore_index=True))
+
+
+def _save(st, path):
+    dst = os.path.join(path, data.CACHE, STATE)
+    if not os.path.exists(os.path.dirname(dst)):
+        os.makedirs(os.path.dirname(dst))
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst), suffix='.part')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(st, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, dst)
+
+
+def _load(path):
+    try:
+        with open(os.path.join(path, data.CACHE, STATE), 'rb') as f:
+            return pickle.load(f)
+    except (IOError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def _delta(filename, types, chunksize):
+    # Agregados das linhas do lote `filename`
+    return _aggregate(shard.chunks(filename, types, chunksize), types)
+
+
+def _apply(st, name, delta):
+    # Soma ao estado os agregados `delta` do lote `name`
+    tables, result = delta
+    if tables is not None:
+        st['tables'] = stream.combine(st['tables'], tables)
+    st['cube'] = cube.merge(st['cube'], result)
+    st['rows'] += int(result['count'].sum())
+    st['batches'].append(name)
+    return st
+
+
+def state(dataset=data.DATASET, path=data.PATH_DATA,
+          chunksize=schema.CHUNKSIZE, **kwargs):
+    """Estado dos agregados do banco de dados armazenado.
+
+    O estado é criado a partir de todas as linhas apenas quando não existe,
+    quando o arquivo original muda ou quando as tabelas de contagem ou o
+    cubo mantidos mudam. Os lotes presentes em `data/batches/`
+    e ainda não incluídos no estado, por exemplo após uma ingestão
+    interrompida, são somados a ele.
+    """
+    types = data.read_schema(dataset, path, **kwargs)
+    source = data.source_hash(dataset, path, **kwargs)
+    layout = _layout()
+    st = _load(path)
+    changed = st is None or st['version'] != VERSION or \
+        st['source'] != source or st.get('layout') != layout
+    if changed:
+        tables, result = _aggregate(
+            stream.chunks(dataset, path, chunksize, **kwargs), types)
+        st = OrderedDict([
+            ('version', VERSION),
+            ('source', source),
+            ('layout', layout),
+            ('batches', []),
+            ('rows', int(result['count'].sum())),
+            ('tables', tables),
+            ('cube', result),
+        ])
+
+    for filename in batches(path):
+        name = os.path.basename(filename)
+        if name not in st['batches']:
+            st = _apply(st, name, _delta(filename, types, chunksize))
+            changed = True
+    if changed:
+        _save(st, path)
+    return st
+
+
+def append(filename, dataset=data.DATASET, path=data.PATH_DATA,
+           chunksize=schema.CHUNKSIZE, **kwargs):
+    """Acrescenta as linhas do arquivo CSV `filename` ao banco de dados e
+    atualiza os agregados mantidos. Retorna o estado atualizado.
+
+    O arquivo é lido uma única vez: as linhas são validadas pelo esquema e
+    agregadas antes de o arquivo ser copiado para o diretório dos lotes.
+    """
+    types = data.read_schema(dataset, path, **kwargs)
+    st = state(dataset, path, chunksize, **kwargs)
+    delta = _delta(filename, types, chunksize)
+
+    path_batches = os.path.join(path, BATCHES)
+    if not os.path.exists(path_batches):
+        os.makedirs(path_batches)
+    name = '{:06d}{}'.format(len(batches(path)) + 1, shard.SUFFIX)
+    fd, tmp = tempfile.mkstemp(dir=path_batches, suffix='.part')
+    with os.fdopen(fd, 'wb') as dst, open(filename, 'rb') as src:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, os.path.join(path_batches, name))
+
+    st = _apply(st, name, delta)
+    _save(st, path)
+    return st
+
+
+def check(dataset=data.DATASET, path=data.PATH_DATA,
+          chunksize=schema.CHUNKSIZE, **kwargs):
+    """Compara o estado com os agregados recalculados de todas as linhas.
+
+    Retorna a lista dos agregados divergentes, vazia quando o estado está
+    consistente.
+    """
+    st = state(dataset, path, chunksize, **kwargs)
+    types = data.read_schema(dataset, path, **kwargs)
+    tables, result = _aggregate(chunks(dataset, path, chunksize, **kwargs),
+                                types)
+
+    diverging = [name for name, table in tables.items()
+                 if not table.equals(st['tables'].get(name))]
+    for name in ('cells', 'count', 'sum', 'sumsq'):
+        if not np.array_equal(result[name], st['cube'][name]):
+            diverging.append('cube.' + name)
+    return diverging
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""Instrumentação das etapas da análise.
+
+Cada etapa (download, leitura do CSV, categorização, tabelas de contagem,
+cada questão, seleção de características, renderização de cada gráfico) é
+executada dentro de `stage`, que registra:
+
+* o tempo decorrido e o tempo de CPU do processo;
+* o número de linhas processadas, quando informado pela etapa;
+* o pico de memória residente do processo ao final da etapa;
+* opcionalmente, o pico de memória alocada durante a etapa e as linhas que
+  mais alocaram (`tracemalloc`), e o perfil de execução (`cProfile`),
+  salvo em `profiles/<etapa>-<pid>.prof`.
+
+O perfil e o `tracemalloc` são ativados por etapa com `configure` ou com as
+variáveis de ambiente `DESAFIO_PROFILE` e `DESAFIO_TRACEMALLOC`, nomes das
+etapas separados por vírgula ou `all`, sem alterar o código. Os registros
+são salvos em JSON ou no formato de texto OpenMetrics com `write`.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+from contextlib import contextmanager
+from collections import OrderedDict
+
+try:
+    import resource
+except ImportError:
+    # Indisponível no Windows, o pico de memória não é registrado
+    resource = None
+
+
+# Prefixo das métricas OpenMetrics
+PREFIX = 'desafio_stage'
+
+# Número de linhas de código listadas pelo `tracemalloc`
+TOP = 10
+
+# Métricas OpenMetrics: nome, unidade, campo do registro, agregação e
+# descrição
+METRICS = (
+    ('wall_seconds', 'seconds', 'wall_seconds', sum,
+     'Tempo decorrido de cada etapa.'),
+    ('cpu_seconds', 'seconds', 'cpu_seconds', sum,
+     'Tempo de CPU de cada etapa.'),
+    ('rows', None, 'rows', sum, 'Linhas processadas em cada etapa.'),
+    ('calls', None, None, len, 'Número de execuções de cada etapa.'),
+    ('max_rss_bytes', 'bytes', 'max_rss_bytes', max,
+     'Pico de memória residente do processo ao final de cada etapa.'),
+    ('traced_peak_bytes', 'bytes', 'traced_peak_bytes', max,
+     'Pico de memória alocada durante cada etapa (tracemalloc).'),
+)
+
+
+def _names(text):
+    return set(name.strip() for name in (text or '').split(',')
+               if name.strip())
+
+
+# Etapas com perfil e com `tracemalloc`, e o diretório dos perfis
+_CONFIG = {
+    'profile': _names(os.environ.get('DESAFIO_PROFILE')),
+    'trace': _names(os.environ.get('DESAFIO_TRACEMALLOC')),
+    'path': os.environ.get('DESAFIO_PROFILE_DIR', 'profiles'),
+}
+
+# Registros das etapas concluídas e pilha das etapas em execução
+_RECORDS = []
+_STACK = []
+
+# Picos de memória alocada das etapas com `tracemalloc` em execução,
+# anteriores à última vez em que o pico foi reiniciado
+_PEAKS = []
+
+
+def configure(profile=None, trace=None, path=None):
+    """Define as etapas com perfil (`profile`) e com `tracemalloc`
+    (`trace`), conjuntos de nomes ou textos separados por vírgula, e o
+    diretório dos perfis `path`.
+    """
+    if profile is not None:
+        _CONFIG['profile'] = _names(profile) \
+            if isinstance(profile, str) else set(profile)
+    if trace is not None:
+        _CONFIG['trace'] = _names(trace) \
+            if isinstance(trace, str) else set(trace)
+    if path is not None:
+        _CONFIG['path'] = path
+
+
+def _enabled(option, name):
+    names = _CONFIG[option]
+    return 'all' in names or name in names
+
+
+def max_rss(children=False):
+    """Pico de memória residente do processo em bytes, ou do maior dos
+    processos filhos já encerrados com `children=True`. Retorna `None`
+    quando indisponível.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    rss = resource.getrusage(who).ru_maxrss
+    # Em kilobytes no Linux e em bytes no macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _filename(record, suffix):
+    labels = '-'.join(str(v) for v in record['labels'].values())
+    name = '-'.join(part for part in (record['stage'], labels,
+                                      str(os.getpid())) if part)
+    name = re.sub(r'[^\w.-]+', '_', name)
+    if not os.path.exists(_CONFIG['path']):
+        os.makedirs(_CONFIG['path'])
+    return os.path.join(_CONFIG['path'], name + suffix)
+
+
+@contextmanager
+def stage(name, **labels):
+    """Registra a execução do bloco como a etapa `name`.
+
+    `labels` identifica a execução, ex.: `stage('question', n=5)`. Retorna
+    o registro da etapa, no qual o bloco pode informar o número de linhas
+    processadas, `record['rows'] = n`.
+    """
+    record = OrderedDict([
+        ('stage', name),
+        ('labels', OrderedDict(labels)),
+        ('parent', _STACK[-1]['stage'] if _STACK else None),
+        ('wall_seconds', None),
+        ('cpu_seconds', None),
+        ('rows', None),
+        ('max_rss_bytes', None),
+    ])
+
+    # O perfil de uma etapa inclui as etapas internas
+    profiler = None
+    if _enabled('profile', name) and \
+            not any(r.get('profile') for r in _STACK):
+        import cProfile
+        profiler = cProfile.Profile()
+        record['profile'] = True
+
+    tracing = False
+    if _enabled('trace', name):
+        import tracemalloc
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        base = tracemalloc.take_snapshot()
+        # O pico é reiniciado para medir apenas esta etapa, e o pico até
+        # aqui é guardado para a etapa externa
+        start = tracemalloc.get_traced_memory()
+        if _PEAKS:
+            _PEAKS[-1] = max(_PEAKS[-1], start[1])
+        _PEAKS.append(0)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    _STACK.append(record)
+    wall, cpu = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record['wall_seconds'] = time.perf_counter() - wall
+        record['cpu_seconds'] = time.process_time() - cpu
+        record['max_rss_bytes'] = max_rss()
+        _STACK.pop()
+
+        if profiler is not None:
+            record['profile'] = _filename(record, '.prof')
+            profiler.dump_stats(record['profile'])
+        if _enabled('trace', name):
+            stats = tracemalloc.take_snapshot().compare_to(base, 'lineno')
+            peak = max(_PEAKS.pop(), _peak(tracemalloc, start))
+            record['traced_peak_bytes'] = peak
+            if _PEAKS:
+                _PEAKS[-1] = max(_PEAKS[-1], peak)
+            record['top'] = [str(stat) for stat in stats[:TOP]]
+            if tracing:
+                tracemalloc.stop()
+        _RECORDS.append(record)
+
+
+def _peak(tracemalloc, start):
+    # Pico desde o início da etapa. Antes do Python 3.9 o pico não pode ser
+    # reiniciado e é o de todo o rastreamento: ele só pertence à etapa se
+    # tiver aumentado durante ela, senão utiliza-se a maior memória
+    # alocada no início e no final da etapa
+    current, peak = tracemalloc.get_traced_memory()
+    if hasattr(tracemalloc, 'reset_peak') or peak > start[1]:
+        return peak
+    return max(start[0], current)
+
+
+def records():
+    """Registros das etapas concluídas, na ordem de conclusão."""
+    return list(_RECORDS)
+
+
+def extend(items):
+    """Acrescenta registros obtidos em outro processo, ver `collect`."""
+    _RECORDS.extend(items)
+
+
+def reset():
+    """Descarta os registros."""
+    del _RECORDS[:]
+
+
+@contextmanager
+def collect():
+    """Retira os registros das etapas concluídas dentro do bloco e os
+    retorna em uma lista. Utilizado nos processos de trabalho, cujos
+    registros são enviados ao processo principal junto com o resultado.
+    """
+    start = len(_RECORDS)
+    items = []
+    try:
+        yield items
+    finally:
+        items.extend(_RECORDS[start:])
+        del _RECORDS[start:]
+
+
+def to_json(items):
+    """Registros em JSON."""
+    return json.dumps({'stages': items}, indent=2)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"') \
+        .replace('\n', r'\n')
+
+
+def to_openmetrics(items):
+    """Registros no formato de texto OpenMetrics.
+
+    As execuções de uma mesma etapa com os mesmos `labels` são agregadas:
+    os tempos e as linhas são somados e os picos de memória são o máximo.
+    """
+    groups = OrderedDict()
+    for record in items:
+        labels = OrderedDict([('stage', record['stage'])])
+        labels.update((k, v) for k, v in record['labels'].items())
+        key = tuple(labels.items())
+        groups.setdefault(key, []).append(record)
+
+    lines = []
+    for metric, unit, field, agg, text in METRICS:
+        name = '{}_{}'.format(PREFIX, metric)
+        samples = []
+        for key, group in groups.items():
+            if field is None:
+                value = agg(group)
+            else:
+                values = [r.get(field) for r in group
+                          if r.get(field) is not None]
+                if not values:
+                    continue
+                value = agg(values)
+            labels = ','.join('{}="{}"'.format(k, _escape(v))
+                              for k, v in key)
+            samples.append('{}{{{}}} {}'.format(name, labels, value))
+        if not samples:
+            continue
+        lines.append('# TYPE {} gauge'.format(name))
+        if unit is not None:
+            lines.append('# UNIT {} {}'.format(name, unit))
+        lines.append('# HELP {} {}'.format(name, text))
+        lines.extend(samples)
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+def write(filename, items=None):
+    """Salva os registros em `filename`, em JSON se a extensão for `.json`
+    e no formato OpenMetrics nos demais casos.
+    """
+    items = records() if items is None else items
+    if filename.endswith('.json'):
+        text = to_json(items)
+    else:
+        text = to_openmetrics(items)
+    with open(filename, 'w') as f:
+        f.write(text)
+    return filename
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Relevância das características pela informação mútua.
+
+A informação mútua de cada característica com o alvo é obtida das tabelas
+de contagem (característica, alvo), que podem ser somadas entre blocos ou
+partes do banco de dados. Para as características categóricas ela é exata,
+calculada a partir da tabela de contingência. O estimador por vizinhos mais
+próximos do Scikit-learn é utilizado apenas para as características
+contínuas, uma coluna por vez e em paralelo, com as colunas reconstruídas
+da tabela e ordenadas pelo valor, portanto a estimativa não depende da
+ordem das linhas.
+
+Os resultados são memorizados pelo conteúdo de cada tabela, assim uma
+característica utilizada em mais de uma análise sobre os mesmos dados só é
+avaliada uma vez.
+"""
+
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# Parâmetros do estimador por vizinhos mais próximos
+N_NEIGHBORS = 3
+RANDOM_STATE = 0
+
+# Resultados já calculados, indexados pelo conteúdo das tabelas
+_CACHE = {}
+
+
+def _codes(index):
+    # Códigos dos níveis de um MultiIndex, `labels` antes do Pandas 0.24
+    return index.codes if hasattr(index, 'codes') else index.labels
+
+
+def _fingerprint(table):
+    # Identifica o conteúdo de uma tabela de contagem pelos valores e pelos
+    # níveis e códigos do índice
+    digest = hashlib.sha1(str(table.dtype).encode())
+    digest.update(np.ascontiguousarray(table.values).view(np.uint8))
+    for name, level, codes in zip(table.index.names, table.index.levels,
+                                  _codes(table.index)):
+        digest.update(str(name).encode())
+        if level.dtype.kind in 'biuf':
+            digest.update(str(level.dtype).encode())
+            digest.update(np.ascontiguousarray(level.values).view(np.uint8))
+        else:
+            digest.update(str(level.tolist()).encode())
+        digest.update(np.ascontiguousarray(codes).view(np.uint8))
+    return digest.hexdigest()
+
+
+def plugin(counts):
+    """Informação mútua, em nats, de uma tabela de contingência 2D."""
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.sum()
+    if n == 0:
+        return 0.0
+    p_xy = counts / n
+    p_x = p_xy.sum(axis=1, keepdims=True)
+    p_y = p_xy.sum(axis=0, keepdims=True)
+    nz = p_xy > 0
+    ratio = p_xy[nz] / (p_x * p_y)[nz]
+    return float(np.sum(p_xy[nz] * np.log(ratio)))
+
+
+def knn(x, y):
+    """Informação mútua, em nats, entre uma coluna contínua e um alvo
+    discreto pelo estimador de vizinhos mais próximos do Scikit-learn.
+    """
+    import sklearn.feature_selection as fs
+
+    x = np.asarray(x, dtype=np.float64).reshape(-1, 1)
+    mi = fs.mutual_info_classif(x, y, discrete_features=False,
+                                n_neighbors=N_NEIGHBORS,
+                                random_state=RANDOM_STATE)
+    return float(mi[0])
+
+
+def _expand(table):
+    # Reconstrói as colunas (valor, código do alvo) de uma tabela de contagem
+    table = table[table > 0]
+    x = table.index.get_level_values(0).values
+    y = np.asarray(_codes(table.index)[1])
+    return np.repeat(x, table.values), np.repeat(y, table.values)
+
+
+def _is_discrete_table(table):
+    return table.index.levels[0].dtype.kind not in 'iuf'
+
+
+def from_tables(tables, jobs=None, discrete=()):
+    """Informação mútua de cada característica a partir das tabelas de
+    contagem (característica, alvo) em `tables`, indexadas pela
+    característica.
+
+    Retorna uma `Series` com todas as características, ordenada da mais
+    relevante para a menos relevante. As características contínuas são
+    avaliadas em paralelo em `jobs` threads. As características de
+    `discrete`, ex.: as classes dos histogramas do modo aproximado, são
+    avaliadas pela tabela de contingência mesmo com valores numéricos.
+    """
+    result = {}
+    pending = []
+    for col, table in tables.items():
+        is_discrete = col in discrete or _is_discrete_table(table)
+        key = (_fingerprint(table), is_discrete)
+        if key in _CACHE:
+            result[col] = _CACHE[key]
+        elif is_discrete:
+            counts = table.unstack(fill_value=0).values
+            result[col] = _CACHE[key] = plugin(counts)
+        else:
+            pending.append((col, key))
+
+    if pending:
+        workers = min(len(pending), jobs or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(col, key, pool.submit(knn, *_expand(tables[col])))
+                       for col, key in pending]
+            for col, key, future in futures:
+                result[col] = _CACHE[key] = future.result()
+
+    ranking = pd.Series(result)[list(tables)]
+    return ranking.sort_values(ascending=False, kind='mergesort')
+
+
+def clear():
+    """Descarta os resultados memorizados."""
+    _CACHE.clear()
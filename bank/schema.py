@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""Esquema de tipos do banco de dados derivado do arquivo `bank-names.txt`.
+
+Os atributos e os níveis das variáveis categóricas são obtidos da descrição
+distribuída junto com o banco de dados (`bank-names.txt` ou
+`bank-additional-names.txt`). As variáveis numéricas utilizam tipos inteiros
+compactos, declarados em `NUMERIC`. Assim, o DataFrame é criado diretamente
+com os tipos finais, sem a cópia intermediária com colunas do tipo 'object'.
+"""
+
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Versão do esquema, faz parte da chave do cache colunar
+VERSION = 1
+
+# Tipos compactos das variáveis numéricas. A descrição do banco de dados
+# informa apenas que a variável é numérica, os tipos abaixo comportam os
+# valores das versões 'full' e 'additional'
+NUMERIC = {
+    'age': 'int8',
+    'balance': 'int32',
+    'day': 'int8',
+    'duration': 'int16',
+    'campaign': 'int16',
+    'pdays': 'int16',
+    'previous': 'int16',
+    'emp.var.rate': 'float32',
+    'cons.price.idx': 'float32',
+    'cons.conf.idx': 'float32',
+    'euribor3m': 'float32',
+    'nr.employed': 'float32',
+}
+
+# Níveis abreviados na descrição com '...'
+LEVELS = {
+    'month': ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep',
+              'oct', 'nov', 'dec'],
+}
+
+# Número de linhas lidas por vez, limita a memória das colunas intermediárias
+CHUNKSIZE = 1 << 18
+
+_ENTRY = re.compile(r'^\s*\d+\s+-\s+', re.M)
+_NAME = re.compile(r'\s*([\w.]+)')
+_SPEC = re.compile(r'\((categorical|binary|numeric)\s*([:,][^)]*)?\)')
+_LEVEL = re.compile(r'["\']([^"\']*)["\']')
+
+
+def names_file(dataset):
+    """Retorna o arquivo de descrição correspondente ao arquivo `dataset`."""
+    if dataset.startswith('bank-additional'):
+        return 'bank-additional-names.txt'
+    return 'bank-names.txt'
+
+
+def parse(text):
+    """Obtém os atributos e níveis categóricos da descrição do banco de dados.
+
+    Retorna um dicionário ordenado com o nome de cada atributo e a lista dos
+    seus níveis, ou `None` para os atributos numéricos.
+    """
+    start = text.find('Attribute information')
+    if start < 0:
+        raise ValueError('Descrição dos atributos não encontrada.')
+    text = text[start:]
+
+    attrs = OrderedDict()
+    for entry in _ENTRY.split(text)[1:]:
+        name = _NAME.match(entry)
+        spec = _SPEC.search(entry)
+        if name is None or spec is None:
+            continue
+        name = name.group(1)
+        if spec.group(1) == 'numeric':
+            attrs[name] = None
+            continue
+        # Ignora-se as observações após ';', que também podem conter aspas
+        body = (spec.group(2) or '').split(';')[0]
+        levels = _LEVEL.findall(body)
+        if '...' in body:
+            levels = LEVELS[name]
+        attrs[name] = levels
+    return attrs
+
+
+def dtypes(attrs):
+    """Retorna os tipos de cada atributo para a leitura do CSV.
+
+    As categorias são ordenadas alfabeticamente, da mesma forma que em
+    `astype('category')`, preservando os códigos utilizados nas análises.
+    Atributos numéricos sem um tipo declarado são omitidos.
+    """
+    types = OrderedDict()
+    for name, levels in attrs.items():
+        if levels is not None:
+            types[name] = pd.api.types.CategoricalDtype(sorted(levels))
+        elif name in NUMERIC:
+            types[name] = np.dtype(NUMERIC[name])
+    return types
+
+
+def _fit(values, dtype):
+    # Retorna o tipo declarado caso ele comporte os valores, senão o menor
+    # tipo inteiro que os comporte
+    if dtype.kind != 'i' or values.dtype.kind != 'i' or values.shape[0] == 0:
+        return dtype
+    lo, hi = values.min(), values.max()
+    info = np.iinfo(dtype)
+    if info.min <= lo and hi <= info.max:
+        return dtype
+    return np.promote_types(dtype, np.promote_types(np.min_scalar_type(lo),
+                                                    np.min_scalar_type(hi)))
+
+
+def convert(chunk, types):
+    """Aplica os tipos numéricos compactos e valida os níveis categóricos."""
+    for col, dtype in types.items():
+        if col not in chunk.columns:
+            continue
+        values = chunk[col]
+        if dtype.name == 'category':
+            if values.isnull().any():
+                raise ValueError('Valores não declarados na descrição do '
+                                 'atributo {}.'.format(col))
+        elif values.dtype.kind in 'iuf':
+            chunk[col] = values.astype(_fit(values.values, dtype))
+    return chunk
+
+
+def read_csv(f, types, chunksize=None):
+    """Lê o CSV aplicando os tipos de `types`.
+
+    As colunas categóricas são criadas na leitura. As numéricas são lidas em
+    blocos de `CHUNKSIZE` linhas e convertidas para os tipos compactos, pois
+    o leitor do Pandas não verifica o limite dos tipos inteiros. Se
+    `chunksize` for informado retorna um iterador de DataFrames.
+    """
+    categorical = {col: dtype for col, dtype in types.items()
+                   if dtype.name == 'category'}
+    reader = pd.read_csv(f, sep=';', dtype=categorical,
+                         chunksize=chunksize or CHUNKSIZE)
+    chunks = (convert(chunk, types) for chunk in reader)
+    if chunksize is not None:
+        return chunks
+    return pd.concat(chunks, ignore_index=True)
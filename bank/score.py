@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""Modelo de adesão à campanha (`y`) para priorizar as ligações.
+
+O modelo é treinado uma única vez e utilizado para pontuar listas de
+clientes de qualquer tamanho. Cada característica é convertida em códigos
+inteiros, os mesmos das análises: os códigos das categorias para as colunas
+categóricas e o número da faixa, entre quantis do treino, para as numéricas.
+Para cada código calcula-se o *weight of evidence*, o log da razão entre a
+frequência do código nos casos de sucesso e nos demais, e uma regressão
+logística do Scikit-learn atribui um peso a cada característica.
+
+Os pesos são incorporados às tabelas do *weight of evidence*, assim o modelo
+salvo é apenas uma tabela de contribuições por característica, com alguns
+kilobytes, e a pontuação de um bloco de linhas é uma soma de consultas a
+essas tabelas indexadas pelos códigos, sem nenhuma dependência do
+Scikit-learn.
+
+A lista de clientes, um CSV no formato do banco de dados (as colunas `y` e
+`duration` podem estar ausentes), é dividida em faixas de bytes que são
+lidas e pontuadas em paralelo, cada uma em um processo de trabalho.
+"""
+
+import io
+import os
+import json
+import tempfile
+import multiprocessing
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+
+
+# Versão do formato, alterações invalidam os modelos salvos
+VERSION = 1
+
+# Características utilizadas. A duração da ligação só é conhecida após a
+# ligação, portanto não é utilizada para priorizá-las
+FEATURES = ('age', 'job', 'marital', 'education', 'default', 'balance',
+            'housing', 'loan', 'contact', 'day', 'month', 'campaign',
+            'pdays', 'previous', 'poutcome')
+
+# Número de faixas das características numéricas
+BINS = 10
+
+# Suavização das frequências do *weight of evidence*
+SMOOTHING = 0.5
+
+# Tamanho, em bytes, da faixa do CSV pontuada por cada tarefa
+RANGE = 1 << 25
+
+
+def _edges(values, bins):
+    # Limites entre as faixas, quantis do treino sem repetições
+    q = np.linspace(0, 1, bins + 1)[1:-1]
+    return np.unique(np.percentile(values, q * 100))
+
+
+def encode(model, chunk):
+    """Códigos de cada característica do modelo para as linhas de `chunk`.
+
+    Valores não vistos no treino, ou nulos, recebem o código -1, cuja
+    contribuição é nula.
+    """
+    codes = []
+    for feature in model['features']:
+        values = chunk[feature]
+        if feature in model['levels']:
+            levels = model['levels'][feature]
+            dtype = getattr(values, 'dtype', None)
+            if dtype is not None and dtype.name == 'category' and \
+                    list(dtype.categories) == levels:
+                values = values.values.codes
+            else:
+                values = pd.Index(levels).get_indexer(values)
+            codes.append(np.asarray(values, dtype=np.intp))
+        else:
+            values = np.asarray(values, dtype=np.float64)
+            code = np.searchsorted(model['edges'][feature], values,
+                                   side='right').astype(np.intp)
+            code[np.isnan(values)] = -1
+            codes.append(code)
+    return codes
+
+
+def _woe(codes, y, width):
+    # *Weight of evidence* de cada código, a última posição (código -1) é
+    # nula
+    pos = np.bincount(codes[y], minlength=width).astype(np.float64)
+    neg = np.bincount(codes[~y], minlength=width).astype(np.float64)
+    pos = (pos + SMOOTHING) / (pos.sum() + SMOOTHING * width)
+    neg = (neg + SMOOTHING) / (neg.sum() + SMOOTHING * width)
+    return np.append(np.log(pos / neg), 0.0)
+
+
+def fit(df, features=FEATURES, target='y', positive='yes', bins=BINS,
+        holdout=0.2, seed=0):
+    """Treina o modelo com as linhas de `df`.
+
+    Uma fração `holdout` das linhas, sorteada com `seed`, não é utilizada no
+    treino e sim na avaliação do modelo (área sob a curva ROC, `auc`).
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import roc_auc_score
+
+    features = [f for f in features if f in df.columns]
+    model = OrderedDict([
+        ('version', VERSION),
+        ('target', target),
+        ('positive', positive),
+        ('features', features),
+        ('levels', OrderedDict()),
+        ('edges', OrderedDict()),
+    ])
+    rng = np.random.RandomState(seed)
+    test = rng.random_sample(len(df)) < holdout
+    for feature in features:
+        values = df[feature]
+        if values.dtype.name == 'category':
+            model['levels'][feature] = list(values.cat.categories)
+        else:
+            model['edges'][feature] = _edges(
+                np.asarray(values)[~test], bins)
+
+    codes = encode(model, df)
+    y = np.asarray(df[target] == positive)
+    widths = [len(model['levels'][f]) if f in model['levels'] else
+              len(model['edges'][f]) + 1 for f in features]
+    woe = [_woe(c[~test], y[~test], w) for c, w in zip(codes, widths)]
+
+    x = np.column_stack([w[c] for w, c in zip(woe, codes)])
+    clf = LogisticRegression(C=1.0, solver='lbfgs')
+    clf.fit(x[~test], y[~test])
+
+    # Os pesos são incorporados às tabelas
+    model['intercept'] = float(clf.intercept_[0])
+    model['tables'] = [w * b for w, b in zip(woe, clf.coef_[0])]
+    model['rows'] = int((~test).sum())
+    model['auc'] = float(roc_auc_score(y[test], clf.decision_function(
+        x[test]))) if test.any() and y[test].any() else None
+    return model
+
+
+def decision(model, codes):
+    """Log da chance de adesão de cada linha, a partir dos códigos."""
+    total = np.full(len(codes[0]) if codes else 0, model['intercept'])
+    for table, code in zip(model['tables'], codes):
+        total += table[code]
+    return total
+
+
+def predict(model, chunk):
+    """Probabilidade de adesão de cada linha de `chunk`."""
+    return 1 / (1 + np.exp(-decision(model, encode(model, chunk))))
+
+
+def save(model, filename):
+    """Salva o modelo comprimido em `filename` (.npz)."""
+    meta = OrderedDict((k, model[k]) for k in
+                       ('version', 'target', 'positive', 'features',
+                        'levels', 'intercept', 'rows', 'auc'))
+    arrays = {'table_{}'.format(i): t for i, t in enumerate(model['tables'])}
+    arrays.update(('edges_{}'.format(f), e)
+                  for f, e in model['edges'].items())
+    path = os.path.dirname(filename) or '.'
+    if not os.path.exists(path):
+        os.makedirs(path)
+    fd, tmp = tempfile.mkstemp(dir=path, suffix='.npz')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, filename)
+    return filename
+
+
+def load(filename):
+    """Carrega um modelo salvo com `save`."""
+    with np.load(filename) as f:
+        meta = json.loads(str(f['meta']), object_pairs_hook=OrderedDict)
+        if meta['version'] != VERSION:
+            raise ValueError('Versão do modelo não suportada: {}'.format(
+                meta['version']))
+        model = OrderedDict(meta)
+        model['edges'] = OrderedDict(
+            (feature, f['edges_' + feature]) for feature in meta['features']
+            if feature not in meta['levels'])
+        model['tables'] = [f['table_{}'.format(i)]
+                           for i in range(len(meta['features']))]
+    return model
+
+
+def ranges(filename, size=RANGE):
+    """Divide o CSV `filename` em faixas de bytes de aproximadamente `size`
+    bytes, terminadas em fim de linha. Retorna o cabeçalho e as faixas
+    `(início, fim)`.
+    """
+    with open(filename, 'rb') as f:
+        header = f.readline()
+        end = os.fstat(f.fileno()).st_size
+        start, result = f.tell(), []
+        while start < end:
+            f.seek(min(start + size, end))
+            f.readline()
+            stop = min(f.tell(), end)
+            result.append((start, stop))
+            start = stop
+    return header, result
+
+
+def _columns(model, header):
+    # Nomes das colunas do CSV e os tipos das colunas categóricas
+    names = [name.strip('"') for name in
+             header.decode('utf-8').strip().split(';')]
+    types = {f: pd.api.types.CategoricalDtype(levels)
+             for f, levels in model['levels'].items()}
+    return names, types
+
+
+def _score_range(args):
+    # Lê e pontua uma faixa do CSV
+    model, filename, names, types, start, stop = args
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    chunk = pd.read_csv(io.BytesIO(data), sep=';', header=None, names=names,
+                        usecols=model['features'], dtype=types)
+    return predict(model, chunk).astype(np.float32)
+
+
+def _format_range(args):
+    # Pontua uma faixa e formata as probabilidades, uma por linha, no
+    # próprio processo de trabalho
+    result = _score_range(args)
+    text = '\n'.join(np.char.mod('%.6f', result)) + '\n' if result.size \
+        else ''
+    return result.size, text.encode()
+
+
+def _run(func, model, filename, jobs, size):
+    # Aplica `func` a cada faixa do CSV, em `jobs` processos, na ordem do
+    # arquivo
+    header, parts = ranges(filename, size)
+    names, types = _columns(model, header)
+    tasks = [(model, filename, names, types, start, stop)
+             for start, stop in parts]
+    jobs = min(jobs or multiprocessing.cpu_count(), max(len(tasks), 1))
+    if jobs <= 1:
+        for result in map(func, tasks):
+            yield result
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            for result in pool.imap(func, tasks):
+                yield result
+
+
+def score(model, filename, jobs=1, size=RANGE):
+    """Pontua as linhas do CSV `filename` em `jobs` processos.
+
+    Retorna um iterador com as probabilidades de cada faixa de linhas, na
+    ordem do arquivo.
+    """
+    with instrument.stage('score') as record:
+        record['rows'] = 0
+        for result in _run(_score_range, model, filename, jobs, size):
+            record['rows'] += result.size
+            yield result
+
+
+def write(model, filename, path_out, jobs=1, size=RANGE):
+    """Pontua as linhas do CSV `filename` em `jobs` processos e salva a
+    probabilidade de adesão de cada linha em `path_out`, na ordem do
+    arquivo. Retorna o número de linhas.
+    """
+    with instrument.stage('score') as record, open(path_out, 'wb') as f:
+        record['rows'] = 0
+        f.write(b'score\n')
+        for rows, text in _run(_format_range, model, filename, jobs, size):
+            f.write(text)
+            record['rows'] += rows
+    return record['rows']
+
+
+def importance(model):
+    """Amplitude das contribuições de cada característica, uma medida da
+    sua importância no modelo, em ordem decrescente.
+    """
+    spread = [float(t[:-1].max() - t[:-1].min()) for t in model['tables']]
+    return pd.Series(spread, index=model['features']).sort_values(
+        ascending=False, kind='mergesort')
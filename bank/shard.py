@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""Execução *map/reduce* sobre partes (*shards*) do banco de dados.
+
+O banco de dados pode estar dividido em vários arquivos CSV, por exemplo um
+por mês da coluna `month`. Cada parte é reduzida independentemente às
+tabelas de contagem de `bank.stream.TABLES` (etapa *map*), que podem ser
+salvas e enviadas a um único processo que as soma (etapa *reduce*). Como as
+tabelas são contagens exatas, o resultado da soma é idêntico às tabelas
+obtidas do arquivo completo, e as questões calculadas a partir dele também.
+
+Os resultados parciais são salvos como arrays NumPy (`.partial.npz`), e
+não como objetos serializados, assim o *reduce* não executa código de um
+arquivo recebido.
+
+Localmente as partes são processadas em paralelo em um conjunto de
+processos, cada um fazendo o papel de um nó.
+"""
+
+import os
+import csv
+import glob
+import json
+import tempfile
+import multiprocessing
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import schema
+from . import instrument
+from . import stream
+
+
+# Extensões das partes e dos resultados parciais
+SUFFIX = '.csv'
+PARTIAL = '.partial.npz'
+
+# Versão do formato dos resultados parciais
+VERSION = 1
+
+
+def split(df, path, by='month'):
+    """Divide `df` em um arquivo CSV por nível da coluna `by`.
+
+    Os arquivos têm o mesmo formato do banco de dados original e são salvos
+    no diretório `path`. Retorna a lista dos arquivos.
+    """
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    filenames = []
+    for level in df[by].cat.categories:
+        part = df[df[by] == level]
+        if part.shape[0] == 0:
+            continue
+        filename = os.path.join(path, '{}={}{}'.format(by, level, SUFFIX))
+        part.to_csv(filename, sep=';', index=False,
+                    quoting=csv.QUOTE_NONNUMERIC)
+        filenames.append(filename)
+    return filenames
+
+
+def files(path):
+    """Arquivos das partes no diretório `path`, em ordem alfabética."""
+    return sorted(glob.glob(os.path.join(path, '*' + SUFFIX)))
+
+
+def chunks(filename, types, chunksize=schema.CHUNKSIZE):
+    """Itera sobre uma parte em blocos de `chunksize` linhas."""
+    with open(filename, 'rb') as f:
+        for chunk in schema.read_csv(f, types, chunksize):
+            # Mesmo tratamento de `bank.data.load`
+            yield chunk.dropna()
+
+
+def partial(filename, types, sketches=None, chunksize=schema.CHUNKSIZE):
+    """Etapa *map*: reduz a parte `filename` às tabelas de contagem."""
+    return stream.aggregate(chunks(filename, types, chunksize),
+                            sketches=sketches)
+
+
+def _partial(args):
+    # Os registros da instrumentação são retornados com o resultado
+    with instrument.collect() as records:
+        with instrument.stage('shard.partial',
+                              shard=os.path.basename(args[0])):
+            result = partial(*args)
+    return result, records
+
+
+def _results(tasks):
+    for result, records in tasks:
+        instrument.extend(records)
+        yield result
+
+
+def _array(arrays, values):
+    # Guarda `values` entre os arrays do arquivo, retorna o seu nome
+    name = 'a{}'.format(len(arrays))
+    arrays[name] = np.asarray(values)
+    return name
+
+
+def _encode_series(series, arrays):
+    index = series.index
+    if not isinstance(index, pd.MultiIndex):
+        index = pd.MultiIndex.from_arrays([index])
+    labels = index.codes if hasattr(index, 'codes') else index.labels
+    return OrderedDict([
+        ('names', list(index.names)),
+        ('levels', [level.tolist() for level in index.levels]),
+        ('codes', [_array(arrays, codes) for codes in labels]),
+        ('values', _array(arrays, series.values)),
+        ('multi', isinstance(series.index, pd.MultiIndex)),
+    ])
+
+
+def _decode_series(meta, arrays):
+    levels = [pd.Index(level) for level in meta['levels']]
+    codes = [arrays[name] for name in meta['codes']]
+    if meta['multi']:
+        # `codes` a partir do Pandas 0.24, `labels` nas versões anteriores
+        key = 'codes' if hasattr(pd.MultiIndex, 'codes') else 'labels'
+        index = pd.MultiIndex(levels=levels, names=meta['names'],
+                              **{key: codes})
+    else:
+        index = levels[0][codes[0]].rename(meta['names'][0])
+    return pd.Series(arrays[meta['values']], index=index)
+
+
+def _encode_summary(summary, arrays):
+    kll = summary['kll']
+    return OrderedDict([
+        ('n', summary['n']),
+        ('sum', summary['sum']),
+        ('width', summary['width']),
+        ('bins', _encode_series(summary['bins'], arrays)),
+        ('kll', OrderedDict([
+            ('k', kll['k']),
+            ('n', kll['n']),
+            ('levels', [_array(arrays, level) for level in kll['levels']]),
+            ('offsets', list(kll['offsets'])),
+        ])),
+    ])
+
+
+def _decode_summary(meta, arrays):
+    kll = meta['kll']
+    return OrderedDict([
+        ('n', meta['n']),
+        ('sum', meta['sum']),
+        ('width', meta['width']),
+        ('bins', _decode_series(meta['bins'], arrays)),
+        ('kll', {'k': kll['k'], 'n': kll['n'],
+                 'levels': [arrays[name] for name in kll['levels']],
+                 'offsets': list(kll['offsets'])}),
+    ])
+
+
+def save(result, filename):
+    """Salva um resultado parcial para ser enviado ao *reduce*.
+
+    As tabelas e os sketches são salvos como arrays em um arquivo `.npz`,
+    com a descrição em JSON, sem serializar objetos Python.
+    """
+    arrays, tables = OrderedDict(), OrderedDict()
+    for name, value in result.items():
+        if isinstance(value, dict):
+            tables[name] = OrderedDict(
+                (str(level), _encode_summary(summary, arrays))
+                for level, summary in value.items())
+        else:
+            tables[name] = _encode_series(value, arrays)
+    meta = {'version': VERSION, 'tables': tables}
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filename) or '.',
+                               suffix='.part')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, filename)
+
+
+def load(filename):
+    """Carrega um resultado parcial salvo com `save`."""
+    try:
+        with np.load(filename, allow_pickle=False) as f:
+            meta = json.loads(str(f['meta']))
+            arrays = {name: f[name] for name in f.files if name != 'meta'}
+    except (IOError, ValueError, KeyError):
+        raise ValueError('Resultado parcial inválido: {}'.format(filename))
+    if meta.get('version') != VERSION:
+        raise ValueError('Versão do resultado parcial incompatível: '
+                         '{}'.format(filename))
+
+    result = OrderedDict()
+    for name, value in meta['tables'].items():
+        if 'values' in value:
+            result[name] = _decode_series(value, arrays)
+        else:
+            result[name] = OrderedDict(
+                (level, _decode_summary(summary, arrays))
+                for level, summary in value.items())
+    return result
+
+
+def partials(path):
+    """Resultados parciais salvos com `save` no diretório `path`."""
+    return [load(filename) for filename in
+            sorted(glob.glob(os.path.join(path, '*' + PARTIAL)))]
+
+
+def reduce(results):
+    """Etapa *reduce*: soma os resultados parciais `results`."""
+    total = None
+    for result in results:
+        total = stream.combine(total, result)
+    return total
+
+
+def run(filenames, types, jobs=None, sketches=None,
+        chunksize=schema.CHUNKSIZE):
+    """Executa o *map* de cada parte em `jobs` processos e o *reduce*.
+
+    Os resultados parciais são somados na ordem de `filenames`, e não na
+    ordem de conclusão, pois a combinação dos sketches depende da ordem.
+    """
+    tasks = [(filename, types, sketches, chunksize) for filename in filenames]
+    jobs = min(jobs or multiprocessing.cpu_count(), len(tasks))
+    if jobs <= 1:
+        return reduce(_results(map(_partial, tasks)))
+    with multiprocessing.Pool(jobs) as pool:
+        return reduce(_results(pool.imap(_partial, tasks)))
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Resumos aproximados (*sketches*) da distribuição de colunas numéricas.
+
+Para obter medianas, quantis e histogramas sem manter a coluna completa em
+memória, cada grupo (por exemplo o saldo dos clientes com e sem dívida) é
+resumido em uma única passagem pelos blocos de dados por:
+
+* um sketch KLL de quantis, cujo tamanho depende apenas do parâmetro `k` e,
+  logaritmicamente, do número de linhas. O erro do posto de cada quantil é
+  da ordem de `1.7 / k`;
+* um histograma de classes de largura fixa, alinhadas em zero, cujo tamanho
+  depende apenas da amplitude dos valores;
+* o número de linhas e a soma dos valores, para a média exata.
+
+Todos os resumos podem ser combinados (`merge`), assim os blocos ou partes
+do banco de dados podem ser resumidos separadamente.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import crosstab
+
+
+# Parâmetro de precisão do sketch KLL
+K = 200
+
+# Fator de redução da capacidade de cada nível do sketch KLL
+C = 2 / 3
+
+# Largura das classes dos histogramas de cada coluna
+WIDTH = OrderedDict([
+    ('balance', 500),
+    ('age', 4),
+])
+
+# Resumos utilizados nas questões: coluna resumida por nível da coluna-chave
+SKETCHES = OrderedDict([
+    ('balance_default_sketch', ('balance', 'default')),
+    ('age_housing_sketch', ('age', 'housing')),
+])
+
+
+def kll(k=K):
+    """Sketch KLL vazio com parâmetro de precisão `k`."""
+    return {'k': k, 'n': 0, 'levels': [np.empty(0)], 'offsets': [0]}
+
+
+def _capacity(k, height, level):
+    # Os níveis mais altos, de maior peso, têm maior capacidade
+    return max(2, int(np.ceil(k * C ** (height - level - 1))))
+
+
+def _compress(sketch):
+    # Compacta os níveis acima da capacidade: os itens são ordenados e
+    # metade deles, alternadamente os de posição par e ímpar, é promovida ao
+    # nível seguinte com o dobro do peso
+    levels, offsets = sketch['levels'], sketch['offsets']
+    changed = True
+    while changed:
+        changed = False
+        for h in range(len(levels)):
+            if levels[h].size <= _capacity(sketch['k'], len(levels), h):
+                continue
+            if h + 1 == len(levels):
+                levels.append(np.empty(0))
+                offsets.append(0)
+            items = np.sort(levels[h])
+            odd = items.size % 2
+            promoted = items[odd + offsets[h]::2]
+            offsets[h] = 1 - offsets[h]
+            levels[h] = items[:odd]
+            levels[h + 1] = np.concatenate([levels[h + 1], promoted])
+            changed = True
+    return sketch
+
+
+def update(sketch, values):
+    """Adiciona os valores `values` ao sketch KLL."""
+    values = np.asarray(values, dtype=np.float64)
+    sketch['n'] += values.size
+    sketch['levels'][0] = np.concatenate([sketch['levels'][0], values])
+    return _compress(sketch)
+
+
+def _weighted(sketch):
+    # Itens ordenados e os seus pesos, 2 ** nível
+    items = np.concatenate(sketch['levels'])
+    weights = np.concatenate([np.full(level.size, 2.0 ** h)
+                              for h, level in enumerate(sketch['levels'])])
+    order = np.argsort(items, kind='mergesort')
+    return items[order], weights[order]
+
+
+def quantile(sketch, q):
+    """Quantil `q` aproximado dos valores do sketch KLL."""
+    items, weights = _weighted(sketch)
+    if items.size == 0:
+        return np.nan
+    cum = np.cumsum(weights)
+    i = np.searchsorted(cum, q * cum[-1], side='left')
+    return float(items[min(i, items.size - 1)])
+
+
+def cdf(sketch, x, strict=False):
+    """Fração aproximada dos valores menores ou iguais a `x`, ou apenas
+    menores com `strict=True`.
+    """
+    items, weights = _weighted(sketch)
+    if items.size == 0:
+        return np.nan
+    side = 'left' if strict else 'right'
+    i = np.searchsorted(items, x, side=side)
+    return float(weights[:i].sum() / weights.sum())
+
+
+def _level(sketch, h):
+    if h < len(sketch['levels']):
+        return sketch['levels'][h]
+    return np.empty(0)
+
+
+def _offset(sketch, h):
+    if h < len(sketch['offsets']):
+        return sketch['offsets'][h]
+    return 0
+
+
+def _merge_kll(a, b):
+    # Os itens de mesmo peso são unidos e os níveis compactados novamente.
+    # A alternância das posições promovidas de cada nível combina a dos dois
+    # sketches, assim o resultado não depende da ordem de `a` e `b`
+    height = max(len(a['levels']), len(b['levels']))
+    levels = [np.concatenate([_level(a, h), _level(b, h)])
+              for h in range(height)]
+    offsets = [(_offset(a, h) + _offset(b, h)) % 2 for h in range(height)]
+    sketch = {'k': min(a['k'], b['k']), 'n': a['n'] + b['n'],
+              'levels': levels, 'offsets': offsets}
+    return _compress(sketch)
+
+
+def bins(values, width):
+    """Histograma de classes de largura fixa `width`, alinhadas em zero.
+
+    Retorna uma `Series` com o número de valores de cada classe, indexada
+    pelo número da classe, `floor(valor / width)`.
+    """
+    values = np.floor_divide(np.asarray(values, dtype=np.float64), width)
+    if values.size == 0:
+        return pd.Series([], dtype='int64')
+    lo = int(values.min())
+    counts = np.bincount((values - lo).astype(np.intp))
+    index = np.arange(lo, lo + counts.size)
+    return pd.Series(counts, index=index)[counts > 0]
+
+
+def histogram(summary):
+    """Histograma do resumo `summary` no formato de `np.histogram`."""
+    counts = summary['bins']
+    lo, hi = int(counts.index.min()), int(counts.index.max())
+    counts = counts.reindex(np.arange(lo, hi + 1), fill_value=0)
+    edges = np.arange(lo, hi + 2) * float(summary['width'])
+    return OrderedDict([('counts', counts.values), ('edges', edges)])
+
+
+def mean(summary):
+    """Média exata dos valores do resumo `summary`."""
+    return summary['sum'] / summary['n']
+
+
+def summarize(values, width, k=K):
+    """Resume os valores `values` de um grupo."""
+    values = np.asarray(values)
+    return OrderedDict([
+        ('n', int(values.size)),
+        ('sum', float(values.sum(dtype=np.float64))),
+        ('width', width),
+        ('bins', bins(values, width)),
+        ('kll', update(kll(k), values)),
+    ])
+
+
+def merge(a, b):
+    """Combina dois resumos de um mesmo grupo."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return OrderedDict([
+        ('n', a['n'] + b['n']),
+        ('sum', a['sum'] + b['sum']),
+        ('width', a['width']),
+        ('bins', a['bins'].add(b['bins'], fill_value=0).astype('int64')),
+        ('kll', _merge_kll(a['kll'], b['kll'])),
+    ])
+
+
+def group(chunk, col, key, k=K):
+    """Resume a coluna `col` de `chunk` para cada nível da coluna `key`.
+
+    Retorna um dicionário com o resumo de cada nível presente em `chunk`.
+    """
+    width = WIDTH.get(col, 1)
+    codes, levels = crosstab.factorize(chunk[key])
+    values = np.asarray(chunk[col])
+    result = OrderedDict()
+    for i, level in enumerate(levels):
+        mask = codes == i
+        if mask.any():
+            result[level] = summarize(values[mask], width, k)
+    return result
+
+
+def merge_groups(a, b):
+    """Combina os resumos por nível de dois blocos."""
+    if a is None:
+        return b
+    result = OrderedDict(a)
+    for level, summary in b.items():
+        result[level] = merge(result.get(level), summary)
+    return result
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Agregação em blocos (*streaming*) do banco de dados.
+
+O CSV é lido em blocos de linhas e cada bloco é reduzido a tabelas de
+contagem, que são somadas às tabelas dos blocos anteriores. Dessa forma a
+memória utilizada depende apenas do tamanho do bloco e do número de níveis
+das colunas agrupadas, e não do número de linhas do arquivo. O DataFrame
+completo também pode ser agregado como um único bloco, `aggregate([df])`,
+resultando nas mesmas tabelas.
+
+Opcionalmente, na mesma passagem, as colunas numéricas podem ser resumidas
+por grupo em sketches aproximados (ver `bank.sketch`). Nesse modo
+aproximado as tabelas das colunas numéricas não contam cada valor, mas as
+classes de largura fixa dos histogramas dos sketches, assim a memória não
+depende do número de valores distintos dessas colunas.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from . import data
+from . import schema
+from . import sketch
+from . import instrument
+from . import crosstab
+
+
+# Tabelas de contagem utilizadas nas questões
+TABLES = OrderedDict([
+    ('job_loan', ('job', 'housing', 'loan')),
+    ('campaign_y', ('campaign', 'y')),
+    ('poutcome_y', ('poutcome', 'y')),
+    ('loan_default', ('loan', 'default')),
+    ('education_housing', ('education', 'housing')),
+])
+
+# Dados pessoais dos clientes. Cada um é contado contra os alvos das questões
+# 5 e 6, a seleção de características utiliza apenas essas tabelas
+CLIENT = ('age', 'job', 'marital', 'education', 'default', 'balance',
+          'housing', 'loan')
+
+for _target in ('default', 'housing'):
+    for _col in CLIENT:
+        if _col != _target:
+            TABLES['{}_{}'.format(_col, _target)] = (_col, _target)
+del _col, _target
+
+# Sufixo das tabelas de classes do modo aproximado
+BINS = '_bins'
+
+
+def chunks(dataset=data.DATASET, path=data.PATH_DATA,
+           chunksize=schema.CHUNKSIZE, **kwargs):
+    """Itera sobre o banco de dados em blocos de `chunksize` linhas."""
+    types = data.read_schema(dataset, path, **kwargs)
+    with data.open_dataset(dataset, path, **kwargs) as f:
+        for chunk in schema.read_csv(f, types, chunksize):
+            # Mesmo tratamento de `bank.data.load`
+            yield chunk.dropna()
+
+
+def count(chunk, keys):
+    """Conta as ocorrências de cada combinação dos valores das colunas."""
+    return crosstab.table(chunk, keys)
+
+
+def count_bins(chunk, keys):
+    """Conta as ocorrências de cada combinação das colunas, com a primeira
+    coluna, numérica, agrupada nas classes de `bank.sketch.bins`.
+    """
+    col = keys[0]
+    columns = OrderedDict((key, chunk[key]) for key in keys)
+    columns[col] = np.floor_divide(np.asarray(chunk[col], dtype=np.float64),
+                                   sketch.WIDTH[col]).astype(np.int64)
+    return crosstab.table(columns, keys)
+
+
+def binned(tables=TABLES):
+    """Tabelas do modo aproximado: as tabelas de `tables` cuja primeira
+    coluna possui largura de classe em `bank.sketch.WIDTH` são substituídas
+    pelas tabelas das classes, com o sufixo `BINS`.
+
+    Retorna as tabelas contadas por valor e as tabelas contadas por classe.
+    """
+    exact, bins = OrderedDict(), OrderedDict()
+    for name, keys in tables.items():
+        if keys[0] in sketch.WIDTH:
+            bins[name + BINS] = keys
+        else:
+            exact[name] = keys
+    return exact, bins
+
+
+def merge(a, b):
+    """Soma duas tabelas de contagem, alinhando os seus índices."""
+    if a is None:
+        return b
+    return a.add(b, fill_value=0).astype('int64')
+
+
+def aggregate(chunks, tables=TABLES, sketches=None):
+    """Reduz os blocos `chunks` às tabelas de contagem `tables`.
+
+    `tables` associa o nome de cada tabela às colunas agrupadas. Retorna um
+    dicionário com as tabelas, uma `Series` indexada pelos valores das
+    colunas. `sketches` associa o nome de cada resumo à coluna resumida e à
+    coluna que define os grupos, ex.: `bank.sketch.SKETCHES`, e os resumos
+    de cada grupo são incluídos no resultado. Com `sketches` as tabelas
+    das colunas numéricas são contadas por classe (ver `binned`).
+    """
+    sketches = sketches or {}
+    bins = {}
+    if sketches:
+        tables, bins = binned(tables)
+    result = OrderedDict((name, None) for name in tables)
+    result.update((name, None) for name in bins)
+    result.update((name, None) for name in sketches)
+    with instrument.stage('stream.aggregate') as record:
+        record['rows'] = 0
+        for chunk in chunks:
+            record['rows'] += len(chunk)
+            for name, keys in tables.items():
+                result[name] = merge(result[name], count(chunk, keys))
+            for name, keys in bins.items():
+                result[name] = merge(result[name], count_bins(chunk, keys))
+            for name, (col, key) in sketches.items():
+                result[name] = sketch.merge_groups(
+                    result[name], sketch.group(chunk, col, key))
+    return result
+
+
+def combine(a, b):
+    """Soma dois resultados de `aggregate`, obtidos de partes diferentes do
+    banco de dados.
+    """
+    if a is None:
+        return b
+    result = OrderedDict(a)
+    for name, value in b.items():
+        if isinstance(value, dict):
+            result[name] = sketch.merge_groups(result.get(name), value)
+        else:
+            result[name] = merge(result.get(name), value)
+    return result
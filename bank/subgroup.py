@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""Descoberta de subgrupos com taxa de sucesso diferente da base.
+
+Procura-se as conjunções de condições `coluna = nível`, sobre colunas
+categóricas distintas, cujo percentual de sucesso do alvo (por exemplo
+`y = yes`) mais difere do percentual de todo o banco de dados. A qualidade
+de um subgrupo com `n` das `N` linhas e percentual `p`, contra o percentual
+`p0` da base, é a da família de Klösgen, `(n / N) ** a * (p - p0)`: com
+`a = 1` o *weighted relative accuracy* e com `a = 0.5` uma estatística
+próxima do teste binomial.
+
+As linhas de cada condição são representadas por um *bitset* (um bit por
+linha, `np.packbits`), e as linhas de uma conjunção são a interseção dos
+bitsets, contadas com uma tabela de 256 posições. A busca é em
+profundidade, e um ramo é descartado quando a estimativa otimista da
+qualidade de qualquer refinamento, obtida supondo-se que ele mantenha
+apenas as linhas de sucesso (ou apenas as demais), não supera o pior dos
+`top` melhores subgrupos já encontrados. Os ramos de primeiro nível são
+expandidos em paralelo.
+"""
+
+import heapq
+import multiprocessing
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import crosstab
+
+
+# Colunas categóricas utilizadas por padrão
+ATTRIBUTES = ('job', 'marital', 'education', 'default', 'housing', 'loan',
+              'contact', 'month', 'poutcome')
+
+# Número de linhas de cada valor de um byte
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Estado da busca compartilhado com os processos de trabalho (`fork`)
+_STATE = None
+
+
+def count(bits):
+    """Número de bits 1 do bitset `bits`."""
+    return int(POPCOUNT[bits].sum(dtype=np.int64))
+
+
+def selectors(df, attributes=ATTRIBUTES):
+    """Condições `coluna = nível` de cada coluna de `attributes`.
+
+    Retorna uma lista de `(índice da coluna, coluna, nível, bitset)`, apenas
+    dos níveis presentes em `df`.
+    """
+    result = []
+    for i, col in enumerate(attributes):
+        codes, levels = crosstab.factorize(df[col])
+        for j, level in enumerate(levels):
+            mask = codes == j
+            if mask.any():
+                result.append((i, col, level, np.packbits(mask)))
+    return result
+
+
+def quality(n, pos, total, positives, a=1.0):
+    """Qualidade de Klösgen de um subgrupo com `n` linhas e `pos` sucessos.
+    """
+    if n == 0:
+        return 0.0
+    return (n / total) ** a * (pos / n - positives / total)
+
+
+def optimistic(n, pos, total, positives, a=1.0, direction='both'):
+    """Maior qualidade, em valor absoluto, de qualquer refinamento de um
+    subgrupo com `n` linhas e `pos` sucessos. O limite só é válido para
+    `0 <= a <= 1`.
+    """
+    p0 = positives / total
+    up = (pos / total) ** a * (1 - p0)
+    down = ((n - pos) / total) ** a * p0
+    if direction == 'up':
+        return up
+    if direction == 'down':
+        return down
+    return max(up, down)
+
+
+def _score(q, direction):
+    # Valor ordenado pela busca, de acordo com a direção desejada
+    if direction == 'up':
+        return q
+    if direction == 'down':
+        return -q
+    return abs(q)
+
+
+def _push(heap, top, item):
+    # Mantém os `top` melhores subgrupos, o pior em `heap[0]`
+    if len(heap) < top:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def _search(first, threshold):
+    # Busca em profundidade a partir da condição `first`
+    sels, y, total, positives, depth, top, min_size, a, direction = _STATE
+    heap = []
+
+    def visit(bits, path, last):
+        n = count(bits)
+        if n < min_size:
+            return
+        pos = count(bits & y)
+        q = quality(n, pos, total, positives, a)
+        _push(heap, top, (_score(q, direction), path, n, pos, q))
+        if len(path) == depth:
+            return
+        bound = max(threshold, heap[0][0]) if len(heap) == top else threshold
+        if optimistic(n, pos, total, positives, a, direction) <= bound:
+            return
+        for k in range(last + 1, len(sels)):
+            if sels[k][0] > sels[path[-1]][0]:
+                visit(bits & sels[k][3], path + (k,), k)
+
+    visit(sels[first][3], (first,), first)
+    return heap
+
+
+def search(df, target='y', positive='yes', attributes=ATTRIBUTES, depth=3,
+           top=20, min_size=None, a=1.0, direction='both', jobs=1):
+    """Procura os `top` subgrupos de maior qualidade com até `depth`
+    condições.
+
+    `min_size` é o número mínimo de linhas de um subgrupo, por padrão 1% do
+    banco de dados. `direction` seleciona os subgrupos com percentual maior
+    (`up`), menor (`down`) ou diferente (`both`) da base. O expoente `a`
+    deve estar entre 0 e 1, senão a poda descartaria subgrupos válidos.
+    Retorna um DataFrame ordenado pela qualidade.
+    """
+    global _STATE
+
+    if not 0 <= a <= 1:
+        raise ValueError('Expoente inválido: {}, deve estar entre 0 e '
+                         '1'.format(a))
+
+    attributes = [col for col in attributes if col != target]
+    sels = selectors(df, attributes)
+    y = np.packbits(np.asarray(df[target] == positive))
+    total, positives = len(df), count(y)
+    if min_size is None:
+        min_size = max(1, int(0.01 * total))
+
+    # O limite inicial da poda é o pior dos melhores subgrupos de uma única
+    # condição, compartilhado por todos os ramos
+    first = sorted(
+        (_score(quality(count(s[3]), count(s[3] & y), total, positives, a),
+                direction), k)
+        for k, s in enumerate(sels) if count(s[3]) >= min_size)
+    threshold = first[-top][0] if len(first) >= top else -np.inf
+
+    _STATE = (sels, y, total, positives, depth, top, min_size, a, direction)
+    try:
+        tasks = range(len(sels))
+        jobs = min(jobs or multiprocessing.cpu_count(), len(sels))
+        if jobs <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            heaps = [_search(k, threshold) for k in tasks]
+        else:
+            with multiprocessing.get_context('fork').Pool(jobs) as pool:
+                heaps = pool.starmap(_search,
+                                     [(k, threshold) for k in tasks])
+    finally:
+        _STATE = None
+
+    heap = []
+    for item in (item for h in heaps for item in h):
+        _push(heap, top, item)
+
+    rows = []
+    for score, path, n, pos, q in sorted(heap, reverse=True):
+        conditions = [(sels[k][1], sels[k][2]) for k in path]
+        rows.append(OrderedDict([
+            ('subgroup', ' & '.join('{}={}'.format(c, lv)
+                                    for c, lv in conditions)),
+            ('depth', len(path)),
+            ('size', n),
+            ('positives', pos),
+            ('rate', pos / n),
+            ('lift', (pos / n) / (positives / total)),
+            ('quality', q),
+        ]))
+    columns = ['subgroup', 'depth', 'size', 'positives', 'rate', 'lift',
+               'quality']
+    return pd.DataFrame(rows, columns=columns)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Geração de bancos de dados sintéticos com as distribuições do original.
+
+Para avaliar o desempenho com milhões de linhas, as linhas sintéticas
+reproduzem as distribuições do banco de dados de origem:
+
+* a combinação dos níveis das colunas categóricas de cada linha (uma célula
+  de `bank.cube`) é sorteada com a frequência observada na origem, assim a
+  distribuição conjunta de todas as colunas categóricas é preservada;
+* cada coluna numérica é sorteada, independentemente das demais, entre os
+  valores das linhas de origem da mesma célula. Preserva-se portanto a
+  distribuição de cada coluna numérica e a sua relação com as colunas
+  categóricas (por exemplo `campaign` e `y`, `balance` e `default`).
+
+As linhas são geradas em blocos, com memória limitada pelo tamanho do bloco,
+e podem ser salvas no mesmo formato CSV do banco de dados.
+"""
+
+import os
+import csv
+import shutil
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import cube
+from . import data
+from . import schema
+from . import crosstab
+
+
+def model(df, dimensions=cube.DIMENSIONS):
+    """Modelo de geração a partir do DataFrame de origem `df`.
+
+    As linhas de `df` são ordenadas pela célula das colunas `dimensions`,
+    assim os valores numéricos de cada célula ficam contíguos.
+    """
+    dimensions = [dim for dim in dimensions if dim in df.columns]
+    factors = [crosstab.factorize(df[dim]) for dim in dimensions]
+    shape = tuple(len(levels) for _, levels in factors)
+    cell = np.ravel_multi_index([codes for codes, _ in factors], shape)
+
+    order = np.argsort(cell, kind='mergesort')
+    cells, starts, counts = np.unique(cell[order], return_index=True,
+                                      return_counts=True)
+    values = OrderedDict((col, np.asarray(df[col])[order])
+                         for col in df.columns if col not in dimensions)
+    return OrderedDict([
+        ('columns', list(df.columns)),
+        ('dimensions', dimensions),
+        ('levels', [levels for _, levels in factors]),
+        ('shape', shape),
+        ('cells', cells),
+        ('starts', starts),
+        ('counts', counts),
+        ('values', values),
+    ])
+
+
+def generate(source, rows, chunksize=schema.CHUNKSIZE, seed=0):
+    """Gera `rows` linhas a partir de `source`, um DataFrame ou um modelo
+    obtido com `model`, em blocos de até `chunksize` linhas.
+
+    A mesma semente `seed` gera sempre as mesmas linhas.
+    """
+    if isinstance(source, pd.DataFrame):
+        source = model(source)
+    rng = np.random.RandomState(seed)
+    counts = source['counts']
+    cum = np.cumsum(counts)
+
+    for start in range(0, rows, chunksize):
+        n = min(chunksize, rows - start)
+        k = np.searchsorted(cum, rng.randint(0, cum[-1], n), side='right')
+        codes = np.unravel_index(source['cells'][k], source['shape'])
+
+        columns = OrderedDict()
+        for col in source['columns']:
+            if col in source['dimensions']:
+                i = source['dimensions'].index(col)
+                columns[col] = pd.Categorical.from_codes(
+                    codes[i], source['levels'][i])
+            else:
+                # Uma linha de origem da mesma célula para cada coluna
+                pick = source['starts'][k] + \
+                    (rng.random_sample(n) * counts[k]).astype(np.intp)
+                columns[col] = source['values'][col][pick]
+        yield pd.DataFrame(columns, columns=source['columns'])
+
+
+def save(chunks, path, dataset=data.DATASET, path_data=data.PATH_DATA,
+         **kwargs):
+    """Salva as linhas `chunks` no diretório `path` como o arquivo
+    `dataset`, no formato do banco de dados, junto com a sua descrição.
+
+    O diretório pode ser utilizado no lugar de `data/`, ex.:
+    `python -m desafio run --data path`. Retorna o arquivo CSV.
+    """
+    if not os.path.exists(path):
+        os.makedirs(path)
+    names = schema.names_file(dataset)
+    with data.open_dataset(names, path_data, **kwargs) as src, \
+            open(os.path.join(path, names), 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+
+    filename = os.path.join(path, dataset)
+    header = True
+    with open(filename, 'w') as f:
+        for chunk in chunks:
+            chunk.to_csv(f, sep=';', index=False, header=header,
+                         quoting=csv.QUOTE_NONNUMERIC)
+            header = False
+    return filename
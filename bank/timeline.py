@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Índice temporal das ligações pelo dia, mês e `pdays`.
+
+O banco de dados não informa o ano das ligações, mas as linhas estão em
+ordem cronológica, de maio de 2008 a novembro de 2010, assim o ano é obtido
+contando as vezes em que o par (mês, dia) volta ao início do ano (`dates`).
+Linhas fora de ordem, como as de uma amostra embaralhada ou do banco de
+dados sintético, resultam em `ValueError`.
+
+As linhas são ordenadas pela data e agrupadas em baldes, um por dia com
+ligações. O índice guarda os dias em ordem crescente, a posição da primeira
+linha de cada balde na ordenação (`offsets`) e as somas acumuladas, por
+balde, do número de sucessos do alvo e das medidas (`campaign` e
+`duration`). Qualquer intervalo de datas é localizado por busca binária nos
+dias, e os totais do intervalo são diferenças das somas acumuladas, em
+O(log n); as linhas do intervalo, ou a série diária, custam O(log n + k).
+
+Um segundo índice, com a mesma estrutura, ordena as linhas por `pdays`, os
+dias desde o último contato de uma campanha anterior (-1 para os clientes
+nunca contatados), para as análises da adesão em função da recência.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# Meses na ordem do calendário
+MONTHS = ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep',
+          'oct', 'nov', 'dec')
+
+# Ano da primeira ligação do banco de dados
+START = 2008
+
+# Medidas somadas em cada balde
+MEASURES = ('campaign', 'duration')
+
+# Limites das faixas de `pdays` da análise de recência
+RECENCY = (0, 30, 90, 180, 365, 1000)
+
+
+def dates(df, start=START):
+    """Data de cada linha de `df`.
+
+    O ano começa em `start` e avança sempre que o (mês, dia) de uma linha é
+    anterior ao da linha anterior, o que supõe as linhas em ordem
+    cronológica. Uma volta ao início do ano só é aceita quando o mês
+    diminui, uma data anterior no mesmo mês indica linhas fora de ordem e
+    resulta em `ValueError`. Com `start=None` todas as linhas recebem o
+    mesmo ano (bissexto), e o índice passa a considerar apenas o mês e o
+    dia.
+    """
+    month = pd.Categorical(df['month'], categories=MONTHS).codes \
+        .astype(np.int64)
+    if (month < 0).any():
+        raise ValueError('Meses inválidos na coluna `month`')
+    day = np.asarray(df['day'], dtype=np.int64)
+    if start is None:
+        year = np.full(len(month), 2000, dtype=np.int64)
+    else:
+        wraps = np.diff(month * 32 + day) < 0
+        if (wraps & (np.diff(month) == 0)).any():
+            raise ValueError('Linhas fora de ordem cronológica, o ano das '
+                             'ligações não pode ser obtido')
+        year = start + np.concatenate([[0], np.cumsum(wraps)])
+    result = (year - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+    result = result + month.astype('timedelta64[M]')
+    return result.astype('datetime64[D]') + \
+        (day - 1).astype('timedelta64[D]')
+
+
+def _index(keys, y, measures):
+    # Ordena as linhas por `keys` e agrupa as chaves iguais em baldes, com
+    # as somas acumuladas de `y` e de cada medida
+    order = np.argsort(keys, kind='mergesort')
+    buckets, offsets = np.unique(keys[order], return_index=True)
+    offsets = np.append(offsets, len(keys)).astype(np.int64)
+    cum = OrderedDict()
+    for name, values in [('positives', y)] + list(measures.items()):
+        values = np.asarray(values)[order].astype(np.int64)
+        sums = np.add.reduceat(values, offsets[:-1]) if len(buckets) else \
+            np.empty(0, dtype=np.int64)
+        cum[name] = np.concatenate([[0], np.cumsum(sums)])
+    return OrderedDict([
+        ('keys', buckets),
+        ('offsets', offsets),
+        ('order', order.astype(np.int64)),
+        ('cum', cum),
+    ])
+
+
+def build(df, start=START, target='y', positive='yes', measures=MEASURES):
+    """Índices pela data (`dates`) e por `pdays` das linhas de `df`."""
+    y = np.asarray(df[target] == positive)
+    values = OrderedDict((col, df[col]) for col in measures)
+    return OrderedDict([
+        ('start', start),
+        ('rows', len(df)),
+        ('dates', _index(dates(df, start), y, values)),
+        ('pdays', _index(np.asarray(df['pdays']), y, values)),
+    ])
+
+
+def _key(index, value):
+    # Converte `value` para o tipo das chaves do índice
+    return np.asarray(value).astype(index['keys'].dtype)
+
+
+def locate(index, lo=None, hi=None):
+    """Intervalo `[i, j)` dos baldes com chaves entre `lo` e `hi`,
+    inclusive, em O(log n). Sem `lo` ou `hi` o intervalo não é limitado.
+    """
+    keys = index['keys']
+    i = 0 if lo is None else int(np.searchsorted(keys, _key(index, lo),
+                                                 side='left'))
+    j = len(keys) if hi is None else int(np.searchsorted(
+        keys, _key(index, hi), side='right'))
+    return i, max(i, j)
+
+
+def rows(index, lo=None, hi=None):
+    """Posições, em `df`, das linhas com chaves entre `lo` e `hi`, em ordem
+    crescente da chave.
+    """
+    i, j = locate(index, lo, hi)
+    return index['order'][index['offsets'][i]:index['offsets'][j]]
+
+
+def totals(index, lo=None, hi=None):
+    """Número de linhas, sucessos, percentual de sucesso e somas das
+    medidas das linhas com chaves entre `lo` e `hi`.
+    """
+    i, j = locate(index, lo, hi)
+    count = int(index['offsets'][j] - index['offsets'][i])
+    result = OrderedDict([('count', count)])
+    for name, cum in index['cum'].items():
+        result[name] = int(cum[j] - cum[i])
+    result['rate'] = result['positives'] / count if count else float('nan')
+    return result
+
+
+def _frame(index, keys, lo, hi):
+    # Totais dos intervalos de baldes `[lo, hi)` em um DataFrame
+    offsets = index['offsets']
+    count = offsets[hi] - offsets[lo]
+    data = OrderedDict([('count', count)])
+    for name, cum in index['cum'].items():
+        data[name] = cum[hi] - cum[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        data['rate'] = data['positives'] / count
+    return pd.DataFrame(data, index=pd.Index(keys, name='key'))
+
+
+def series(index, lo=None, hi=None):
+    """Totais de cada balde com chave entre `lo` e `hi`, em O(log n + k)."""
+    i, j = locate(index, lo, hi)
+    b = np.arange(i, j)
+    return _frame(index, index['keys'][i:j], b, b + 1)
+
+
+def rolling(index, window, lo=None, hi=None):
+    """Totais móveis de cada balde com chave entre `lo` e `hi`, sobre as
+    chaves da janela `(chave - window, chave]`, ex.: os últimos 30 dias.
+    """
+    i, j = locate(index, lo, hi)
+    keys = index['keys'][i:j]
+    if keys.dtype.kind == 'M':
+        step = np.timedelta64(window, 'D')
+    else:
+        step = window
+    first = np.searchsorted(index['keys'], keys - step, side='right')
+    return _frame(index, keys, first, np.arange(i, j) + 1)
+
+
+def recency(index, edges=RECENCY):
+    """Adesão por faixa de `pdays`, os dias desde o último contato.
+
+    As faixas são `[edges[k], edges[k + 1])`, precedidas dos clientes nunca
+    contatados (`pdays = -1`).
+    """
+    idx = index['pdays']
+    ranges = [('nunca', -1, -1)]
+    ranges += [('{}-{}'.format(a, b - 1), a, b - 1)
+               for a, b in zip(edges[:-1], edges[1:])]
+    records = OrderedDict(
+        (name, totals(idx, lo, hi)) for name, lo, hi in ranges)
+    return pd.DataFrame.from_dict(records, orient='index')
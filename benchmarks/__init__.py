@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Medidas de desempenho do desafio, executadas com o *airspeed velocity*."""
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compara o cálculo das tabelas de contagem das questões 1 a 6.
+
+São comparadas a abordagem original do `desafio.py`, que filtra o DataFrame
+com máscaras booleanas e chama `value_counts` para cada fatia, e as tabelas
+de contingência de `bank.crosstab`, obtidas com `np.bincount` sobre os
+códigos das categorias. Os dados maiores são obtidos repetindo as linhas do
+`bank-full.csv`.
+
+Uso:
+
+    python benchmarks/bench_crosstab.py --sizes 45211,4521100,45211000
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bank import data  # noqa: E402
+from bank import stream  # noqa: E402
+
+
+# Colunas utilizadas nas tabelas das questões
+COLUMNS = ['job', 'education', 'default', 'housing', 'loan', 'campaign',
+           'poutcome', 'y']
+
+# Tabelas das questões 1 a 6, as mesmas calculadas por `mask_and_count`. As
+# demais tabelas de `bank.stream.TABLES` utilizam colunas fora de `COLUMNS`
+TABLES = OrderedDict((name, stream.TABLES[name])
+                     for name in ('job_loan', 'campaign_y', 'poutcome_y',
+                                  'loan_default', 'education_housing'))
+
+
+def mask_and_count(df):
+    """Tabelas das questões 1 a 6 como calculadas no `desafio.py` original."""
+    result = []
+
+    # Questão 1
+    msk = (df[['housing', 'loan']] == 'yes').sum(axis=1) > 0
+    result.append(df['job'].value_counts())
+    result.append(df['job'][msk].value_counts())
+    result.append(df['job'][~msk].value_counts())
+    result.append(df['job'][df['housing'] == 'yes'].value_counts())
+    result.append(df['job'][df['loan'] == 'yes'].value_counts())
+
+    # Questões 2 e 3
+    result.append(df[df['y'] == 'yes']['campaign'].value_counts())
+    result.append(df[df['y'] == 'no']['campaign'].value_counts())
+    result.append(df['campaign'].value_counts())
+
+    # Questão 4
+    result.append(df[df['poutcome'] == 'success']['y'].value_counts())
+
+    # Questão 5
+    result.append(df['loan'].value_counts())
+    result.append(df['loan'][df['default'] == 'yes'].value_counts())
+    result.append(df['loan'][df['default'] == 'no'].value_counts())
+    result.append(df['default'][df['loan'] == 'yes'].value_counts())
+
+    # Questão 6
+    for col in ['job', 'education']:
+        result.append(df[col].value_counts())
+        result.append(df[col][df['housing'] == 'yes'].value_counts())
+        result.append(df[col][df['housing'] == 'no'].value_counts())
+    return result
+
+
+def kernel(df):
+    """Tabelas das questões 1 a 6 com `bank.crosstab`."""
+    return stream.aggregate([df], TABLES)
+
+
+def scale(df, rows):
+    """Repete as linhas de `df` até se obter `rows` linhas."""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype.name == 'category':
+            codes = np.resize(values.cat.codes.values, rows)
+            columns[col] = pd.Categorical.from_codes(codes,
+                                                     values.cat.categories)
+        else:
+            columns[col] = np.resize(values.values, rows)
+    return pd.DataFrame(columns, columns=df.columns)
+
+
+def best(func, df, repeat):
+    """Menor tempo, em segundos, de `repeat` execuções de `func(df)`."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default='45211,4521100,45211000',
+                        help='números de linhas separados por vírgula')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='número de repetições de cada medida')
+    args = parser.parse_args()
+
+    df = data.load()[COLUMNS]
+
+    print('{:>12} {:>14} {:>14} {:>10}'.format('linhas', 'máscaras (s)',
+                                               'bincount (s)', 'speedup'))
+    for rows in [int(n) for n in args.sizes.split(',')]:
+        sample = scale(df, rows)
+        t_mask = best(mask_and_count, sample, args.repeat)
+        t_kernel = best(kernel, sample, args.repeat)
+        print('{:>12} {:>14.4f} {:>14.4f} {:>9.1f}x'.format(
+            rows, t_mask, t_kernel, t_mask / t_kernel))
+        del sample
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Tempo de cada etapa da análise, medido com o *airspeed velocity* (asv).
+
+As etapas medidas separadamente são a leitura do CSV, a categorização das
+colunas, a leitura do snapshot colunar, as tabelas de contagem, cada
+questão, a seleção de características das questões 5 e 6 e a renderização
+de cada gráfico. Os bancos de dados utilizados são sintéticos (ver
+`bank.synthetic`), gerados a partir de `data/` uma única vez para cada
+número de linhas e reaproveitados nas execuções seguintes.
+
+Variáveis de ambiente:
+
+* `DESAFIO_BENCH_ROWS`: números de linhas separados por vírgula, por padrão
+  `45211,1000000`, ex.: `1000000,10000000,100000000`;
+* `DESAFIO_BENCH_DATA`: diretório dos bancos de dados sintéticos.
+
+Uso, a partir da raiz do repositório:
+
+    asv run                  # commit atual
+    asv continuous master HEAD
+    asv publish && asv preview
+"""
+
+import os
+import tempfile
+
+import pandas as pd
+
+from bank import data
+from bank import schema
+from bank import synthetic
+
+from desafio import plots
+from desafio import render
+from desafio import questions
+from desafio.questions import QUESTIONS
+
+
+ROWS = os.environ.get('DESAFIO_BENCH_ROWS', '45211,1000000')
+ROWS = [int(n) for n in ROWS.split(',')]
+
+PATH_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         '..', 'data')
+PATH_BENCH = os.environ.get(
+    'DESAFIO_BENCH_DATA', os.path.join(tempfile.gettempdir(), 'desafio-bench'))
+
+# Dados pessoais dos clientes, os mesmos das questões 5 e 6
+CLIENT = ['age', 'job', 'marital', 'education', 'balance', 'housing', 'loan']
+
+# Gera-se no máximo um banco de dados de 100 milhões de linhas, o tempo
+# limite de cada medida deve comportar a geração
+TIMEOUT = 3600
+
+
+def dataset(rows, seed=0):
+    """Diretório do banco de dados sintético de `rows` linhas, gerado caso
+    ainda não exista.
+    """
+    path = os.path.join(PATH_BENCH, '{}-{}'.format(rows, seed))
+    if not os.path.isfile(os.path.join(path, data.DATASET)):
+        df = data.load(data.DATASET, PATH_DATA, offline=True)
+        synthetic.save(synthetic.generate(df, rows, seed=seed), path,
+                       data.DATASET, PATH_DATA, offline=True)
+    return path
+
+
+class Load:
+    """Leitura do banco de dados."""
+
+    params = ROWS
+    param_names = ['rows']
+    timeout = TIMEOUT
+
+    def setup(self, rows):
+        self.path = dataset(rows)
+        self.types = data.read_schema(data.DATASET, self.path)
+        self.raw = pd.read_csv(os.path.join(self.path, data.DATASET),
+                               sep=';')
+        # Cria o snapshot colunar
+        data.load(data.DATASET, self.path)
+
+    def time_read_csv(self, rows):
+        with open(os.path.join(self.path, data.DATASET), 'rb') as f:
+            schema.read_csv(f, self.types)
+
+    def peakmem_read_csv(self, rows):
+        with open(os.path.join(self.path, data.DATASET), 'rb') as f:
+            schema.read_csv(f, self.types)
+
+    def time_categorize(self, rows):
+        # `categorize` altera o DataFrame, cada medida utiliza uma cópia
+        data.categorize(self.raw.copy())
+
+    def time_snapshot(self, rows):
+        data.load(data.DATASET, self.path)
+
+
+class Tables:
+    """Tabelas de contagem das questões."""
+
+    params = ROWS
+    param_names = ['rows']
+    timeout = TIMEOUT
+
+    def setup(self, rows):
+        self.df = data.load(data.DATASET, dataset(rows))
+
+    def time_tables(self, rows):
+        questions.tables(self.df)
+
+    def peakmem_tables(self, rows):
+        questions.tables(self.df)
+
+
+class Questions:
+    """Cada questão, a partir das tabelas de contagem."""
+
+    params = [ROWS, list(QUESTIONS)]
+    param_names = ['rows', 'question']
+    timeout = TIMEOUT
+
+    def setup(self, rows, n):
+        self.df = data.load(data.DATASET, dataset(rows))
+        self.tables = questions.tables(self.df)
+
+    def time_question(self, rows, n):
+        QUESTIONS[n](self.df, self.tables)
+
+
+class Selection:
+    """Seleção de características das questões 5 e 6."""
+
+    params = [ROWS, ['default', 'housing']]
+    param_names = ['rows', 'target']
+    timeout = TIMEOUT
+
+    def setup(self, rows, target):
+        self.tables = questions.tables(data.load(data.DATASET,
+                                                 dataset(rows)))
+
+    def time_select(self, rows, target):
+        client = [col for col in CLIENT if col != target]
+        questions._select(self.tables, client, target)
+
+
+class Plots:
+    """Renderização de cada gráfico, que não depende do número de linhas."""
+
+    params = [sorted(plots.CHARTS), list(render.FORMATS)]
+    param_names = ['chart', 'format']
+    timeout = TIMEOUT
+
+    def setup(self, name, fmt):
+        df = data.load(data.DATASET, dataset(ROWS[0]))
+        tables = questions.tables(df)
+        n = next(n for n, names in plots.QUESTIONS.items() if name in names)
+        self.spec = plots.CHARTS[name](QUESTIONS[n](df, tables))
+
+    def time_render(self, name, fmt):
+        render.to_bytes(self.spec, fmt)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Desafio Data Science.
+
+O desafio proposto requer a análise do banco de dados **Bank Marketing**,
+obtido no site UCI Machine Learning Repository
+(https://archive.ics.uci.edu/ml/datasets/bank+marketing). O arquivo utilizado
+na análise dos dados foi o bank.zip
+(https://archive.ics.uci.edu/ml/machine-learning-databases/00222/bank.zip).
+
+Cada uma das 6 questões é uma função de `desafio.questions`, chamada com o
+DataFrame carregado com `bank.data.load` e as tabelas de contagem obtidas
+dele com `desafio.questions.tables`, `q5(df, tables(df))`. As questões
+utilizam apenas as tabelas, portanto o DataFrame pode ser `None` quando
+elas são obtidas em blocos ou em partes do banco de dados. A linha de
+comando, `python -m desafio run --questions 1,5`, executa as questões
+selecionadas, imprime os resultados e salva os gráficos no diretório
+`./images/`.
+"""
+
+# # Descrição do banco de dados
+#
+# O banco de dados [bank.zip]
+# (https://archive.ics.uci.edu/ml/machine-learning-databases/00222/bank.zip)
+# possui as seguintes caracterísicas:
+#
+# * Área: Negócios;
+# * Número de atributos: 17;
+# * Número de amostras: 45211;
+# * Tipos de variáveis: categórica, binária e inteiro;
+#
+# O banco de dados está relacionado a uma capanha de marketing, baseada em
+# ligações, de um banco português. Os atributos do banco de dados incluem
+# dados pessoais dos clientes do banco como:
+#
+# * Idade - *inteiro*;
+# * Trabalho - *categórica*;
+# * Estado civil - *categórica*;
+# * Escolaridade - *categórica*;
+# * Dívidas - *categórica*;
+# * Empréstimo imobiliário - *categórica*;
+# * Empréstimo - *categórica*.
+#
+# Além desses dados, tem-se também os dados e resultados da campanha de
+# marketing atual como:
+#
+# * Forma de contato - *categórica*;
+# * Mês do último contato - *categórica*;
+# * Dia da semana do contato - *categórica*;
+# * Duração da ligação - *inteiro*;
+# * Número de contatos - *inteiro*;
+# * Intervalo do contato entre campanhas - *inteiro*;
+# * Resultado da capanha - *binária*.
+#
+# Por fim, tem-se duas informações da camapanha anterior como:
+#
+# * Resultado da capanha - *categórica*;
+# * Número de contatos - *inteiro*.
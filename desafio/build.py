@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Execução incremental das questões e dos gráficos.
+
+Semelhante a um sistema de *build*, o resultado de cada questão é
+armazenado no diretório de cache identificado por uma chave que depende:
+
+* do conteúdo dos dados lidos pela questão (as tabelas de contagem
+  declaradas em `desafio.questions.DEPENDS`);
+* da versão do código, o código-fonte da função da questão, das funções
+  auxiliares que ela chama e dos módulos locais que ela utiliza.
+
+Quando as tabelas são construídas a partir do banco de dados armazenado, a
+chave de cada resultado também é registrada pela chave dos arquivos de
+origem (`source_key`). Assim, se os arquivos e o código não mudaram, os
+resultados são encontrados sem ler o banco de dados nem construir as
+tabelas.
+
+Uma questão só é recalculada quando a sua chave muda. Da mesma forma, cada
+gráfico é identificado pelo hash da sua especificação e só é renderizado
+novamente quando ela muda ou quando o arquivo não existe.
+"""
+
+import os
+import sys
+import json
+import types
+import pickle
+import inspect
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bank import ingest
+
+from .questions import QUESTIONS, DEPENDS
+
+
+# Versão do formato, alterações invalidam os resultados existentes
+VERSION = 1
+
+RESULTS = 'results'
+CHARTS = 'charts.json'
+SOURCES = 'sources.json'
+
+# Pacotes cujo código-fonte faz parte da versão das questões
+PACKAGES = ('bank', 'desafio')
+
+
+def _update(digest, index):
+    # Os níveis de um MultiIndex são identificados pelos seus valores e
+    # códigos (`labels` antes do Pandas 0.24), sem materializar as tuplas de
+    # todas as linhas
+    digest.update(str(list(index.names)).encode())
+    if isinstance(index, pd.MultiIndex):
+        labels = index.codes if hasattr(index, 'codes') else index.labels
+        for level, codes in zip(index.levels, labels):
+            _update(digest, level)
+            digest.update(np.ascontiguousarray(codes).view(np.uint8))
+    elif index.dtype.kind in 'biuf':
+        digest.update(str(index.dtype).encode())
+        digest.update(np.ascontiguousarray(index.values).view(np.uint8))
+    else:
+        digest.update(str(index.tolist()).encode())
+
+
+def fingerprint(values):
+    """Hash do conteúdo de uma `Series`, incluindo o seu índice se ele não
+    for o padrão. Outros objetos, como os sketches de `bank.sketch`, são
+    identificados pelo conteúdo serializado.
+    """
+    if not isinstance(values, pd.Series):
+        return hashlib.sha1(pickle.dumps(values, protocol=2)).hexdigest()
+
+    digest = hashlib.sha1(str(values.dtype).encode())
+    if values.dtype.name == 'category':
+        digest.update(str(values.cat.categories.tolist()).encode())
+        values = values.cat.codes
+    digest.update(np.ascontiguousarray(values.values).view(np.uint8))
+    if not isinstance(values.index, pd.RangeIndex):
+        _update(digest, values.index)
+    return digest.hexdigest()
+
+
+def _is_local(obj):
+    if isinstance(obj, types.ModuleType):
+        module = obj.__name__
+    else:
+        module = getattr(obj, '__module__', None) or ''
+    return module.split('.')[0] in PACKAGES
+
+
+def _sources(obj, seen):
+    # Código-fonte de `obj` e, recursivamente, das funções e dos módulos
+    # locais que ele referencia
+    if id(obj) in seen or not _is_local(obj):
+        return
+    seen.add(id(obj))
+
+    if isinstance(obj, types.ModuleType):
+        yield inspect.getsource(obj)
+        refs = vars(obj).values()
+    elif isinstance(obj, types.FunctionType):
+        if obj.__module__ in sys.modules and \
+                id(sys.modules[obj.__module__]) in seen:
+            return
+        yield inspect.getsource(obj)
+        refs = [obj.__globals__[name] for name in obj.__code__.co_names
+                if name in obj.__globals__]
+    else:
+        return
+
+    for ref in refs:
+        if isinstance(ref, (types.ModuleType, types.FunctionType)):
+            for source in _sources(ref, seen):
+                yield source
+
+
+def code_version(func):
+    """Hash do código-fonte de `func` e das suas dependências locais."""
+    digest = hashlib.sha1()
+    for source in _sources(func, set()):
+        digest.update(source.encode())
+    return digest.hexdigest()
+
+
+def key(n, tables):
+    """Chave do resultado da questão `n` para as tabelas `tables`."""
+    parts = [VERSION, n, code_version(QUESTIONS[n]),
+             np.__version__, pd.__version__]
+    parts.extend((name, fingerprint(tables[name])) for name in DEPENDS[n]
+                 if name in tables)
+
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+    return digest.hexdigest()
+
+
+def source_key(n, source):
+    """Chave das tabelas lidas pela questão `n` quando elas são construídas
+    a partir dos arquivos de origem `source`, ex.: o hash do banco de dados
+    e os lotes ingeridos.
+
+    Além de `source` a chave depende do código da questão e do código que lê
+    o banco de dados e constrói as tabelas. Ela é associada à chave do
+    resultado (`key`) em `sources.json`, assim uma execução sem alterações
+    encontra os resultados sem construir as tabelas.
+    """
+    parts = [VERSION, n, code_version(QUESTIONS[n]), code_version(ingest),
+             np.__version__, pd.__version__, source]
+
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+    return digest.hexdigest()
+
+
+def _result(path, name):
+    return os.path.join(path, RESULTS, name + '.pkl')
+
+
+def load(path, name):
+    """Carrega o resultado `name`, retorna `None` caso ele não exista."""
+    try:
+        with open(_result(path, name), 'rb') as f:
+            return pickle.load(f)
+    except (IOError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def save(path, name, result):
+    """Salva o resultado `name` no diretório de cache `path`."""
+    dst = _result(path, name)
+    if not os.path.exists(os.path.dirname(dst)):
+        os.makedirs(os.path.dirname(dst))
+
+    # Escrita atômica, um resultado incompleto nunca é lido
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst), suffix='.part')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, dst)
+
+
+def chart_key(spec, fmt, version):
+    """Chave de um gráfico, a partir da especificação e do formato."""
+    text = json.dumps([VERSION, version, fmt, spec], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _read_json(path, name):
+    try:
+        with open(os.path.join(path, name)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def _write_json(path, name, obj):
+    if not os.path.exists(path):
+        os.makedirs(path)
+    fd, tmp = tempfile.mkstemp(dir=path, suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(obj, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(path, name))
+
+
+def read_charts(path):
+    """Chaves dos gráficos já renderizados, indexadas pelo arquivo."""
+    return _read_json(path, CHARTS)
+
+
+def write_charts(path, charts):
+    """Salva as chaves dos gráficos renderizados."""
+    _write_json(path, CHARTS, charts)
+
+
+def read_sources(path):
+    """Chaves dos resultados, indexadas pela chave da origem (`source_key`).
+    """
+    return _read_json(path, SOURCES)
+
+
+def write_sources(path, sources):
+    """Salva as chaves dos resultados de cada origem."""
+    _write_json(path, SOURCES, sources)
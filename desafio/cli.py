@@ -0,0 +1,780 @@
+# -*- coding: utf-8 -*-
+"""Linha de comando do desafio.
+
+Uso:
+
+    python -m desafio run --questions 1,5
+
+Apenas as bibliotecas necessárias para as questões selecionadas são
+importadas, por exemplo o Scikit-learn só é importado pelas questões 5 e 6.
+"""
+
+import os
+import time
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+
+from bank import anova
+from bank import cube
+from bank import data
+from bank import ecdf
+from bank import shard
+from bank import ingest
+from bank import schema
+from bank import score
+from bank import sketch
+from bank import subgroup
+from bank import synthetic
+from bank import timeline
+from bank import chisquare
+from bank import stream
+from bank import instrument
+
+from . import build
+from . import plots
+from . import report
+from . import render
+from . import scheduler
+from .questions import QUESTIONS, INTERVALS, tables as count_tables
+
+
+def _questions(text):
+    # Converte a lista '1,5' para [1, 5], mantendo a ordem das questões
+    try:
+        selected = {int(n) for n in text.split(',') if n.strip()}
+    except ValueError:
+        raise argparse.ArgumentTypeError('lista inválida: {}'.format(text))
+    invalid = selected - set(QUESTIONS)
+    if invalid or not selected:
+        raise argparse.ArgumentTypeError(
+            'questões inválidas: {}'.format(text))
+    return sorted(selected)
+
+
+def _tables(path_data, offline, chunksize, jobs, approximate, shards,
+            partials):
+    # DataFrame, quando carregado, e tabelas de contagem das questões
+    df = None
+    sketches = sketch.SKETCHES if approximate else None
+    if partials:
+        # Apenas o *reduce* dos resultados parciais enviados pelos nós
+        tables = shard.reduce(shard.partials(partials))
+    elif shards:
+        types = data.read_schema(data.DATASET, path_data, offline=offline)
+        tables = shard.run(shard.files(shards), types, jobs, sketches,
+                           chunksize or schema.CHUNKSIZE)
+    elif chunksize:
+        # Com `chunksize` as tabelas de contagem são obtidas lendo o CSV em
+        # blocos, o que permite analisar arquivos maiores que a memória
+        tables = stream.aggregate(ingest.chunks(
+            data.DATASET, path_data, chunksize, offline=offline),
+            sketches=sketches)
+    elif ingest.batches(path_data) and not approximate:
+        # Com lotes ingeridos as tabelas mantidas pela ingestão são
+        # utilizadas, sem processar novamente todas as linhas
+        tables = ingest.state(data.DATASET, path_data,
+                              offline=offline)['tables']
+    else:
+        df = ingest.load(data.DATASET, path_data, offline=offline)
+        tables = count_tables(df, sketches)
+    return df, tables
+
+
+def run(questions=tuple(QUESTIONS), path_data=data.PATH_DATA,
+        path_img='images', offline=None, chunksize=None, jobs=1, fmt='png',
+        use_cache=True, approximate=False, shards=None, partials=None,
+        replicates=0):
+    """Executa as questões `questions`, imprime os resultados e salva os
+    gráficos no diretório `path_img` no formato `fmt`.
+
+    Com `jobs` diferente de 1 as questões são executadas e os gráficos
+    renderizados em paralelo, em `jobs` processos (todos os núcleos para
+    `jobs=None`), e os resultados são impressos na mesma ordem da execução
+    sequencial. Com `path_img=None` os gráficos não são gerados.
+
+    Com `use_cache` apenas as questões cujos dados ou código mudaram desde a
+    última execução são recalculadas, e apenas os gráficos alterados são
+    renderizados novamente (ver `desafio.build`).
+
+    Com `approximate` as medianas, os percentuais e os histogramas das
+    questões 5 e 6 são obtidos de sketches calculados na mesma passagem das
+    tabelas de contagem (ver `bank.sketch`).
+
+    Os lotes acrescentados com `ingest` fazem parte do banco de dados, as
+    tabelas de contagem são as mantidas pela ingestão (ver `bank.ingest`).
+
+    Com `replicates` diferente de zero as estatísticas das questões 3, 5 e 6
+    são acompanhadas de intervalos de confiança *bootstrap* com esse número
+    de réplicas, calculadas em `jobs` processos (ver `bank.bootstrap`).
+
+    Com `shards` o banco de dados é lido das partes no diretório `shards`,
+    cada uma processada em um dos `jobs` processos, e com `partials` apenas
+    os resultados parciais salvos nesse diretório são somados (ver
+    `bank.shard`).
+    """
+    path_cache = os.path.join(path_data, data.CACHE)
+    results = OrderedDict((n, None) for n in questions)
+
+    # Lidas do banco de dados armazenado, as tabelas dependem apenas dos
+    # arquivos de origem, e os resultados já obtidos para a mesma origem
+    # são encontrados sem construir as tabelas
+    source, sources = None, {}
+    if use_cache and not (partials or shards or chunksize):
+        types = data.read_schema(data.DATASET, path_data, offline=offline)
+        origin = [data.source_hash(data.DATASET, path_data, offline=offline),
+                  sorted(types.items()), approximate,
+                  [os.path.basename(f) for f in ingest.batches(path_data)]]
+        source = {n: build.source_key(n, origin) for n in questions}
+        sources = build.read_sources(path_cache)
+        for n in questions:
+            if source[n] in sources:
+                results[n] = build.load(path_cache, sources[source[n]])
+
+    if replicates or any(result is None for result in results.values()):
+        df, tables = _tables(path_data, offline, chunksize, jobs,
+                             approximate, shards, partials)
+
+        # Resultados ainda válidos da execução anterior
+        keys = {n: build.key(n, tables) for n in questions}
+        if use_cache:
+            for n in questions:
+                if results[n] is None:
+                    results[n] = build.load(path_cache, keys[n])
+
+        stale = [n for n in questions if results[n] is None]
+        for n, result in scheduler.run(stale, df, tables, jobs):
+            results[n] = result
+            if use_cache:
+                build.save(path_cache, keys[n], result)
+
+        if source is not None:
+            sources.update((source[n], keys[n]) for n in questions)
+            build.write_sources(path_cache, sources)
+
+    if replicates:
+        for n in questions:
+            if n in INTERVALS:
+                with instrument.stage('bootstrap', n=n):
+                    results[n] = OrderedDict(results[n])
+                    results[n]['ci'] = INTERVALS[n](tables, replicates,
+                                                    jobs=jobs)
+
+    # Os gráficos são renderizados de uma vez a partir dos dados já
+    # agregados, apenas os que mudaram
+    charts = {}
+    if path_img is not None:
+        charts = _render(plots.specs(results), path_img, fmt, jobs,
+                         path_cache if use_cache else None)
+
+    def plot(name):
+        if name in charts:
+            print('Gráfico salvo: {} -> {}'.format(*charts[name]))
+
+    for n, result in results.items():
+        report.header(n)
+        report.REPORTS[n](result, plot)
+    return results
+
+
+def _render(specs, path_img, fmt, jobs, path_cache):
+    # Renderiza apenas os gráficos cuja especificação mudou ou cujo arquivo
+    # não existe mais
+    if path_cache is None:
+        return render.save_all(specs, path_img, fmt, jobs)
+
+    version = build.code_version(render.save)
+    saved = build.read_charts(path_cache)
+    charts, stale = {}, []
+    for spec in specs:
+        filename = '{}.{}'.format(spec['name'], fmt)
+        path = os.path.abspath(os.path.join(path_img, filename))
+        spec_key = build.chart_key(spec, fmt, version)
+        if saved.get(path) == spec_key and os.path.exists(path):
+            charts[spec['name']] = spec['title'], filename
+        else:
+            stale.append((spec, path, spec_key))
+
+    if stale:
+        charts.update(render.save_all([spec for spec, _, _ in stale],
+                                      path_img, fmt, jobs))
+        saved.update((path, spec_key) for _, path, spec_key in stale)
+        build.write_charts(path_cache, saved)
+    return charts
+
+
+def _check_targets(targets, columns):
+    # Os alvos só são conhecidos com o esquema do banco de dados
+    unknown = [t for t in targets or () if t not in columns]
+    if unknown:
+        raise ValueError('Alvos inválidos: {}'.format(', '.join(unknown)))
+
+
+def independence(path_data=data.PATH_DATA, offline=None,
+                 targets=chisquare.TARGETS, method='holm'):
+    """Imprime o teste chi-quadrado de independência de cada coluna
+    categórica com cada alvo de `targets` (todos os pares com `None`).
+    Alvos que não são colunas categóricas resultam em `ValueError`.
+    """
+    if ingest.batches(path_data):
+        aggregates = ingest.state(data.DATASET, path_data,
+                                  offline=offline)['cube']
+        _check_targets(targets, aggregates['dimensions'])
+        result = chisquare.scan_cube(aggregates, targets=targets,
+                                     method=method)
+    else:
+        df = ingest.load(data.DATASET, path_data, offline=offline)
+        _check_targets(targets, chisquare.categorical(df))
+        result = chisquare.scan(df, targets=targets, method=method)
+    print(result.to_string())
+    return result
+
+
+def variance(path_data=data.PATH_DATA, offline=None, targets=anova.TARGETS,
+             chunksize=schema.CHUNKSIZE):
+    """Imprime o teste F da ANOVA de cada característica com cada alvo de
+    `targets` (todas as colunas categóricas com `None`), com os momentos
+    acumulados em blocos de `chunksize` linhas (ver `bank.anova`). Alvos
+    que não são colunas categóricas resultam em `ValueError`.
+    """
+    types = data.read_schema(data.DATASET, path_data, offline=offline)
+    levels = OrderedDict((col, list(t.categories)) for col, t in types.items()
+                         if t.name == 'category')
+    if targets is None:
+        targets = list(levels)
+    _check_targets(targets, levels)
+    with instrument.stage('anova') as record:
+        chunks = ingest.chunks(data.DATASET, path_data, chunksize,
+                               offline=offline)
+        moments = anova.build(chunks, list(types), targets, levels)
+        record['rows'] = int(moments['moments'][targets[0]]['count'][0].sum())
+    result = anova.test(moments).sort_values(
+        ['p', 'f'], ascending=[True, False], kind='mergesort')
+    print(result.reset_index(drop=True).to_string())
+    return result
+
+
+def breakdown(by, where=None, path_data=data.PATH_DATA, offline=None,
+              use_cache=True):
+    """Imprime o agrupamento do banco de dados pelas colunas `by`, obtido
+    do cubo de agregados (ver `bank.cube`).
+    """
+    if ingest.batches(path_data):
+        aggregates = ingest.state(data.DATASET, path_data,
+                                  offline=offline)['cube']
+    else:
+        aggregates = data.cube(data.DATASET, path_data, use_cache,
+                               offline=offline)
+    result = cube.rollup(aggregates, by, where)
+    print(result.to_string())
+    return result
+
+
+def append(filenames, path_data=data.PATH_DATA, offline=None, check=False):
+    """Acrescenta os arquivos `filenames` ao banco de dados e, com
+    `check`, compara os agregados mantidos com os recalculados.
+    """
+    for filename in filenames:
+        st = ingest.append(filename, data.DATASET, path_data, offline=offline)
+        print('Lote ingerido: {} ({} linhas no total)'.format(
+            filename, st['rows']))
+    if check:
+        diverging = ingest.check(data.DATASET, path_data, offline=offline)
+        if diverging:
+            print('Agregados divergentes: {}'.format(', '.join(diverging)))
+            return False
+        print('Agregados consistentes com o recálculo completo.')
+    return True
+
+
+def generate(rows, path_out, seed=0, path_data=data.PATH_DATA,
+             offline=None):
+    """Gera um banco de dados sintético com `rows` linhas no diretório
+    `path_out`, com as distribuições do banco de dados (ver
+    `bank.synthetic`).
+    """
+    df = ingest.load(data.DATASET, path_data, offline=offline)
+    filename = synthetic.save(synthetic.generate(df, rows, seed=seed),
+                              path_out, data.DATASET, path_data,
+                              offline=offline)
+    print('Banco de dados sintético salvo: {} ({} linhas)'.format(
+        filename, rows))
+
+
+def train(path_out, path_data=data.PATH_DATA, offline=None, holdout=0.2):
+    """Treina o modelo de adesão à campanha e o salva em `path_out`."""
+    df = ingest.load(data.DATASET, path_data, offline=offline)
+    with instrument.stage('train') as record:
+        model = score.fit(df, holdout=holdout)
+        record['rows'] = model['rows']
+    score.save(model, path_out)
+    print('Modelo salvo: {} ({} bytes)'.format(path_out,
+                                               os.path.getsize(path_out)))
+    if model['auc'] is not None:
+        print('AUC na validação: {:.4f}'.format(model['auc']))
+    print('Importância das características:')
+    print(score.importance(model).to_string())
+    return model
+
+
+def prioritize(filename, path_model, path_out, jobs=1):
+    """Pontua os clientes do CSV `filename` e salva a probabilidade de
+    adesão de cada linha em `path_out`, na ordem do arquivo.
+    """
+    model = score.load(path_model)
+    start = time.perf_counter()
+    rows = score.write(model, filename, path_out, jobs)
+    elapsed = time.perf_counter() - start
+
+    print('Linhas pontuadas: {} em {:.2f} s ({:.0f} linhas/s)'.format(
+        rows, elapsed, rows / elapsed if elapsed else float('nan')))
+    peaks = [m for m in (instrument.max_rss(), instrument.max_rss(True))
+             if m is not None]
+    if peaks:
+        print('Pico de memória por processo: {:.1f} MB'.format(
+            max(peaks) / 2 ** 20))
+    print('Pontuações salvas: {}'.format(path_out))
+    return rows
+
+
+def segments(depth=3, top=20, attributes=subgroup.ATTRIBUTES,
+             min_size=None, direction='both', a=1.0, path_data=data.PATH_DATA,
+             offline=None, jobs=1):
+    """Imprime os subgrupos com o percentual de adesão mais distante do
+    percentual de todo o banco de dados (ver `bank.subgroup`).
+    """
+    df = ingest.load(data.DATASET, path_data, offline=offline)
+    with instrument.stage('subgroup', depth=depth) as record:
+        result = subgroup.search(df, attributes=attributes, depth=depth,
+                                 top=top, min_size=min_size, a=a,
+                                 direction=direction, jobs=jobs)
+        record['rows'] = len(df)
+    print('Percentual de adesão da base: {:.2f}%'.format(
+        100 * (df['y'] == 'yes').mean()))
+    print(result.to_string())
+    return result
+
+
+def temporal(lo=None, hi=None, window=None, daily=False, recency=False,
+             path_data=data.PATH_DATA, offline=None):
+    """Imprime os totais das ligações entre as datas `lo` e `hi`, e
+    opcionalmente a série diária, a adesão móvel em janelas de `window`
+    dias e a adesão por recência do último contato (ver `bank.timeline`).
+    """
+    df = ingest.load(data.DATASET, path_data, offline=offline)
+    with instrument.stage('timeline.build') as record:
+        index = timeline.build(df)
+        record['rows'] = len(df)
+    dates = index['dates']
+    i, j = timeline.locate(dates, lo, hi)
+    if i == j:
+        print('Nenhuma ligação no período.')
+        return None
+
+    result = timeline.totals(dates, lo, hi)
+    print('Período: {} a {}'.format(dates['keys'][i], dates['keys'][j - 1]))
+    print('Ligações: {count}, adesões: {positives} ({pct:.2f}%), '
+          'contatos na campanha: {campaign}, duração total: {duration} s'
+          .format(pct=100 * result['rate'], **result))
+    if daily:
+        print(timeline.series(dates, lo, hi).to_string())
+    if window:
+        print('Adesão nos últimos {} dias:'.format(window))
+        print(timeline.rolling(dates, window, lo, hi).to_string())
+    if recency:
+        print('Adesão pelos dias desde o último contato (pdays):')
+        print(timeline.recency(index).to_string())
+    return result
+
+
+def thresholds(column='balance', by='default', at=(), quantiles=(0.5,),
+               path_data=data.PATH_DATA, offline=None):
+    """Imprime, para cada nível de `by`, as frações de `column` abaixo e
+    acima de cada limite de `at` e os quantis `quantiles` (ver
+    `bank.ecdf`).
+    """
+    df = ingest.load(data.DATASET, path_data, offline=offline)
+    if column not in df.columns or df[column].dtype.kind not in 'iuf':
+        raise ValueError('Coluna numérica inválida: {}'.format(column))
+    if by not in df.columns or df[by].dtype.name != 'category':
+        raise ValueError('Coluna categórica inválida: {}'.format(by))
+    with instrument.stage('ecdf.build') as record:
+        index = ecdf.build(df, column, by)
+        record['rows'] = len(df)
+    result = ecdf.summary(index, at, quantiles)
+    print(result.to_string())
+    return result
+
+
+def _numbers(text):
+    # Converte '0,1000' para [0.0, 1000.0]
+    try:
+        return [float(v) for v in text.split(',') if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError('números inválidos: {}'.format(text))
+
+
+def _alpha(text):
+    # Expoente do tamanho na qualidade, a poda só é válida entre 0 e 1
+    try:
+        a = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError('número inválido: {}'.format(text))
+    if not 0 <= a <= 1:
+        raise argparse.ArgumentTypeError(
+            'expoente fora do intervalo [0, 1]: {}'.format(text))
+    return a
+
+
+def _date(text):
+    # Valida a data 'AAAA-MM-DD'
+    try:
+        return str(np.datetime64(text, 'D'))
+    except ValueError:
+        raise argparse.ArgumentTypeError('data inválida: {}'.format(text))
+
+
+def _attributes(text):
+    # Converte 'job,month' para ['job', 'month']
+    cols = [c.strip() for c in text.split(',') if c.strip()]
+    unknown = set(cols) - (set(cube.DIMENSIONS) - {'y'})
+    if unknown or not cols:
+        raise argparse.ArgumentTypeError(
+            'colunas inválidas: {}'.format(text))
+    return cols
+
+
+def _dimensions(text):
+    # Converte 'job,loan' para ['job', 'loan']
+    dims = [d.strip() for d in text.split(',') if d.strip()]
+    unknown = set(dims) - set(cube.DIMENSIONS)
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            'dimensões inválidas: {}'.format(', '.join(sorted(unknown))))
+    return dims
+
+
+def _where(text):
+    # Converte 'y=yes' para ('y', ['yes']) e 'month=jan|feb' para
+    # ('month', ['jan', 'feb'])
+    dim, sep, levels = text.partition('=')
+    if not sep or dim not in cube.DIMENSIONS:
+        raise argparse.ArgumentTypeError('filtro inválido: {}'.format(text))
+    return dim, levels.split('|')
+
+
+def _targets(text):
+    # Converte 'y,loan' para ['y', 'loan'] e 'all' para todos os pares
+    if text == 'all':
+        return None
+    return [t.strip() for t in text.split(',') if t.strip()]
+
+
+def split(path_out, by='month', path_data=data.PATH_DATA, offline=None):
+    """Divide o banco de dados em um arquivo por nível da coluna `by`."""
+    df = ingest.load(data.DATASET, path_data, offline=offline)
+    for filename in shard.split(df, path_out, by):
+        print('Parte salva: {}'.format(filename))
+
+
+def map_shards(filenames, path_out, path_data=data.PATH_DATA, offline=None,
+               approximate=False, jobs=1):
+    """Etapa *map*: salva o resultado parcial de cada parte em `path_out`."""
+    if not os.path.exists(path_out):
+        os.makedirs(path_out)
+    types = data.read_schema(data.DATASET, path_data, offline=offline)
+    sketches = sketch.SKETCHES if approximate else None
+    for filename in filenames:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        dst = os.path.join(path_out, name + shard.PARTIAL)
+        shard.save(shard.run([filename], types, jobs, sketches), dst)
+        print('Resultado parcial salvo: {}'.format(dst))
+
+
+def _common(cmd):
+    cmd.add_argument('--data', default=data.PATH_DATA,
+                     help='diretório do banco de dados')
+    cmd.add_argument('--offline', action='store_true', default=None,
+                     help='não acessa a rede, utiliza apenas `--data`')
+    cmd.add_argument('--metrics',
+                     help='salva o tempo, a memória e as linhas de cada '
+                          'etapa, em JSON (.json) ou OpenMetrics')
+    cmd.add_argument('--profile',
+                     help='etapas com perfil cProfile, separadas por '
+                          'vírgula ou `all`')
+    cmd.add_argument('--tracemalloc',
+                     help='etapas com rastreamento de memória, separadas '
+                          'por vírgula ou `all`')
+    cmd.add_argument('--profile-dir',
+                     help='diretório dos perfis, por padrão `profiles`')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='desafio', description='Desafio Data Science - Bank Marketing')
+    commands = parser.add_subparsers(dest='command')
+
+    cmd = commands.add_parser('run', help='executa as questões')
+    cmd.add_argument('--questions', type=_questions,
+                     default=list(QUESTIONS),
+                     help='questões separadas por vírgula, ex.: 1,5')
+    _common(cmd)
+    cmd.add_argument('--images', default='images',
+                     help='diretório dos gráficos')
+    cmd.add_argument('--chunksize', type=int,
+                     help='lê o CSV em blocos com este número de linhas')
+    cmd.add_argument('--jobs', '-j', type=int, default=1,
+                     help='número de processos, 0 utiliza todos os núcleos')
+    cmd.add_argument('--format', default='png', choices=render.FORMATS,
+                     help='formato dos gráficos')
+    cmd.add_argument('--no-plots', action='store_true',
+                     help='não gera os gráficos, apenas os resultados')
+    cmd.add_argument('--force', action='store_true',
+                     help='recalcula todas as questões e gráficos')
+    cmd.add_argument('--approximate', action='store_true',
+                     help='medianas e histogramas aproximados por sketches')
+    cmd.add_argument('--shards',
+                     help='diretório com as partes do banco de dados, '
+                          'processadas em paralelo com `--jobs`')
+    cmd.add_argument('--partials',
+                     help='diretório com os resultados parciais de `map`')
+    cmd.add_argument('--bootstrap', type=int, default=0, metavar='N',
+                     help='intervalos de confiança com N réplicas, '
+                          'ex.: 10000')
+
+    cmd = commands.add_parser(
+        'split', help='divide o banco de dados em partes')
+    _common(cmd)
+    cmd.add_argument('--by', default='month',
+                     help='coluna que define as partes')
+    cmd.add_argument('--out', default='shards',
+                     help='diretório das partes')
+
+    cmd = commands.add_parser(
+        'map', help='calcula os resultados parciais de cada parte')
+    _common(cmd)
+    cmd.add_argument('shards', nargs='+', help='arquivos das partes')
+    cmd.add_argument('--out', default='partials',
+                     help='diretório dos resultados parciais')
+    cmd.add_argument('--approximate', action='store_true',
+                     help='inclui os sketches aproximados')
+
+    cmd = commands.add_parser(
+        'serve', help='inicia o servidor HTTP com os dados em memória')
+    _common(cmd)
+    cmd.add_argument('--host', default='127.0.0.1', help='endereço')
+    cmd.add_argument('--port', type=int, default=8000, help='porta')
+    cmd.add_argument('--unix', help='utiliza o socket Unix informado')
+
+    cmd = commands.add_parser(
+        'chisquare', help='testa a independência das colunas categóricas')
+    _common(cmd)
+    cmd.add_argument('--targets', type=_targets,
+                     default=list(chisquare.TARGETS),
+                     help='alvos separados por vírgula, `all` testa todos '
+                          'os pares')
+    cmd.add_argument('--correction', default='holm',
+                     choices=chisquare.CORRECTIONS,
+                     help='correção para múltiplos testes')
+    cmd.set_defaults(error=cmd.error)
+
+    cmd = commands.add_parser(
+        'anova', help='testa as diferenças das médias entre as classes')
+    _common(cmd)
+    cmd.add_argument('--targets', type=_targets,
+                     default=list(anova.TARGETS),
+                     help='alvos separados por vírgula, `all` utiliza todas '
+                          'as colunas categóricas')
+    cmd.add_argument('--chunksize', type=int, default=schema.CHUNKSIZE,
+                     help='número de linhas de cada bloco')
+    cmd.set_defaults(error=cmd.error)
+
+    cmd = commands.add_parser(
+        'generate', help='gera um banco de dados sintético')
+    _common(cmd)
+    cmd.add_argument('--rows', type=int, default=1000000,
+                     help='número de linhas')
+    cmd.add_argument('--seed', type=int, default=0,
+                     help='semente do gerador')
+    cmd.add_argument('--out', required=True,
+                     help='diretório do banco de dados sintético, '
+                          'utilizado depois com `--data`')
+
+    cmd = commands.add_parser(
+        'train', help='treina o modelo de adesão à campanha')
+    _common(cmd)
+    cmd.add_argument('--out', default='model.npz', help='arquivo do modelo')
+    cmd.add_argument('--holdout', type=float, default=0.2,
+                     help='fração das linhas reservada para a validação')
+
+    cmd = commands.add_parser(
+        'score', help='pontua uma lista de clientes com o modelo')
+    _common(cmd)
+    cmd.add_argument('prospects', help='CSV no formato do banco de dados')
+    cmd.add_argument('--model', default='model.npz',
+                     help='arquivo do modelo')
+    cmd.add_argument('--out', default='scores.csv',
+                     help='arquivo das probabilidades de adesão')
+    cmd.add_argument('--jobs', '-j', type=int, default=1,
+                     help='número de processos, 0 utiliza todos os núcleos')
+
+    cmd = commands.add_parser(
+        'ingest', help='acrescenta novos registros ao banco de dados')
+    _common(cmd)
+    cmd.add_argument('files', nargs='*',
+                     help='arquivos CSV no formato do banco de dados')
+    cmd.add_argument('--check', action='store_true',
+                     help='compara os agregados com o recálculo completo')
+
+    cmd = commands.add_parser(
+        'cube', help='agrupa o banco de dados a partir do cubo de agregados')
+    _common(cmd)
+    cmd.add_argument('--by', type=_dimensions, default=[],
+                     help='dimensões separadas por vírgula, ex.: job,loan')
+    cmd.add_argument('--where', type=_where, action='append', default=[],
+                     help='filtro dimensão=nível, níveis alternativos '
+                          'separados por |, ex.: month=jan|feb')
+    cmd.add_argument('--force', action='store_true',
+                     help='reconstrói o cubo')
+    cmd.set_defaults(error=cmd.error)
+
+    cmd = commands.add_parser(
+        'ecdf', help='frações e quantis de uma coluna numérica por grupo')
+    _common(cmd)
+    cmd.add_argument('--column', default='balance', help='coluna numérica')
+    cmd.add_argument('--by', default='default',
+                     help='coluna categórica que define os grupos')
+    cmd.add_argument('--at', type=_numbers, default=[],
+                     help='limites separados por vírgula, ex.: 0,1000')
+    cmd.add_argument('--quantiles', type=_numbers, default=[0.5],
+                     help='quantis separados por vírgula, ex.: 0.25,0.5')
+
+    cmd = commands.add_parser(
+        'timeline', help='consulta as ligações por período')
+    _common(cmd)
+    cmd.add_argument('--start', type=_date,
+                     help='data inicial, ex.: 2009-01-01')
+    cmd.add_argument('--stop', type=_date,
+                     help='data final, inclusive, ex.: 2009-03-31')
+    cmd.add_argument('--daily', action='store_true',
+                     help='imprime os totais de cada dia')
+    cmd.add_argument('--window', type=int,
+                     help='adesão móvel nos últimos N dias')
+    cmd.add_argument('--recency', action='store_true',
+                     help='adesão pelos dias desde o último contato')
+    cmd.set_defaults(error=cmd.error)
+
+    cmd = commands.add_parser(
+        'subgroups', help='procura os subgrupos com maior ou menor adesão')
+    _common(cmd)
+    cmd.add_argument('--depth', type=int, default=3,
+                     help='número máximo de condições de um subgrupo')
+    cmd.add_argument('--top', type=int, default=20,
+                     help='número de subgrupos listados')
+    cmd.add_argument('--attributes', type=_attributes,
+                     default=list(subgroup.ATTRIBUTES),
+                     help='colunas categóricas separadas por vírgula')
+    cmd.add_argument('--min-size', type=int,
+                     help='número mínimo de linhas, por padrão 1%% do banco '
+                          'de dados')
+    cmd.add_argument('--direction', default='both',
+                     choices=('both', 'up', 'down'),
+                     help='adesão maior (up), menor (down) ou diferente da '
+                          'base')
+    cmd.add_argument('--alpha', type=_alpha, default=1.0,
+                     help='expoente do tamanho na qualidade, 1 para WRAcc e '
+                          '0.5 para o teste binomial')
+    cmd.add_argument('--jobs', '-j', type=int, default=1,
+                     help='número de processos, 0 utiliza todos os núcleos')
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    if args.command == 'run' and args.bootstrap and args.approximate:
+        # No modo aproximado as tabelas das colunas numéricas contam apenas
+        # as classes, que não podem ser reamostradas
+        parser.error('--bootstrap requer as tabelas exatas, sem '
+                     '--approximate')
+
+    instrument.configure(args.profile, args.tracemalloc, args.profile_dir)
+    try:
+        return _dispatch(args)
+    finally:
+        if args.metrics:
+            instrument.write(args.metrics)
+            print('Métricas salvas: {}'.format(args.metrics))
+
+
+def _dispatch(args):
+    # Executa o comando `args.command`, retorna o código de saída
+    if args.command == 'split':
+        split(args.out, args.by, args.data, args.offline)
+        return 0
+    if args.command == 'map':
+        map_shards(args.shards, args.out, args.data, args.offline,
+                   args.approximate)
+        return 0
+    if args.command == 'serve':
+        # O servidor só é importado quando utilizado
+        from . import server
+        server.serve(args.host, args.port, args.unix, args.data,
+                     args.offline)
+        return 0
+    if args.command == 'chisquare':
+        try:
+            independence(args.data, args.offline, args.targets,
+                         args.correction)
+        except ValueError as err:
+            args.error(str(err))
+        return 0
+    if args.command == 'anova':
+        try:
+            variance(args.data, args.offline, args.targets, args.chunksize)
+        except ValueError as err:
+            args.error(str(err))
+        return 0
+    if args.command == 'generate':
+        generate(args.rows, args.out, args.seed, args.data, args.offline)
+        return 0
+    if args.command == 'train':
+        train(args.out, args.data, args.offline, args.holdout)
+        return 0
+    if args.command == 'score':
+        prioritize(args.prospects, args.model, args.out, args.jobs or None)
+        return 0
+    if args.command == 'ingest':
+        return 0 if append(args.files, args.data, args.offline,
+                           args.check) else 1
+    if args.command == 'ecdf':
+        thresholds(args.column, args.by, args.at, args.quantiles, args.data,
+                   args.offline)
+        return 0
+    if args.command == 'timeline':
+        # O ano só é obtido com as linhas em ordem cronológica
+        try:
+            temporal(args.start, args.stop, args.window, args.daily,
+                     args.recency, args.data, args.offline)
+        except ValueError as err:
+            args.error(str(err))
+        return 0
+    if args.command == 'subgroups':
+        segments(args.depth, args.top, args.attributes, args.min_size,
+                 args.direction, args.alpha, args.data, args.offline,
+                 args.jobs or None)
+        return 0
+    if args.command == 'cube':
+        # Os níveis de cada dimensão só são conhecidos com o cubo
+        try:
+            breakdown(args.by, OrderedDict(args.where), args.data,
+                      args.offline, not args.force)
+        except ValueError as err:
+            args.error(str(err))
+        return 0
+
+    path_img = None if args.no_plots else args.images
+    run(args.questions, args.data, path_img, args.offline,
+        args.chunksize, args.jobs or None, args.format, not args.force,
+        args.approximate, args.shards, args.partials, args.bootstrap)
+    return 0
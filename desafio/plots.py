@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Especificação dos gráficos das questões.
+
+Cada gráfico é uma função que recebe o resultado da questão e retorna uma
+especificação, um dicionário apenas com os dados já agregados (alturas das
+barras e contagens dos histogramas) e os textos do gráfico. As
+especificações são desenhadas por `desafio.render`, sem depender de nenhum
+estado global do Matplotlib.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _list(values):
+    return np.asarray(values).tolist()
+
+
+def _spec(name, title, xlabel, ylabel, show_title=True, **kwargs):
+    spec = OrderedDict([
+        ('name', name),
+        ('title', title),
+        ('show_title', show_title),
+        ('xlabel', xlabel),
+        ('ylabel', ylabel),
+        ('bars', []),
+        ('hists', []),
+        ('legend', None),
+        ('rotate_xticks', False),
+        ('xlim', None),
+        ('ylim', None),
+    ])
+    spec.update(kwargs)
+    return spec
+
+
+def _stacked(y, n):
+    # Barras empilhadas com o percentual de cada categoria
+    return [
+        {'x': _list(y.index), 'height': _list(y)},
+        {'x': _list(n.index), 'height': _list(n), 'bottom': _list(y)},
+    ]
+
+
+def _hist(hist, **kwargs):
+    spec = {'counts': _list(hist['counts']), 'edges': _list(hist['edges'])}
+    spec.update(kwargs)
+    return spec
+
+
+def bar_chart_loan_housing(result):
+    return _spec('bar_chart_loan_housing', 'Empréstimos por profissão',
+                 'Profissão', 'Percentual (%)',
+                 bars=_stacked(result['loan_yn'], result['loan_nn']),
+                 legend=['Possui', 'Não possui'], rotate_xticks=True)
+
+
+def bar_chart_calls_success(result):
+    return _spec('bar_chart_calls_success',
+                 'Sucesso na campanha por número de ligações',
+                 'Número de ligações (-)', 'Percentual (%)',
+                 bars=_stacked(result['success_n'], result['fail_n']),
+                 legend=['Sucesso', 'Insucesso'])
+
+
+def hist_cumu_call_success(result):
+    counts = result['contact_counts']
+    hist, edges = np.histogram(counts.index.values, bins=counts.shape[0],
+                               weights=counts.values)
+    hist = {'counts': hist, 'edges': edges}
+    return _spec('hist_cumu_call_success', 'Histograma cumulativo',
+                 'Número de contatos (-)', 'Probabilidade de ocorrência (-)',
+                 show_title=False,
+                 hists=[_hist(hist, density=True, cumulative=True)])
+
+
+def bar_chart_prev_curr(result):
+    success_yn = result['success_yn']
+    bar = {'x': _list(success_yn.index), 'height': _list(success_yn),
+           'colors': {1: 'orange'}}
+    return _spec('bar_chart_prev_curr',
+                 'Relação entre a campanha atual e anteior',
+                 'Percentual (%)', 'Sucesso na campanha atual (-)',
+                 bars=[bar])
+
+
+def hist_balance(result):
+    return _spec('hist_balance', 'Histograma dos saldos', 'Saldo (€)',
+                 'Probabilidade de ocorrência (-)',
+                 hists=[_hist(result['hist_yes'], density=True),
+                        _hist(result['hist_no'], density=True, alpha=0.5)],
+                 legend=['Possui', 'Não possui'],
+                 xlim=[-4057, 20000], ylim=[0, 6e-4])
+
+
+def bar_chart_housing_job(result):
+    return _spec('bar_chart_housing_job', 'Empréstimos por profissão',
+                 'Profissão', 'Percentual (%)',
+                 bars=_stacked(result['job_y'], result['job_n']),
+                 legend=['Possui', 'Não possui'], rotate_xticks=True)
+
+
+def hist_cumu_age_housing(result):
+    return _spec('hist_cumu_age_housing', 'Histograma cumulativo',
+                 'Idade (anos)', 'Probabilidade de ocorrência (-)',
+                 hists=[_hist(result['hist_yes'], density=True,
+                              cumulative=True),
+                        _hist(result['hist_no'], density=True,
+                              cumulative=True)],
+                 legend=['Possui', 'Não possui'])
+
+
+def bar_chart_education_housing(result):
+    return _spec('bar_chart_education_housing',
+                 'Empréstimos por nível de escolaridade',
+                 'Nível de escolaridade', 'Percentual (%)',
+                 bars=_stacked(result['edu_y'], result['edu_n']),
+                 legend=['Possui', 'Não possui'], rotate_xticks=True)
+
+
+# Gráficos de cada questão
+CHARTS = OrderedDict([
+    ('bar_chart_loan_housing', bar_chart_loan_housing),
+    ('bar_chart_calls_success', bar_chart_calls_success),
+    ('hist_cumu_call_success', hist_cumu_call_success),
+    ('bar_chart_prev_curr', bar_chart_prev_curr),
+    ('hist_balance', hist_balance),
+    ('bar_chart_housing_job', bar_chart_housing_job),
+    ('hist_cumu_age_housing', hist_cumu_age_housing),
+    ('bar_chart_education_housing', bar_chart_education_housing),
+])
+
+# Gráficos gerados por cada questão, na ordem em que são apresentados
+QUESTIONS = OrderedDict([
+    (1, ['bar_chart_loan_housing']),
+    (2, ['bar_chart_calls_success']),
+    (3, ['hist_cumu_call_success']),
+    (4, ['bar_chart_prev_curr']),
+    (5, ['hist_balance']),
+    (6, ['bar_chart_housing_job', 'hist_cumu_age_housing',
+         'bar_chart_education_housing']),
+])
+
+
+def specs(results):
+    """Especificações de todos os gráficos das questões em `results`."""
+    return [CHARTS[name](results[n])
+            for n in results for name in QUESTIONS[n]]
@@ -0,0 +1,558 @@
+# -*- coding: utf-8 -*-
+"""Questões do desafio.
+
+Cada questão é uma função que recebe o DataFrame categorizado, `df`, e as
+tabelas de contagem de `bank.stream.TABLES`, `tables`, e retorna um
+dicionário com os resultados e os dados dos gráficos. Todas as questões são
+calculadas apenas a partir das tabelas de contagem, que podem ser obtidas em
+blocos ou em partes do banco de dados e somadas (ver `bank.shard`), portanto
+`df` pode ser `None`. As funções não
+imprimem nem salvam nada, ver `desafio.report` e `desafio.plots`.
+
+Quando `tables` contém os sketches de `bank.sketch.SKETCHES` (modo
+aproximado), as medianas, os percentuais e os histogramas das questões 5 e 6
+são obtidos dos sketches, sem utilizar as colunas completas.
+
+As bibliotecas utilizadas apenas em algumas questões (Scipy e Scikit-learn)
+são importadas dentro das respectivas funções.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from bank import anova
+from bank import ecdf
+from bank import sketch
+from bank import bootstrap
+from bank import instrument
+from bank import stream
+from bank import relevance
+
+
+def tables(df, sketches=None):
+    """Calcula as tabelas de contagem de todas as questões a partir de `df`,
+    e os sketches `sketches` no modo aproximado.
+    """
+    return stream.aggregate([df], sketches=sketches)
+
+
+# ## Questão 1
+#
+# Nesta questão foi considerado como empréstimo tanto o empréstimo imobiliário
+# quanto o empréstimo. Primeiramente, obteve-se o percentual de pessoas que
+# têm qualquer tipo de empréstimo por profissão.
+#
+# Como pode-se observar a profissão que tem a maior tendência em fazer
+# empréstimo são profissionais colarinho azul (blue-collar). Destes
+# profissionais cerca de 78% possui algum tipo de empréstimo. Por fim,
+# obtêm-se o número de empréstimos de cada tipo dessa profissão. Dessa forma,
+# temos que essa profissão tem tendência a fazer empréstimos imobiliários.
+
+def q1(df, tables):
+    """Qual profissão tem mais tendência a fazer um empréstimo? De qual tipo?
+    """
+    # Contagem por profissão, empréstimo imobiliário e empréstimo
+    table = tables['job_loan']
+
+    # Obtêm-se a ocorrências de empréstimo por profissão
+    jobs = table.groupby(level='job').sum().sort_values(ascending=False)
+    loan_n = table.xs(('no', 'no'), level=('housing', 'loan'))
+    loan_y = jobs - loan_n[jobs.index]
+
+    # Normaliza-se os dados
+    idx = jobs.index
+    loan_yn = loan_y[idx] / jobs
+    loan_nn = loan_n[idx] / jobs
+
+    # Organiza-se os dados
+    loan_yn = loan_yn.sort_values(ascending=False)*100
+    idx = loan_yn.index
+    loan_nn = loan_nn[idx]*100
+
+    # Obtêm-se o número de cada tipo de empréstimo por profissão
+    loan_h = table.xs('yes', level='housing').groupby(level='job').sum()
+    loan_l = table.xs('yes', level='loan').groupby(level='job').sum()
+
+    return OrderedDict([
+        ('loan_yn', loan_yn),
+        ('loan_nn', loan_nn),
+        ('job', idx[0]),
+        ('housing', int(loan_h[idx[0]])),
+        ('loan', int(loan_l[idx[0]])),
+    ])
+
+
+# ## Questão 2
+#
+# Nesta questão foi considerado o número de contatos e o sucesso da campanha
+# atual. O sucesso neste caso foi considerado quando o cliente assina o termo
+# de adesão. Assim, para verificar se há uma relação entre o número de contato
+# e o sucesso na campanha, foi gerado um gráfico de barras onde mostra o
+# percentual do sucesso e insucesso para cada número de ligações.
+#
+# Como pode-se observar, de forma geral o percentual reduz a medida que o
+# número de ligações aumenta. Além disso, observa-se também um aumento do
+# sucesso a medida que o número de contato aumenta acima de 20 ligações.
+# Contudo, nestes casos há apenas uma amostra que resultou em sucesso para
+# cada caso. Portanto, devido ao número de amostragem, para esses casos
+# não é possível afirmar com certeza se essa tendência se repetiriria caso
+# houvesse um maior número de amostras.
+#
+# Além disso, observa-se pelo percentual de insucesso que de forma geral não
+# houve sucesso nos casos em que o número de contato superou 18 ligações.
+# Portanto, não justificaria continuar entrando em contato acima desse número
+# de ligações.
+
+def q2(df, tables):
+    """Fazendo uma relação entre número de contatos e sucesso da campanha
+    quais são os pontos relevantes a serem observados?
+    """
+    # Obtêm-se o sucesso e o insucesso da campanha por número
+    # de ligações
+    table = tables['campaign_y'].unstack('y', fill_value=0)
+    table = table[table.sum(axis=1) > 0]
+    success = table['yes']
+    fail = table['no']
+
+    n = table.sum(axis=1)
+
+    # Normaliza-se os dados
+    idx = n.index.sort_values()
+    n = n[idx]
+    success_n = success.reindex(idx, fill_value=0) / n
+    fail_n = fail.reindex(idx, fill_value=0) / n
+
+    success_n *= 100
+    fail_n *= 100
+
+    return OrderedDict([
+        ('success_n', success_n),
+        ('fail_n', fail_n),
+    ])
+
+
+# ## Questão 3
+#
+# Como análise incial foi feita o histograma cumulativo entre o número de
+# contatos e o sucesso da campanha. Além disso, também é mostrado o número
+# médio de ligações.
+#
+# Pode-se observar no histograma cumulativo que a maior parte dos casos que
+# obtiveram sucesso tiveram um número de ligações inferior a 11 ligações, que
+# corresponde a 99.11% dos casos. Portanto, indicaria o número máximo de 10
+# ligações. Já o número médio de ligações que recomendaria seria de 5
+# ligações, que corresponde a 95.21% dos casos de sucesso.
+#
+# Contudo, para se obter um número de ligações ótimo, o ideal é que se tivesse
+# ao menos o custo referente a cada ligação e se há uma duração da campanha.
+# Assim, seria possível estimar mais precisamente qual seria o número de
+# ligações ótimo. Uma vez que seria considerado o ga dassto e o retorno do
+# possível cliente. Também, caso a campanha tenha uma duração limitada, o
+# tempo gasto fazer múltiplas ligações para um mesmo cliente pode limitar o
+# alcance da campanha, já que poderia-se estar ligando para outros clientes
+# diferentes e obtendo a adesão destes.
+
+def q3(df, tables):
+    """Baseando-se nos resultados de adesão desta campanha qual o número
+    médio e o máximo de ligações que você indica para otimizar a adesão?
+    """
+    # Obtêm-se o sucesso campanha por número de ligações
+    contact_counts = tables['campaign_y'].xs('yes', level='y')
+    contact_counts = contact_counts[contact_counts > 0]
+    contact = contact_counts.index.values
+
+    mean = (contact * contact_counts).sum() / contact_counts.sum()
+
+    return OrderedDict([
+        ('mean', float(mean)),
+        ('contact_counts', contact_counts),
+    ])
+
+
+# ## Questão 4
+#
+# Para analisar se o resultado da campanha anterior tem alguma relevância na
+# campanha atual, obteve-se os casos em que houve sucesso na campanha anterior
+# e cotrastou-se com os casos que obteve-se sucesso na campanha atual.
+#
+# Pode-se observar que aproximadamente 65% dos casos em que obteve-se sucesso
+# na campanha anterior também se obteve sucesso na campanha atual. Este
+# resultado indica que há uma tendência entre clientes que aceitaram uma
+# proposta no passado em aceitar uma nova no futuro. Este resultado portanto
+# pode ser utilizado para otimizar as ligações em futuras campanhas,
+# priorizando clientes que já aceitaram o serviço anteiormente.
+
+def q4(df, tables):
+    """O resultado da campanha anterior tem relevância na campanha atual?"""
+    # Obtêm-se os casos que obtiveram sucesso na campanha anterior
+    success_y = tables['poutcome_y'].xs('success', level='poutcome')
+    success_y = success_y.sort_values(ascending=False)
+
+    # Normaliza-se os dados
+    success_yn = success_y / success_y.sum()
+    success_yn *= 100
+
+    return OrderedDict([
+        ('success_yn', success_yn),
+    ])
+
+
+def _pairs(tables, client_data, target):
+    # Tabelas de contagem (característica, alvo) de cada característica. No
+    # modo aproximado as colunas numéricas só têm as tabelas das classes
+    pairs, binned = OrderedDict(), []
+    for col in client_data:
+        name = '{}_{}'.format(col, target)
+        if name + stream.BINS in tables:
+            name += stream.BINS
+            binned.append(col)
+        pairs[col] = tables[name]
+    return pairs, binned
+
+
+def _select(tables, client_data, target):
+    # Obtêm-se a melhor característica de cada função de avaliação a partir
+    # das tabelas de contagem de cada característica com o alvo. A
+    # informação mútua é exata para as características categóricas e
+    # estimada por vizinhos mais próximos apenas para as contínuas, ou
+    # calculada sobre as classes no modo aproximado. O F-value não depende
+    # da escala, portanto o número da classe substitui o valor
+    pairs, binned = _pairs(tables, client_data, target)
+
+    # Assim como `SelectKBest(k=1)`, escolhe-se a última característica de
+    # maior ANOVA F-value
+    with instrument.stage('questions.anova', target=target):
+        moments = anova.from_tables(pairs, target)
+        scores = np.array(anova.test(moments, pvalues=False)['f'])
+        scores[np.isnan(scores)] = np.finfo(scores.dtype).min
+        f_class = client_data[np.argsort(scores, kind='mergesort')[-1]]
+
+    with instrument.stage('questions.mutual_info', target=target):
+        mutual = relevance.from_tables(pairs, discrete=binned)
+    return f_class, mutual
+
+
+def _distribution(table, level):
+    # Valores observados na classe `level` e o número de ocorrências de cada
+    # um, a partir da tabela de contagem (valor, classe)
+    counts = table.xs(level, level=1)
+    counts = counts[counts > 0]
+    return counts.index.values, counts.values
+
+
+def _histogram(values, bins, counts=None):
+    # Histograma de `values`, os gráficos utilizam apenas as contagens
+    counts, edges = np.histogram(values, bins=bins, weights=counts)
+    return OrderedDict([('counts', counts), ('edges', edges)])
+
+
+def _chisquare(table):
+    # Teste de chi-quadrado da coluna 'yes' da tabela de contingência
+    import scipy.stats as st
+
+    x = table.sum(axis=1).sort_values(ascending=False)
+    y = table['yes'].sort_values(ascending=False)
+    z = table['no'].sort_values(ascending=False)
+
+    chi, p, = st.chisquare(y, y.sum() * x[y.index] / x.sum())
+    return x, y, z, float(chi), float(p)
+
+
+# ## Questão 5
+#
+# Para obter o fator que está mais relacionado a dívida do cliente e portanto
+# exigir um seguro de crédito, foi selecionado apenas os dados pessoais do
+# cliente. Assim, será possível obter uma característica mesmo se não houver
+# dados do cliente referente a campanhas atuais ou anteriores.
+#
+# Ao todo tem-se 7 dados pessoais dos clientes, portanto, para não ter que
+# analisar cada dado separadamente, foi utilizado um *wrapper* que seleciona
+# as características que apresenta os maiores valores *k*, com as funções de
+# avaliação *ANOVA F-value* e *Mutual information*. Nesse caso foi escolhido
+# apenas o maior valor.
+#
+# Apesar das funções de avaliações resultarem e características distintas, a
+# segunda melhor caracterítica para a função *ANOVA F-value* foi também o
+# saldo do cliente. Dessa forma, será analisado os dois casos separadamente.
+#
+# Primeiramente para analisar se existe de fato uma relação, foi feito o teste
+# de chi-quadrado para avaliar a indepêndencia dos casos em que o cliente tem
+# dívida e também tem empréstimo. Como o P-valor obtido foi aproximadamente 0,
+# temos que os casos são independente.
+#
+# Observa-se que cerca de 37% dos clientes que possuem dívida também possuem
+# empréstimo. Contudo, apenas aproximadamente 4% dos clientes que possuem
+# empréstimo tem dívida. Portanto, a dívida não é um fator determinante.
+#
+# Para analisar o saldo do cliente foi feito um histograma do saldo dos
+# clientes que possuem dívida e um outro para os que não possuem dívidas.
+# As distribuições dos saldos para os casos que possuem e não possuem dívida
+# são diferentes. Onde no caso dos que possuem dívida a distribuição está mais
+# deslocada para e esquerda, saldo negativo, do que os que não possuem, mais
+# deslocada a direita, saldo positivo. Dessa forma tem-se que a mediana das
+# distibuições são perceptivelmente diferentes. Além disso, de forma geral o
+# saldo dos clientes que não possuem dívidas são maiores dos que possuem.
+#
+# Como a mediana dos dois casos são sensivelmente diferentes, este pode ser um
+# critério para se avaliar para exigir ou não um seguro de crédito. Assim,
+# tem-se que o saldo do cliente é um fator determinante para exigir o seguro
+# de crédito.
+
+def q5(df, tables):
+    """Qual o fator determinante para que o banco exija um seguro de crédito?
+    """
+    # Seleciona-se os dados dos clientes
+    client_data = [
+        'age',
+        'job',
+        'marital',
+        'education',
+        'balance',
+        'housing',
+        'loan',
+    ]
+    f_class, mutual_info = _select(tables, client_data, 'default')
+
+    # Seleciona-se dados referente ao empréstimo
+    table = tables['loan_default'].unstack('default')
+    x, y, z, chi, p = _chisquare(table)
+
+    percent = (y / y.sum())*100
+
+    z = table.loc['yes'].sort_values(ascending=False)
+    percent_d = (z / z.sum())*100
+
+    # Seleciona-se dados referente ao saldo. No modo aproximado as
+    # estatísticas são obtidas dos sketches de cada grupo
+    if 'balance_default_sketch' in tables:
+        yes = tables['balance_default_sketch']['yes']
+        no = tables['balance_default_sketch']['no']
+
+        median_yes = sketch.quantile(yes['kll'], 0.5)
+        median_no = lim = sketch.quantile(no['kll'], 0.5)
+        percent_y = (1 - sketch.cdf(yes['kll'], lim)) * 100
+        percent_n = sketch.cdf(no['kll'], lim, strict=True) * 100
+        hist_yes, hist_no = sketch.histogram(yes), sketch.histogram(no)
+    else:
+        # O índice ordenado de cada grupo responde os quantis e os
+        # percentuais por busca binária
+        index = ecdf.from_table(tables['balance_default'])
+        yes, no = index['yes'], index['no']
+
+        median_yes = ecdf.quantile(yes, 0.5)
+        median_no = lim = ecdf.quantile(no, 0.5)
+        percent_y = ecdf.share(yes, lim) * 100
+        percent_n = ecdf.share(no, lim, above=False) * 100
+        hist_yes = _histogram(yes['values'], 100, ecdf.counts_of(yes))
+        hist_no = _histogram(no['values'], 100, ecdf.counts_of(no))
+
+    return OrderedDict([
+        ('f_class', f_class),
+        ('mutual', mutual_info.index[0]),
+        ('mutual_info', mutual_info),
+        ('chi', chi),
+        ('p', p),
+        ('percent', percent),
+        ('percent_d', percent_d),
+        ('hist_yes', hist_yes),
+        ('hist_no', hist_no),
+        ('median_yes', median_yes),
+        ('median_no', median_no),
+        ('lim', lim),
+        ('percent_y', percent_y),
+        ('percent_n', percent_n),
+    ])
+
+
+# ## Questão 6
+#
+# O metodologia para obter essas características é semelhante a descrita e
+# utilizada na Questão 5. Ou seja, para não ter que analisar cada dado
+# separadamente, foi utilizado o mesmo *wrapper* da Questão 5, com as mesmas
+# funções de avaliação. Além disso, também foi usado teste de chi-quadrado
+# para avaliar para avaliar a indepêndencia dos casos estudados.
+#
+# De forma semelhante a Questão 5 foi selecionado apenas os dados pessoais do
+# cliente para se obter uma característica que independe da campanha atual ou
+# anteior. Cada função de avaliação resultou em uma característica distinta
+# que serão analisadas.
+#
+# Para a profissão o P-valor é próximo de 0, portanto tem-se que os casos são
+# independentes. A profissão que mais faz empréstimos imobiliários é de
+# colarinho azul, seguida de serviços e administração. Tem-se também que
+# aposentados estudantes e empregadas domésticas são os que possuem menor
+# percentual de empréstimo imobiliário.
+#
+# Já para o caso da idade das pessoas foi feito um histograma cumulativo para
+# avaliar quais idades fazem mais empréstimo imobiliário. Observa-se que
+# pessoas mais jovens tendem a fazer mais empréstimo do que pessoas mais
+# velhas, como evidenciado pelo cálculo da média dos dois casos. Além disso,
+# cerca de 80% das pessoas que fazem empréstimo imobiliário têm idade inferior
+# a 45 anos e cerca de 50% das pessoas têm idade inferior 34 anos.
+#
+# Por fim, foi avaliado também uma tercerira característica, escolaridade, que
+# apresentou uma ligeira diferença entre os casos que possui ou não um
+# empréstimo imobiliário. Foi feito o mesmo procedimento utilizado no caso da
+# profissão. Tem-se que o P-valor é próximo de 0, portanto tem-se que os casos
+# são independentes. Mais da metade das pessoas que não possuem graduação tem
+# empréstimo imobiliário. Enquanto que cerca de 44% das pessoas com graduação
+# possui.
+#
+# Desssa forma, as características mais proeminente de um cliente que possui
+# um empréstimo imobiliário é um cliente que não possui graduação tem uma
+# idade inferior a 45 anos e tem uma profissão de colarinho azul.
+
+def q6(df, tables):
+    """Quais são as características mais proeminentes de um cliente que
+    possua empréstimo imobiliário?
+    """
+    # Seleciona-se os dados dos clientes
+    client_data = [
+        'age',
+        'job',
+        'marital',
+        'education',
+        'default',
+        'balance',
+        'loan',
+    ]
+    f_class, mutual_info = _select(tables, client_data, 'housing')
+
+    # Seleciona-se dados referente a profissão
+    table = tables['job_loan'].groupby(level=['job', 'housing']).sum()
+    x, y, z, chi_job, p_job = _chisquare(table.unstack('housing'))
+
+    # Normaliza-se os dados
+    job_y = (y / x[y.index]).sort_values(ascending=False)
+    job_n = (z / x[z.index])[job_y.index]
+
+    job_y *= 100
+    job_n *= 100
+
+    # Seleciona-se dados referente a idade
+    if 'age_housing_sketch' in tables:
+        yes = tables['age_housing_sketch']['yes']
+        no = tables['age_housing_sketch']['no']
+
+        mean_yes, mean_no = sketch.mean(yes), sketch.mean(no)
+        hist_yes, hist_no = sketch.histogram(yes), sketch.histogram(no)
+    else:
+        index = ecdf.from_table(tables['age_housing'])
+        yes, no = index['yes'], index['no']
+
+        mean_yes, mean_no = ecdf.mean(yes), ecdf.mean(no)
+        hist_yes = _histogram(yes['values'], 20, ecdf.counts_of(yes))
+        hist_no = _histogram(no['values'], 20, ecdf.counts_of(no))
+
+    # Seleciona-se dados referente a escolaridade
+    table = tables['education_housing'].unstack('housing')
+    x, y, z, chi_edu, p_edu = _chisquare(table)
+
+    # Normaliza-se os dados
+    edu_y = (y / x[y.index]).sort_values(ascending=False)
+    edu_n = (z / x[z.index])[edu_y.index]
+
+    return OrderedDict([
+        ('f_class', f_class),
+        ('mutual', mutual_info.index[0]),
+        ('mutual_info', mutual_info),
+        ('chi_job', chi_job),
+        ('p_job', p_job),
+        ('job_y', job_y),
+        ('job_n', job_n),
+        ('hist_yes', hist_yes),
+        ('hist_no', hist_no),
+        ('mean_yes', mean_yes),
+        ('mean_no', mean_no),
+        ('chi_edu', chi_edu),
+        ('p_edu', p_edu),
+        ('edu_y', edu_y),
+        ('edu_n', edu_n),
+    ])
+
+
+# ## Intervalos de confiança
+#
+# As estatísticas pontuais das questões 3, 5 e 6 são acompanhadas de
+# intervalos de confiança *bootstrap*, obtidos reamostrando as contagens de
+# cada valor nas tabelas de contagem (ver `bank.bootstrap`).
+
+def _stats3(values, samples):
+    return OrderedDict([('mean', bootstrap.mean(values[0], samples[0]))])
+
+
+def _stats5(values, samples):
+    median_yes = bootstrap.median(values[0], samples[0])
+    median_no = bootstrap.median(values[1], samples[1])
+    return OrderedDict([
+        ('median_yes', median_yes),
+        ('median_no', median_no),
+        ('percent_y', bootstrap.share(values[0], samples[0], median_no)
+         * 100),
+        ('percent_n', bootstrap.share(values[1], samples[1], median_no,
+                                      above=False) * 100),
+    ])
+
+
+def _stats6(values, samples):
+    return OrderedDict([
+        ('mean_yes', bootstrap.mean(values[0], samples[0])),
+        ('mean_no', bootstrap.mean(values[1], samples[1])),
+    ])
+
+
+def ci3(tables, replicates=bootstrap.REPLICATES, seed=0, jobs=1):
+    """Intervalo de confiança do número médio de ligações da questão 3."""
+    groups = [_distribution(tables['campaign_y'], 'yes')]
+    return bootstrap.intervals(groups, _stats3, replicates, seed, jobs)
+
+
+def ci5(tables, replicates=bootstrap.REPLICATES, seed=0, jobs=1):
+    """Intervalos de confiança das medianas do saldo e dos percentuais da
+    questão 5. Em cada réplica o limite é a mediana reamostrada do saldo dos
+    que não possuem dívida, assim como na estimativa pontual.
+    """
+    table = tables['balance_default']
+    groups = [_distribution(table, 'yes'), _distribution(table, 'no')]
+    return bootstrap.intervals(groups, _stats5, replicates, seed, jobs)
+
+
+def ci6(tables, replicates=bootstrap.REPLICATES, seed=0, jobs=1):
+    """Intervalos de confiança da idade média da questão 6."""
+    table = tables['age_housing']
+    groups = [_distribution(table, 'yes'), _distribution(table, 'no')]
+    return bootstrap.intervals(groups, _stats6, replicates, seed, jobs)
+
+
+# Funções de cada questão
+QUESTIONS = OrderedDict([
+    (1, q1),
+    (2, q2),
+    (3, q3),
+    (4, q4),
+    (5, q5),
+    (6, q6),
+])
+
+# Tabelas de contagem lidas por cada questão (e os sketches, no modo
+# aproximado)
+DEPENDS = OrderedDict([
+    (1, ['job_loan']),
+    (2, ['campaign_y']),
+    (3, ['campaign_y']),
+    (4, ['poutcome_y']),
+    (5, ['loan_default', 'balance_default_sketch'] +
+     ['{}_default{}'.format(col, suffix) for suffix in ('', stream.BINS)
+      for col in stream.CLIENT if col != 'default']),
+    (6, ['job_loan', 'education_housing', 'age_housing_sketch'] +
+     ['{}_housing{}'.format(col, suffix) for suffix in ('', stream.BINS)
+      for col in stream.CLIENT if col != 'housing']),
+])
+
+# Intervalos de confiança de cada questão
+INTERVALS = OrderedDict([
+    (3, ci3),
+    (5, ci5),
+    (6, ci6),
+])
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Renderização das especificações de `desafio.plots`.
+
+Cada gráfico é desenhado em uma `Figure` própria com a API orientada a
+objetos do Matplotlib, sem o estado global do `pyplot`. Como as
+especificações contêm apenas dados agregados, elas podem ser enviadas a um
+conjunto de processos que renderizam os gráficos em paralelo.
+"""
+
+import io
+import os
+import multiprocessing
+
+from bank import instrument
+
+
+# Formatos de saída suportados
+FORMATS = ('png', 'svg', 'pdf')
+
+# Tipo de conteúdo de cada formato
+MIMETYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'pdf': 'application/pdf',
+}
+
+
+def draw(spec):
+    """Desenha a especificação `spec` em uma nova `Figure`."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+
+    for bar in spec['bars']:
+        patches = ax.bar(bar['x'], bar['height'], bottom=bar.get('bottom'))
+        for i, color in bar.get('colors', {}).items():
+            patches[int(i)].set_color(color)
+
+    for hist in spec['hists']:
+        edges = hist['edges']
+        ax.hist(edges[:-1], bins=edges, weights=hist['counts'],
+                density=hist.get('density', False),
+                cumulative=hist.get('cumulative', False),
+                alpha=hist.get('alpha'))
+
+    if spec['ylim'] is not None:
+        ax.set_ylim(spec['ylim'])
+    if spec['xlim'] is not None:
+        ax.set_xlim(spec['xlim'])
+    ax.grid(True, alpha=0.5)
+    if spec['legend'] is not None:
+        ax.legend(spec['legend'])
+    if spec['rotate_xticks']:
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
+    ax.set_xlabel(spec['xlabel'])
+    ax.set_ylabel(spec['ylabel'])
+    if spec['show_title']:
+        ax.set_title(spec['title'])
+    return fig
+
+
+def save(spec, path, fmt='png'):
+    """Desenha e salva `spec` no diretório `path`.
+
+    Retorna o título e o nome do arquivo.
+    """
+    filename = '{}.{}'.format(spec['name'], fmt)
+    with instrument.stage('render.draw', chart=spec['name']):
+        fig = draw(spec)
+    with instrument.stage('render.savefig', chart=spec['name'], fmt=fmt):
+        fig.savefig(os.path.join(path, filename), format=fmt,
+                    bbox_inches='tight')
+    return spec['title'], filename
+
+
+def to_bytes(spec, fmt='png'):
+    """Desenha `spec` e retorna o conteúdo do arquivo no formato `fmt`."""
+    buffer = io.BytesIO()
+    draw(spec).savefig(buffer, format=fmt, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _save(args):
+    # Os registros da instrumentação são retornados com o resultado
+    with instrument.collect() as records:
+        saved = save(*args)
+    return saved, records
+
+
+def save_all(specs, path, fmt='png', jobs=1):
+    """Salva todos os gráficos de `specs` em `jobs` processos.
+
+    Retorna um dicionário com o título e o nome do arquivo de cada gráfico.
+    """
+    if fmt not in FORMATS:
+        raise ValueError('Formato não suportado: {}'.format(fmt))
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    tasks = [(spec, path, fmt) for spec in specs]
+    jobs = min(jobs or multiprocessing.cpu_count(), len(tasks))
+    if jobs <= 1:
+        saved = [_save(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(jobs) as pool:
+            saved = pool.map(_save, tasks, chunksize=1)
+    for _, records in saved:
+        instrument.extend(records)
+    saved = [item for item, _ in saved]
+    return {spec['name']: item for spec, item in zip(specs, saved)}
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Apresentação dos resultados das questões.
+
+Cada função imprime o resultado de uma questão e chama `plot(name)` no
+ponto em que o gráfico `name` deve ser gerado.
+"""
+
+from collections import OrderedDict
+
+
+def _ci(result, name, fmt='{:.2f}'):
+    # Intervalo de confiança da estatística `name`, se calculado
+    if name not in result.get('ci', {}):
+        return ''
+    lo, hi = result['ci'][name]
+    return ' (IC 95%: {} a {})'.format(fmt.format(lo), fmt.format(hi))
+
+
+def header(n):
+    print('======================================================================')
+    print('=========================== Questão {} ================================'
+          .format(n))
+    print('======================================================================')
+
+
+def q1(result, plot):
+    plot('bar_chart_loan_housing')
+    print('Número de empréstimos:')
+    print('Imobiliário: {}'.format(result['housing']))
+    print('Empréstimo: {}'.format(result['loan']))
+
+
+def q2(result, plot):
+    plot('bar_chart_calls_success')
+
+
+def q3(result, plot):
+    print('Número médio de ligações: {:.2f}{}'.format(
+        result['mean'], _ci(result, 'mean')))
+    plot('hist_cumu_call_success')
+
+
+def q4(result, plot):
+    plot('bar_chart_prev_curr')
+
+
+def _chisquare(chi, p):
+    print('Chi-quadrado: {:.2f}'.format(chi))
+    print('P-valor: {:.4f}'.format(p))
+
+
+def q5(result, plot):
+    print('ANOVA F-value: {}'.format(result['f_class']))
+    print('Mutual information: {}'.format(result['mutual']))
+    _chisquare(result['chi'], result['p'])
+
+    percent = result['percent']
+    print('Possui empréstimo: {:.2f}%'.format(percent['yes']))
+    print('Não possui empréstimo: {:.2f}%'.format(percent['no']))
+    print('Possui empréstimo e tem dívida: {:.2f}%'.format(
+        result['percent_d']['yes']))
+
+    plot('hist_balance')
+
+    print('Mediana do saldo dos que possuem dívida: €{}{}'.format(
+        result['median_yes'], _ci(result, 'median_yes', '€{}')))
+    print('Mediana do saldo dos que não possuem dívida: €{}{}'.format(
+        result['median_no'], _ci(result, 'median_no', '€{}')))
+
+    lim = result['lim']
+    text_y = 'Percentual dos que possuem dívida e saldo maior que'
+    text_n = 'Percentual dos que não possuem dívida e saldo menor que'
+    print(text_y + ' €{}: {:.2f}%{}'.format(
+        lim, result['percent_y'], _ci(result, 'percent_y', '{:.2f}%')))
+    print(text_n + ' €{}: {:.2f}%{}'.format(
+        lim, result['percent_n'], _ci(result, 'percent_n', '{:.2f}%')))
+
+
+def q6(result, plot):
+    print('ANOVA F-value: {}'.format(result['f_class']))
+    print('Mutual information: {}'.format(result['mutual']))
+
+    _chisquare(result['chi_job'], result['p_job'])
+    plot('bar_chart_housing_job')
+
+    plot('hist_cumu_age_housing')
+    print('Idade média:')
+    print('* Possui empréstimo: {:.2f} anos{}'.format(
+        result['mean_yes'], _ci(result, 'mean_yes')))
+    print('* Não possui empréstimo: {:.2f} anos{}'.format(
+        result['mean_no'], _ci(result, 'mean_no')))
+
+    _chisquare(result['chi_edu'], result['p_edu'])
+    plot('bar_chart_education_housing')
+
+
+# Apresentação de cada questão
+REPORTS = OrderedDict([
+    (1, q1),
+    (2, q2),
+    (3, q3),
+    (4, q4),
+    (5, q5),
+    (6, q6),
+])
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Execução das questões em paralelo.
+
+As questões são independentes entre si, todas apenas leem o mesmo DataFrame
+e as mesmas tabelas de contagem. Os processos de trabalho são criados com
+`fork` após a leitura dos dados, dessa forma eles compartilham as páginas de
+memória do DataFrame com o processo principal sem nenhuma cópia. Cada
+processo calcula uma questão, e os resultados são retornados na ordem das
+questões. Os gráficos são renderizados depois, por `desafio.render`.
+"""
+
+import multiprocessing
+
+from bank import instrument
+
+from .questions import QUESTIONS
+
+
+# Questões mais custosas (seleção de características), enviadas primeiro para
+# que o tempo total se aproxime do tempo da questão mais lenta
+HEAVY = (5, 6)
+
+# Dados compartilhados com os processos de trabalho, definidos antes do fork
+_DF = None
+_TABLES = None
+
+
+def _task(n):
+    # Os registros da instrumentação são retornados com o resultado, pois
+    # nos processos de trabalho eles não chegam ao processo principal
+    with instrument.collect() as records:
+        with instrument.stage('question', n=n):
+            result = QUESTIONS[n](_DF, _TABLES)
+    return n, result, records
+
+
+def _result(task):
+    n, result, records = task
+    instrument.extend(records)
+    return n, result
+
+
+def available():
+    """Retorna `True` se os processos podem ser criados com `fork`."""
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def run(questions, df, tables, jobs=None):
+    """Executa as questões em `jobs` processos.
+
+    Retorna um iterador de `(n, resultado)` na ordem de `questions`.
+    """
+    global _DF, _TABLES
+
+    questions = list(questions)
+    jobs = min(jobs or multiprocessing.cpu_count(), len(questions))
+
+    if jobs <= 1 or not available():
+        _DF, _TABLES = df, tables
+        try:
+            for n in questions:
+                yield _result(_task(n))
+        finally:
+            _DF = _TABLES = None
+        return
+
+    _DF, _TABLES = df, tables
+    try:
+        with multiprocessing.get_context('fork').Pool(jobs) as pool:
+            # As questões são enviadas de uma vez, mas os resultados são
+            # retornados na ordem de `questions`
+            order = sorted(questions, key=lambda n: n not in HEAVY)
+            tasks = {n: pool.apply_async(_task, (n,))
+                     for n in order}
+            for n in questions:
+                yield _result(tasks[n].get())
+    finally:
+        _DF = _TABLES = None
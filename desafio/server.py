@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""Servidor HTTP de análise com o banco de dados carregado em memória.
+
+O servidor (`asyncio`) carrega o DataFrame e as tabelas de contagem uma
+única vez e responde, sobre TCP ou um *socket* Unix:
+
+* `GET /health`: estado do servidor;
+* `GET /questions`: questões disponíveis;
+* `GET /questions/<n>`: resultado da questão `n` em JSON;
+* `GET /charts/<nome>.<formato>`: gráfico `nome` em PNG, SVG ou PDF;
+* `GET /chisquare?targets=y,loan&correction=holm`: teste de independência
+  das colunas categóricas (ver `bank.chisquare`);
+* `GET /ecdf?column=balance&by=default&at=0,1000&q=0.5`: frações abaixo e
+  acima de cada limite e quantis de uma coluna numérica por grupo (ver
+  `bank.ecdf`).
+
+As respostas são memorizadas por requisição, assim uma requisição repetida
+é respondida diretamente da memória. Os cálculos são feitos em uma *thread*
+separada, sem bloquear o atendimento das demais conexões.
+"""
+
+import json
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from bank import data
+from bank import ingest
+from bank import chisquare
+from bank import ecdf
+
+from . import plots
+from . import render
+from .questions import QUESTIONS, tables as count_tables
+
+
+# Número máximo de respostas memorizadas
+CACHE_SIZE = 256
+
+# Mensagens de cada código de estado
+STATUS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+JSON = 'application/json'
+
+
+class HTTPError(Exception):
+    """Erro de uma requisição, respondido com o código `status`."""
+
+    def __init__(self, status, message):
+        super(HTTPError, self).__init__(message)
+        self.status = status
+
+
+def jsonable(obj):
+    """Converte os resultados das questões para tipos serializáveis em JSON.
+    """
+    if isinstance(obj, pd.Series):
+        return OrderedDict((str(k), jsonable(v)) for k, v in obj.items())
+    if isinstance(obj, pd.DataFrame):
+        return [jsonable(row) for _, row in obj.iterrows()]
+    if isinstance(obj, dict):
+        return OrderedDict((str(k), jsonable(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [jsonable(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
+def _json(obj):
+    return JSON, json.dumps(jsonable(obj)).encode()
+
+
+def warm(path_data=data.PATH_DATA, offline=None):
+    """Carrega o banco de dados e as tabelas de contagem do servidor."""
+    df = ingest.load(data.DATASET, path_data, offline=offline)
+    return {
+        'df': df,
+        'tables': count_tables(df),
+        'results': {},
+        'indexes': {},
+        'cache': OrderedDict(),
+        'executor': ThreadPoolExecutor(max_workers=1),
+    }
+
+
+def _result(state, n):
+    # Resultado da questão `n`, calculado uma única vez
+    if n not in state['results']:
+        state['results'][n] = QUESTIONS[n](state['df'], state['tables'])
+    return state['results'][n]
+
+
+def _question(state, name):
+    try:
+        n = int(name)
+    except ValueError:
+        raise HTTPError(404, 'questão inválida: {}'.format(name))
+    if n not in QUESTIONS:
+        raise HTTPError(404, 'questão inválida: {}'.format(name))
+    return _json(_result(state, n))
+
+
+def _chart(state, filename):
+    name, _, fmt = filename.rpartition('.')
+    if name not in plots.CHARTS or fmt not in render.FORMATS:
+        raise HTTPError(404, 'gráfico inválido: {}'.format(filename))
+    n = next(n for n, names in plots.QUESTIONS.items() if name in names)
+    spec = plots.CHARTS[name](_result(state, n))
+    return render.MIMETYPES[fmt], render.to_bytes(spec, fmt)
+
+
+def _chisquare(state, query):
+    targets = query.get('targets', [','.join(chisquare.TARGETS)])[0]
+    targets = None if targets == 'all' else targets.split(',')
+    method = query.get('correction', ['holm'])[0]
+    columns = set(state['df'].columns)
+    if targets is not None and not columns.issuperset(targets):
+        raise HTTPError(400, 'alvos inválidos: {}'.format(targets))
+    if method not in chisquare.CORRECTIONS:
+        raise HTTPError(400, 'correção inválida: {}'.format(method))
+    return _json(chisquare.scan(state['df'], targets=targets, method=method))
+
+
+def _numbers(query, name):
+    try:
+        return [float(v) for v in query.get(name, [''])[0].split(',')
+                if v.strip()]
+    except ValueError:
+        raise HTTPError(400, 'números inválidos: {}'.format(name))
+
+
+def _index(state, column, by):
+    # Índice ordenado de `column` por `by`, obtido da tabela de contagem
+    # quando disponível e construído uma única vez
+    key = (column, by)
+    if key not in state['indexes']:
+        table = state['tables'].get('{}_{}'.format(column, by))
+        state['indexes'][key] = ecdf.from_table(table) \
+            if table is not None else ecdf.build(state['df'], column, by)
+    return state['indexes'][key]
+
+
+def _ecdf(state, query):
+    df = state['df']
+    column = query.get('column', ['balance'])[0]
+    by = query.get('by', ['default'])[0]
+    if column not in df.columns or df[column].dtype.kind not in 'iuf':
+        raise HTTPError(400, 'coluna inválida: {}'.format(column))
+    if by not in df.columns or df[by].dtype.name != 'category':
+        raise HTTPError(400, 'grupo inválido: {}'.format(by))
+    quantiles = _numbers(query, 'q')
+    if any(q < 0 or q > 1 for q in quantiles):
+        raise HTTPError(400, 'quantis inválidos: {}'.format(quantiles))
+    result = ecdf.summary(_index(state, column, by), _numbers(query, 'at'),
+                          quantiles)
+    result.index.name = by
+    return _json(result.reset_index())
+
+
+def _route(state, target):
+    # Executa a requisição `target`, retorna o tipo e o conteúdo da resposta
+    url = urlsplit(target)
+    parts = [part for part in url.path.split('/') if part]
+    query = parse_qs(url.query)
+
+    if parts == ['health']:
+        return _json({'status': 'ok', 'rows': len(state['df'])})
+    if parts == ['questions']:
+        return _json(list(QUESTIONS))
+    if len(parts) == 2 and parts[0] == 'questions':
+        return _question(state, parts[1])
+    if len(parts) == 2 and parts[0] == 'charts':
+        return _chart(state, parts[1])
+    if parts == ['chisquare']:
+        return _chisquare(state, query)
+    if parts == ['ecdf']:
+        return _ecdf(state, query)
+    raise HTTPError(404, 'recurso inválido: {}'.format(url.path))
+
+
+async def respond(state, target):
+    """Responde `GET target`, retorna o código, o tipo e o conteúdo.
+
+    As respostas são memorizadas pela requisição. Requisições iguais feitas
+    ao mesmo tempo aguardam o mesmo cálculo.
+    """
+    cache = state['cache']
+    if target in cache:
+        cache.move_to_end(target)
+    else:
+        loop = asyncio.get_event_loop()
+        cache[target] = loop.run_in_executor(state['executor'], _route,
+                                             state, target)
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+    try:
+        ctype, body = await asyncio.shield(cache[target])
+    except HTTPError as err:
+        cache.pop(target, None)
+        return err.status, JSON, json.dumps({'error': str(err)}).encode()
+    except Exception as err:
+        cache.pop(target, None)
+        return 500, JSON, json.dumps({'error': repr(err)}).encode()
+    return 200, ctype, body
+
+
+async def _headers(reader):
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+
+
+async def handle(state, reader, writer):
+    """Atende as requisições de uma conexão, mantendo-a aberta enquanto o
+    cliente utilizar HTTP/1.1 sem `Connection: close`.
+    """
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                method, target, version = line.decode('latin-1').split()
+            except ValueError:
+                method, target, version = None, None, 'HTTP/1.0'
+            headers = await _headers(reader)
+            length = int(headers.get('content-length', 0) or 0)
+            if length:
+                await reader.readexactly(length)
+
+            if target is None:
+                status, ctype, body = 400, JSON, b'{"error": "bad request"}'
+            elif method != 'GET':
+                status, ctype = 405, JSON
+                body = b'{"error": "method not allowed"}'
+            else:
+                status, ctype, body = await respond(state, target)
+
+            keep = (version == 'HTTP/1.1' and
+                    headers.get('connection', '').lower() != 'close')
+            head = ('HTTP/1.1 {} {}\r\n'
+                    'Content-Type: {}\r\n'
+                    'Content-Length: {}\r\n'
+                    'Connection: {}\r\n\r\n').format(
+                        status, STATUS[status], ctype, len(body),
+                        'keep-alive' if keep else 'close')
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+            if not keep:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve(host='127.0.0.1', port=8000, unix=None, path_data=data.PATH_DATA,
+          offline=None, prefetch=True):
+    """Inicia o servidor em `host:port`, ou no *socket* Unix `unix`.
+
+    Com `prefetch` todas as questões são calculadas antes do início do
+    atendimento, assim mesmo as primeiras requisições são respondidas da
+    memória.
+    """
+    state = warm(path_data, offline)
+    if prefetch:
+        for n in QUESTIONS:
+            _result(state, n)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    def client(reader, writer):
+        return handle(state, reader, writer)
+
+    if unix:
+        server = loop.run_until_complete(
+            asyncio.start_unix_server(client, path=unix))
+        print('Servidor em {}'.format(unix))
+    else:
+        server = loop.run_until_complete(
+            asyncio.start_server(client, host, port))
+        print('Servidor em http://{}:{}'.format(host, port))
+
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        state['executor'].shutdown()
+        loop.close()
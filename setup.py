@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from setuptools import setup
+
+
+with open('requirements.txt') as f:
+    requirements = f.read().split()
+
+setup(
+    name='desafio',
+    version='1.0.0',
+    description='Desafio Data Science - Bank Marketing',
+    license='MIT',
+    packages=['bank', 'desafio'],
+    install_requires=requirements,
+    entry_points={
+        'console_scripts': ['desafio = desafio.cli:main'],
+    },
+)
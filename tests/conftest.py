@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Dados dos testes: o `bank.csv`, amostra de 4521 linhas distribuída com o
+banco de dados, lido com os mesmos tipos de `bank.data.load` e sem acesso à
+rede.
+"""
+
+import os
+import shutil
+
+import pytest
+
+from bank import data
+from bank import schema
+
+
+PATH_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                         'data')
+SAMPLE = 'bank.csv'
+
+
+@pytest.fixture(scope='session')
+def types():
+    return data.read_schema(data.DATASET, PATH_DATA, offline=True)
+
+
+@pytest.fixture(scope='session')
+def path_sample():
+    return os.path.join(PATH_DATA, SAMPLE)
+
+
+@pytest.fixture(scope='session')
+def df(types, path_sample):
+    with open(path_sample, 'rb') as f:
+        return data.categorize(schema.read_csv(f, types).dropna())
+
+
+@pytest.fixture
+def path_data(tmp_path):
+    # Diretório de dados com a amostra no lugar do banco de dados completo,
+    # já extraída
+    shutil.copyfile(os.path.join(PATH_DATA, SAMPLE),
+                    str(tmp_path / data.DATASET))
+    shutil.copyfile(os.path.join(PATH_DATA, 'bank-names.txt'),
+                    str(tmp_path / 'bank-names.txt'))
+    return str(tmp_path)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+from sklearn.feature_selection import f_classif
+
+from bank import anova
+from bank import stream
+
+
+FEATURES = ['age', 'job', 'marital', 'education', 'balance', 'duration',
+            'y', 'housing']
+TARGETS = ['y', 'housing']
+
+
+def _chunks(df, size=1000):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def _codes(series):
+    if series.dtype.name == 'category':
+        return np.asarray(series.cat.codes)
+    return np.asarray(series, dtype=np.float64)
+
+
+def test_matches_f_classif(df):
+    result = anova.test(anova.build([df], FEATURES, TARGETS))
+    assert len(result) == len(FEATURES) * len(TARGETS) - len(TARGETS)
+    for target in TARGETS:
+        rows = result[result['target'] == target]
+        x = np.column_stack([_codes(df[f]) for f in rows['feature']])
+        f, p = f_classif(x, _codes(df[target]))
+        np.testing.assert_allclose(rows['f'], f, rtol=1e-8)
+        np.testing.assert_allclose(rows['p'], p, rtol=1e-6, atol=1e-300)
+
+
+def test_merge_equals_whole(df):
+    whole = anova.build([df], FEATURES, TARGETS)
+    levels = whole['levels']
+    merged = None
+    for chunk in _chunks(df):
+        merged = anova.merge(merged, anova.build([chunk], FEATURES, TARGETS,
+                                                 levels))
+    for target in TARGETS:
+        for name, values in whole['moments'][target].items():
+            np.testing.assert_allclose(merged['moments'][target][name],
+                                       values)
+
+
+def test_merge_rejects_different_levels(df):
+    a = anova.build([df], ['age'], ['y'])
+    b = anova.build([df], ['age'], ['y'], OrderedDict([('y', ['yes', 'no'])]))
+    with pytest.raises(ValueError):
+        anova.merge(a, b)
+
+
+def test_from_tables_equals_build(df):
+    features = [col for col in stream.CLIENT if col != 'housing']
+    names = OrderedDict(('{}_housing'.format(col), stream.TABLES[
+        '{}_housing'.format(col)]) for col in features)
+    tables = stream.aggregate([df], names)
+    pairs = OrderedDict((col, tables['{}_housing'.format(col)])
+                        for col in features)
+    expected = anova.test(anova.build([df], features, ['housing']))
+    result = anova.test(anova.from_tables(pairs, 'housing'))
+    np.testing.assert_allclose(result['f'], expected['f'], rtol=1e-8)
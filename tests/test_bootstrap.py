@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from bank import bootstrap
+
+
+def _stats(values, samples):
+    return OrderedDict([('mean', bootstrap.mean(values[0], samples[0])),
+                        ('median', bootstrap.median(values[0], samples[0]))])
+
+
+def _groups(df):
+    # Número de ligações dos que aderiram, como na questão 3
+    counts = df['campaign'][df['y'] == 'yes'].value_counts().sort_index()
+    return [(counts.index.values, counts.values)]
+
+
+@pytest.mark.parametrize('counts', [[1, 2, 1, 2, 1], [1, 2, 1, 3, 1]])
+def test_statistics_match_expanded_rows(counts):
+    # Número de linhas ímpar e par, a mediana par é a média dos centrais
+    values = np.array([-3.0, 0.0, 1.5, 2.0, 10.0])
+    samples = bootstrap.resample(counts, 50, np.random.RandomState(0))
+    assert (samples.sum(axis=1) == sum(counts)).all()
+
+    rows = [np.repeat(values, counts) for counts in samples]
+    np.testing.assert_allclose(bootstrap.mean(values, samples),
+                               [r.mean() for r in rows])
+    np.testing.assert_allclose(bootstrap.median(values, samples),
+                               [np.median(r) for r in rows])
+    np.testing.assert_allclose(bootstrap.share(values, samples, 1.5),
+                               [(r > 1.5).mean() for r in rows])
+    np.testing.assert_allclose(
+        bootstrap.share(values, samples, 1.5, strict=False, above=False),
+        [(r <= 1.5).mean() for r in rows])
+
+
+def test_replicates_do_not_depend_on_jobs(df):
+    groups = _groups(df)
+    serial = bootstrap.replicate(groups, _stats, 1000, seed=3, jobs=1)
+    parallel = bootstrap.replicate(groups, _stats, 1000, seed=3, jobs=2)
+    for name in serial:
+        assert serial[name].size == 1000
+        np.testing.assert_array_equal(serial[name], parallel[name])
+
+
+def test_interval_matches_row_bootstrap(df):
+    # Bootstrap percentil reamostrando as linhas expandidas
+    values, counts = _groups(df)[0]
+    result = bootstrap.intervals([(values, counts)], _stats, 4000)
+    rows = np.repeat(values, counts)
+    rng = np.random.RandomState(0)
+    means = rng.choice(rows, size=(4000, rows.size)).mean(axis=1)
+    expected = np.percentile(means, [2.5, 97.5])
+    assert result['mean'] == pytest.approx(tuple(expected), abs=0.05)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import os
+
+from bank import data
+from desafio import build
+from desafio import cli
+
+
+QUESTIONS = [1, 4]
+
+
+def _run(path_data):
+    return cli.run(QUESTIONS, path_data, path_img=None, offline=True)
+
+
+def test_fingerprint_follows_values_and_index(df):
+    table = df.groupby(['job', 'y'], observed=False).size()
+    changed = table.copy()
+    changed.iloc[0] += 1
+    relabeled = table.rename_axis(['job', 'target'])
+    assert build.fingerprint(table) == build.fingerprint(table.copy())
+    assert build.fingerprint(table) != build.fingerprint(changed)
+    assert build.fingerprint(table) != build.fingerprint(relabeled)
+
+
+def test_unchanged_source_skips_table_construction(path_data, monkeypatch):
+    first = _run(path_data)
+
+    def fail(*args):
+        raise AssertionError('tabelas construídas sem alterações')
+    monkeypatch.setattr(cli, '_tables', fail)
+    second = _run(path_data)
+    assert second[1]['job'] == first[1]['job']
+    assert list(second[4]['success_yn']) == list(first[4]['success_yn'])
+
+
+def test_changed_source_rebuilds_results(path_data, monkeypatch):
+    first = _run(path_data)
+    path_csv = os.path.join(path_data, data.DATASET)
+    with open(path_csv) as f:
+        lines = f.readlines()
+    with open(path_csv, 'w') as f:
+        f.writelines(lines[:2001])
+
+    calls = []
+    tables = cli._tables
+
+    def spy(*args):
+        calls.append(args)
+        return tables(*args)
+    monkeypatch.setattr(cli, '_tables', spy)
+    result = _run(path_data)
+    assert len(calls) == 1
+    expected = cli.run(QUESTIONS, path_data, path_img=None, offline=True,
+                       use_cache=False)
+    assert result[1]['housing'] == expected[1]['housing'] != \
+        first[1]['housing']
+
+    path_cache = os.path.join(path_data, data.CACHE)
+    keys = build.read_sources(path_cache).values()
+    assert all(build.load(path_cache, key) is not None for key in keys)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from bank import chisquare
+from bank import cube
+
+
+def test_scan_matches_scipy(df):
+    result = chisquare.scan(df, targets=['y', 'loan'], method='none')
+    assert len(result) == 2 * len(chisquare.categorical(df)) - 3
+    for row in result.itertuples():
+        observed = pd.crosstab(df[row.feature], df[row.target]).values
+        chi, p, dof, _ = stats.chi2_contingency(observed, correction=False)
+        assert row.chi2 == pytest.approx(chi)
+        assert row.dof == dof
+        assert row.p == pytest.approx(p, rel=1e-6, abs=1e-300)
+        v = np.sqrt(chi / (observed.sum() * (min(observed.shape) - 1)))
+        assert row.cramers_v == pytest.approx(v)
+
+
+def test_each_pair_is_tested_once(df):
+    n = len(chisquare.categorical(df))
+    result = chisquare.scan(df, targets=None)
+    pairs = {frozenset(pair) for pair in zip(result.feature, result.target)}
+    assert len(result) == len(pairs) == n * (n - 1) // 2
+
+
+def test_empty_levels_do_not_count_in_dof():
+    counts = np.array([[[10, 20], [30, 5], [0, 0]]])
+    chi, dof, n, k = chisquare.statistic(counts)
+    expected = stats.chi2_contingency(counts[0, :2], correction=False)
+    assert chi[0] == pytest.approx(expected[0])
+    assert dof[0] == 1 and n[0] == 65 and k[0] == 2
+
+
+@pytest.mark.parametrize('method, expected', [
+    ('none', [0.01, 0.04, 0.03, np.nan, 0.2]),
+    ('bonferroni', [0.04, 0.16, 0.12, np.nan, 0.8]),
+    ('holm', [0.04, 0.09, 0.09, np.nan, 0.2]),
+    ('fdr_bh', [0.04, 0.0533333, 0.0533333, np.nan, 0.2]),
+])
+def test_correct(method, expected):
+    p = [0.01, 0.04, 0.03, np.nan, 0.2]
+    np.testing.assert_allclose(chisquare.correct(p, method), expected,
+                               rtol=1e-5)
+
+
+def test_correct_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        chisquare.correct([0.1], 'sidak')
+
+
+def test_scan_cube_equals_scan(df):
+    targets = ['y', 'housing']
+    features = list(cube.DIMENSIONS)
+    expected = chisquare.scan(df, features, targets)
+    result = chisquare.scan_cube(cube.build([df]), features, targets)
+    pd.testing.assert_frame_equal(result, expected)
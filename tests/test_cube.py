@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from bank import cube
+
+
+@pytest.fixture(scope='module')
+def whole(df):
+    return cube.build([df])
+
+
+def test_merge_equals_whole(df, whole):
+    levels = [df[dim].cat.categories for dim in cube.DIMENSIONS]
+    merged = cube.empty(levels)
+    for start in range(0, len(df), 1000):
+        merged = cube.merge(merged, cube.build([df.iloc[start:start + 1000]],
+                                               levels))
+    for name in ('cells', 'count', 'sum', 'sumsq'):
+        np.testing.assert_array_equal(merged[name], whole[name])
+
+
+def test_rollup_matches_groupby(df, whole):
+    mask = df['month'].isin(['jan', 'feb'])
+    result = cube.rollup(whole, ['job', 'loan'],
+                         {'month': ['jan', 'feb'], 'y': 'yes'})
+    rows = df[mask & (df['y'] == 'yes')]
+    expected = rows.groupby(['job', 'loan'], observed=False)['balance']
+
+    assert list(result.index) == list(expected.size().index)
+    np.testing.assert_array_equal(result['count'], expected.size())
+    np.testing.assert_allclose(result['balance_mean'], expected.mean())
+    np.testing.assert_allclose(result['balance_var'], expected.var())
+
+
+def test_rollup_rejects_unknown_dimensions_and_levels(whole):
+    with pytest.raises(ValueError, match='Dimensões'):
+        cube.rollup(whole, ['salary'])
+    with pytest.raises(ValueError, match='Níveis'):
+        cube.rollup(whole, ['job'], {'month': 'foo'})
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+from zipfile import ZipFile
+
+import pandas as pd
+import pytest
+
+from bank import data
+from bank import schema
+from conftest import PATH_DATA
+
+
+@pytest.fixture
+def path(tmp_path):
+    shutil.copyfile(os.path.join(PATH_DATA, data.ARCHIVE),
+                    str(tmp_path / data.ARCHIVE))
+    return str(tmp_path)
+
+
+def _upstream(path, monkeypatch):
+    # Simula uma nova versão do arquivo no servidor
+    def download(url, path_cache, entry):
+        blob = os.path.join(path_cache, 'new.zip')
+        with ZipFile(blob, 'w') as zfile:
+            zfile.writestr(data.DATASET, 'age;y\n30;"no"\n')
+        checksum = data.sha256(blob)
+        os.replace(blob, os.path.join(path_cache, checksum + '.zip'))
+        return {'sha256': checksum, 'etag': '"2"', 'last_modified': None}
+    monkeypatch.setattr(data, '_download', download)
+
+
+def test_pinned_checksum_restores_tampered_copy(path):
+    path_file = data.fetch(path=path, offline=True)
+    with open(path_file, 'ab') as f:
+        f.write(b'\0')
+    assert data.sha256(data.fetch(path=path, offline=True)) == data.SHA256
+
+
+def test_refresh_accepts_changed_upstream_file(path, monkeypatch):
+    data.fetch(path=path, offline=True)
+    _upstream(path, monkeypatch)
+    path_file = data.fetch(path=path, offline=False, refresh=True)
+    checksum = data.sha256(path_file)
+    assert checksum != data.SHA256
+
+    # A cópia atualizada continua válida nas execuções seguintes
+    assert data.sha256(data.fetch(path=path, offline=True)) == checksum
+    manifest = data._read_manifest(os.path.join(path, data.CACHE))
+    assert manifest[data.URL]['sha256'] == checksum
+
+
+def test_snapshot_follows_source(df, path_data, monkeypatch):
+    first = data.load(data.DATASET, path_data, offline=True)
+    pd.testing.assert_frame_equal(first, df, check_categorical=False)
+
+    # Com o mesmo arquivo o DataFrame é lido do snapshot, sem o CSV
+    read_csv = schema.read_csv
+
+    def fail(*args, **kwargs):
+        raise AssertionError('CSV lido com o snapshot válido')
+    monkeypatch.setattr(schema, 'read_csv', fail)
+    cached = data.load(data.DATASET, path_data, offline=True)
+    pd.testing.assert_frame_equal(cached, first)
+    arrays, categories = data.codes(data.DATASET, path_data, offline=True)
+    assert list(arrays) == list(first.columns)
+    assert list(categories['job'].categories) == \
+        list(first['job'].cat.categories)
+
+    # Um arquivo alterado tem outro snapshot
+    monkeypatch.setattr(schema, 'read_csv', read_csv)
+    path_csv = os.path.join(path_data, data.DATASET)
+    with open(path_csv) as f:
+        lines = f.readlines()
+    with open(path_csv, 'w') as f:
+        f.writelines(lines[:101])
+    assert len(data.load(data.DATASET, path_data, offline=True)) == 100
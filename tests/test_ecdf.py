@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from bank import ecdf
+from bank import stream
+
+
+QUANTILES = [0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1]
+LIMITS = [-1000, -1, 0, 1, 500, 1000, 10 ** 6]
+
+
+@pytest.fixture(scope='module')
+def index(df):
+    return ecdf.build(df, 'balance', 'default')
+
+
+def test_quantile_matches_numpy(df, index):
+    for level, group in index.items():
+        values = df.loc[df['default'] == level, 'balance'].values
+        np.testing.assert_allclose(ecdf.quantile(group, QUANTILES),
+                                   np.quantile(values, QUANTILES))
+        assert ecdf.quantile(group, 0.5) == pytest.approx(np.median(values))
+
+
+def test_share_and_cdf_match_masks(df, index):
+    x = np.array(LIMITS)
+    for level, group in index.items():
+        values = df.loc[df['default'] == level, 'balance'].values[:, None]
+        np.testing.assert_allclose(ecdf.share(group, x),
+                                   (values > x).mean(axis=0))
+        np.testing.assert_allclose(ecdf.share(group, x, strict=False),
+                                   (values >= x).mean(axis=0))
+        np.testing.assert_allclose(ecdf.share(group, x, above=False),
+                                   (values < x).mean(axis=0))
+        np.testing.assert_allclose(ecdf.cdf(group, x),
+                                   (values <= x).mean(axis=0))
+        assert ecdf.mean(group) == pytest.approx(values.mean())
+
+
+def _assert_index_equal(result, expected):
+    assert list(result) == list(expected)
+    for level, group in expected.items():
+        np.testing.assert_array_equal(result[level]['values'], group['values'])
+        np.testing.assert_array_equal(result[level]['cum'], group['cum'])
+
+
+def test_from_table_equals_build(df, index):
+    names = {'balance_default': stream.TABLES['balance_default']}
+    table = stream.aggregate([df], names)['balance_default']
+    _assert_index_equal(ecdf.from_table(table), index)
+
+
+def test_merge_equals_whole(df, index):
+    size = 1000
+    parts = [ecdf.build(df.iloc[i:i + size], 'balance', 'default')
+             for i in range(0, len(df), size)]
+    merged = parts[0]
+    for part in parts[1:]:
+        for level, group in part.items():
+            merged[level] = ecdf.merge(merged[level], group) \
+                if level in merged else group
+    _assert_index_equal(merged, index)
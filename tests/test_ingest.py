@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import os
+import csv
+
+import pandas as pd
+import pytest
+
+from bank import data
+from bank import ingest
+from bank import shard
+from bank import stream
+from desafio import cli
+
+
+@pytest.fixture
+def batch(df, tmp_path):
+    filename = str(tmp_path / 'week.csv')
+    df.iloc[:500].to_csv(filename, sep=';', index=False,
+                         quoting=csv.QUOTE_NONNUMERIC)
+    return filename
+
+
+def _assert_state_matches_rows(st, path_data):
+    df = ingest.load(data.DATASET, path_data, offline=True)
+    assert st['rows'] == len(df)
+    for name, table in stream.aggregate([df]).items():
+        pd.testing.assert_series_equal(st['tables'][name], table,
+                                       check_index_type=False)
+
+
+def test_append_updates_aggregates(df, path_data, batch):
+    st = ingest.append(batch, data.DATASET, path_data, offline=True)
+    assert st['rows'] == len(df) + 500
+    assert st['batches'] == ['000001' + shard.SUFFIX]
+    assert ingest.batches(path_data)
+    _assert_state_matches_rows(st, path_data)
+    assert ingest.check(data.DATASET, path_data, offline=True) == []
+
+
+def test_state_is_idempotent(df, path_data, batch):
+    ingest.append(batch, data.DATASET, path_data, offline=True)
+    st = ingest.state(data.DATASET, path_data, offline=True)
+    assert st['rows'] == len(df) + 500 and len(st['batches']) == 1
+
+    # Sem o estado salvo, ele é recriado com cada lote uma única vez
+    os.remove(os.path.join(path_data, data.CACHE, ingest.STATE))
+    st = ingest.state(data.DATASET, path_data, offline=True)
+    assert st['rows'] == len(df) + 500 and len(st['batches']) == 1
+    _assert_state_matches_rows(st, path_data)
+
+
+def test_state_follows_tables(path_data, batch, monkeypatch):
+    ingest.append(batch, data.DATASET, path_data, offline=True)
+    monkeypatch.setitem(stream.TABLES, 'marital_y', ('marital', 'y'))
+    st = ingest.state(data.DATASET, path_data, offline=True)
+    assert 'marital_y' in st['tables']
+    _assert_state_matches_rows(st, path_data)
+
+
+def test_check_reports_diverging_state(path_data, batch):
+    argv = ['ingest', batch, '--check', '--data', path_data, '--offline']
+    assert cli.main(argv) == 0
+
+    st = ingest.state(data.DATASET, path_data, offline=True)
+    st['tables']['poutcome_y'] = st['tables']['poutcome_y'] + 1
+    ingest._save(st, path_data)
+    diverging = ingest.check(data.DATASET, path_data, offline=True)
+    assert diverging == ['poutcome_y']
+    assert cli.main(['ingest', '--check', '--data', path_data,
+                     '--offline']) == 1
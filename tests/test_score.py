@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+
+from bank import score
+
+
+@pytest.fixture(scope='module')
+def model(df):
+    return score.fit(df, holdout=0.2)
+
+
+def test_encode(df, model):
+    codes = dict(zip(model['features'], score.encode(model, df)))
+    np.testing.assert_array_equal(codes['job'], df['job'].cat.codes)
+    edges = model['edges']['balance']
+    np.testing.assert_array_equal(codes['balance'],
+                                  np.digitize(df['balance'], edges))
+
+    # Texto, valores não vistos no treino e nulos recebem o código -1, cuja
+    # contribuição é nula
+    chunk = df.head(3).copy()
+    chunk['job'] = ['student', 'astronaut', None]
+    chunk['balance'] = chunk['balance'].astype(float)
+    chunk.loc[chunk.index[2], 'balance'] = np.nan
+    codes = dict(zip(model['features'], score.encode(model, chunk)))
+    assert list(codes['job']) == [df['job'].cat.categories.get_loc('student'),
+                                  -1, -1]
+    assert codes['balance'][2] == -1
+    for table in model['tables']:
+        assert table[-1] == 0
+
+
+def test_model_ranks_holdout(df, model):
+    test = np.random.RandomState(0).random_sample(len(df)) < 0.2
+    y = (df['y'] == 'yes').values
+    auc = roc_auc_score(y[test], score.predict(model, df[test]))
+    assert auc == pytest.approx(model['auc'])
+    assert auc > 0.65
+
+
+def test_saved_model_scores_file_in_order(df, model, path_sample,
+                                          tmp_path):
+    filename = score.save(model, str(tmp_path / 'model.npz'))
+    loaded = score.load(filename)
+    expected = score.predict(model, df)
+    np.testing.assert_array_equal(score.predict(loaded, df), expected)
+
+    # Faixas pequenas do CSV, pontuadas em dois processos
+    result = np.concatenate(list(score.score(loaded, path_sample, jobs=2,
+                                             size=50000)))
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import json
+import asyncio
+
+import pytest
+
+from desafio import server
+
+
+@pytest.fixture
+def state(path_data):
+    st = server.warm(path_data, offline=True)
+    yield st
+    st['executor'].shutdown()
+
+
+@pytest.fixture
+def get(state):
+    # Requisições no mesmo *loop*, como no servidor
+    loop = asyncio.new_event_loop()
+
+    def request(target):
+        status, ctype, body = loop.run_until_complete(
+            server.respond(state, target))
+        return status, ctype, json.loads(body.decode())
+    yield request
+    loop.close()
+
+
+def test_health_and_questions(df, get):
+    assert get('/health') == (200, server.JSON, {'status': 'ok',
+                                                 'rows': len(df)})
+    status, _, result = get('/questions/4')
+    assert status == 200
+    assert sum(result['success_yn'].values()) == pytest.approx(100)
+
+
+@pytest.mark.parametrize('target, status', [
+    ('/questions/9', 404),
+    ('/questions/x', 404),
+    ('/charts/q0.png', 404),
+    ('/nothing', 404),
+    ('/chisquare?targets=y,lon', 400),
+    ('/chisquare?correction=sidak', 400),
+    ('/ecdf?column=job', 400),
+    ('/ecdf?by=balance', 400),
+    ('/ecdf?q=1.5', 400),
+    ('/ecdf?at=a', 400),
+])
+def test_invalid_requests(get, state, target, status):
+    code, ctype, body = get(target)
+    assert (code, ctype) == (status, server.JSON)
+    assert 'error' in body
+    # Os erros não são memorizados
+    assert target not in state['cache']
+
+
+def test_ecdf_matches_rows(df, get):
+    status, _, rows = get('/ecdf?column=balance&by=default&at=0&q=0.5')
+    assert status == 200
+    for row in rows:
+        values = df['balance'][df['default'] == row['default']]
+        assert row['count'] == len(values)
+        assert row['below_0'] == pytest.approx((values < 0).mean())
+        assert row['q_0.5'] == pytest.approx(values.median())
+
+
+def test_cache_is_lru(get, state, monkeypatch):
+    monkeypatch.setattr(server, 'CACHE_SIZE', 2)
+    for target in ('/health', '/questions', '/questions/1'):
+        get(target)
+    assert list(state['cache']) == ['/questions', '/questions/1']
+
+    # Uma requisição repetida é respondida da memória e volta ao final
+    future = state['cache']['/questions']
+    get('/questions')
+    assert state['cache']['/questions'] is future
+    get('/health')
+    assert list(state['cache']) == ['/questions', '/health']
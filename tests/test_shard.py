@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bank import shard
+from bank import sketch
+from bank import stream
+
+
+def _assert_tables_equal(result, expected):
+    assert list(result) == list(expected)
+    for name, table in expected.items():
+        if isinstance(table, dict):
+            for level, summary in table.items():
+                assert result[name][level]['n'] == summary['n']
+                assert result[name][level]['sum'] == summary['sum']
+                pd.testing.assert_series_equal(
+                    result[name][level]['bins'].sort_index(),
+                    summary['bins'].sort_index(), check_index_type=False)
+        else:
+            pd.testing.assert_series_equal(result[name].sort_index(),
+                                           table.sort_index())
+
+
+def test_partials_reduce_to_whole(df, types, tmp_path):
+    filenames = shard.split(df, str(tmp_path / 'shards'))
+    assert len(filenames) == df['month'].nunique()
+
+    sketches = sketch.SKETCHES
+    expected = stream.aggregate([df], sketches=sketches)
+    _assert_tables_equal(shard.run(filenames, types, 1, sketches, 1000),
+                         expected)
+
+    # Resultados parciais salvos e somados por outro processo
+    path = tmp_path / 'partials'
+    path.mkdir()
+    for filename in filenames:
+        name = os.path.basename(filename) + shard.PARTIAL
+        shard.save(shard.partial(filename, types, sketches),
+                   str(path / name))
+    _assert_tables_equal(shard.reduce(shard.partials(str(path))), expected)
+
+
+def test_approximate_tables_count_bins(df):
+    result = stream.aggregate([df], sketches=sketch.SKETCHES)
+    assert 'balance_default' not in result and 'age_housing' not in result
+    table = result['balance_default' + stream.BINS]
+    width = sketch.WIDTH['balance']
+    for level in ('yes', 'no'):
+        bins = sketch.bins(df['balance'][df['default'] == level], width)
+        counts = table.xs(level, level='default')
+        pd.testing.assert_series_equal(counts[counts > 0], bins,
+                                       check_names=False,
+                                       check_index_type=False)
+
+
+def test_parallel_run_is_deterministic(df, types, tmp_path):
+    filenames = shard.split(df, str(tmp_path / 'shards'))
+    serial = shard.run(filenames, types, 1, sketch.SKETCHES)
+    parallel = shard.run(filenames, types, 3, sketch.SKETCHES)
+    for name in sketch.SKETCHES:
+        for level, summary in serial[name].items():
+            for h, items in enumerate(summary['kll']['levels']):
+                np.testing.assert_array_equal(
+                    parallel[name][level]['kll']['levels'][h], items)
+
+
+def test_partial_round_trip(df, tmp_path):
+    result = stream.aggregate([df], sketches=sketch.SKETCHES)
+    filename = str(tmp_path / ('all' + shard.PARTIAL))
+    shard.save(result, filename)
+    loaded = shard.load(filename)
+    _assert_tables_equal(loaded, result)
+    for name in sketch.SKETCHES:
+        for level, summary in result[name].items():
+            kll = loaded[name][level]['kll']
+            assert kll['offsets'] == summary['kll']['offsets']
+            for h, items in enumerate(summary['kll']['levels']):
+                np.testing.assert_array_equal(kll['levels'][h], items)
+
+
+def test_partials_reject_other_files(tmp_path):
+    path = tmp_path / 'partials'
+    path.mkdir()
+    (path / ('x' + shard.PARTIAL)).write_bytes(b'not a partial')
+    with pytest.raises(ValueError):
+        shard.partials(str(path))
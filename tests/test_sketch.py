@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from bank import sketch
+
+
+def _rank_error(summary, values, q):
+    # Erro do posto do quantil aproximado, em fração das linhas
+    x = sketch.quantile(summary['kll'], q)
+    lo = np.searchsorted(values, x, side='left') / values.size
+    hi = np.searchsorted(values, x, side='right') / values.size
+    return max(0.0, lo - q, q - hi)
+
+
+def _weight(kll):
+    return sum(level.size * 2 ** h for h, level in enumerate(kll['levels']))
+
+
+def test_small_sketch_is_exact():
+    values = np.array([5, 1, 4, 2, 3, 3])
+    summary = sketch.summarize(values, width=2)
+    assert sketch.quantile(summary['kll'], 0.5) == 3
+    assert sketch.cdf(summary['kll'], 3) == pytest.approx(4 / 6)
+    assert sketch.cdf(summary['kll'], 3, strict=True) == pytest.approx(2 / 6)
+    assert sketch.mean(summary) == pytest.approx(values.mean())
+
+
+def test_histogram_matches_numpy():
+    values = np.random.RandomState(0).randint(-1000, 5000, size=10000)
+    summary = sketch.summarize(values, width=500)
+    result = sketch.histogram(summary)
+    counts, _ = np.histogram(values, bins=result['edges'])
+    np.testing.assert_array_equal(result['counts'], counts)
+
+
+def test_merge_equals_whole(df):
+    chunks = [df.iloc[i:i + 500] for i in range(0, len(df), 500)]
+    merged = None
+    for chunk in chunks:
+        merged = sketch.merge_groups(
+            merged, sketch.group(chunk, 'balance', 'default'))
+    whole = sketch.group(df, 'balance', 'default')
+
+    assert list(merged) == list(whole)
+    for level, summary in merged.items():
+        values = np.sort(df['balance'][df['default'] == level].values)
+        assert summary['n'] == whole[level]['n'] == values.size
+        assert summary['sum'] == whole[level]['sum']
+        pd.testing.assert_series_equal(summary['bins'].sort_index(),
+                                       whole[level]['bins'].sort_index())
+        # A compactação preserva o peso total e o erro do posto é da ordem
+        # de 1%
+        assert _weight(summary['kll']) == values.size
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            assert _rank_error(summary, values, q) < 0.02
+
+
+def test_merge_is_symmetric():
+    rng = np.random.RandomState(1)
+    a = sketch.summarize(rng.normal(size=3000), width=1)
+    b = sketch.summarize(rng.normal(size=5000), width=1)
+    ab = sketch.merge(a, b)['kll']
+    ba = sketch.merge(b, a)['kll']
+    assert ab['offsets'] == ba['offsets']
+    for q in (0.1, 0.5, 0.9):
+        assert sketch.quantile(ab, q) == sketch.quantile(ba, q)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bank import subgroup
+
+
+ATTRIBUTES = ('marital', 'education', 'housing', 'loan', 'contact',
+              'poutcome')
+
+
+def _exhaustive(df, depth, min_size, a, direction):
+    # Qualidade de todas as conjunções, com máscaras do Pandas
+    y = (df['y'] == 'yes').values
+    total, positives = len(df), int(y.sum())
+    conditions = [(col, level) for col in ATTRIBUTES
+                  for level in df[col].cat.categories]
+    result = []
+    for size in range(1, depth + 1):
+        for combo in itertools.combinations(conditions, size):
+            if len({col for col, _ in combo}) < size:
+                continue
+            mask = np.logical_and.reduce([(df[col] == level).values
+                                          for col, level in combo])
+            n = int(mask.sum())
+            if n < min_size:
+                continue
+            q = subgroup.quality(n, int(y[mask].sum()), total, positives, a)
+            result.append(subgroup._score(q, direction))
+    return sorted(result, reverse=True)
+
+
+@pytest.mark.parametrize('a, direction', [(1.0, 'both'), (0.5, 'up'),
+                                          (1.0, 'down')])
+def test_pruned_search_finds_exhaustive_top(df, a, direction):
+    result = subgroup.search(df, attributes=ATTRIBUTES, depth=3, top=15,
+                             a=a, direction=direction)
+    expected = _exhaustive(df, 3, int(0.01 * len(df)), a, direction)[:15]
+    scores = [subgroup._score(q, direction) for q in result['quality']]
+    np.testing.assert_allclose(scores, expected)
+
+
+def test_optimistic_bounds_refinements(df):
+    y = (df['y'] == 'yes').values
+    total, positives = len(df), int(y.sum())
+    mask = (df['housing'] == 'no').values
+    n, pos = int(mask.sum()), int(y[mask].sum())
+    bound = subgroup.optimistic(n, pos, total, positives)
+    for col in ('job', 'month', 'contact'):
+        for level in df[col].cat.categories:
+            refined = mask & (df[col] == level).values
+            q = subgroup.quality(int(refined.sum()), int(y[refined].sum()),
+                                 total, positives)
+            assert abs(q) <= bound
+
+
+def test_parallel_search_equals_serial(df):
+    serial = subgroup.search(df, attributes=ATTRIBUTES, depth=2, jobs=1)
+    parallel = subgroup.search(df, attributes=ATTRIBUTES, depth=2, jobs=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+@pytest.mark.parametrize('a', [-0.5, 1.5])
+def test_search_rejects_exponent_outside_unit_interval(df, a):
+    with pytest.raises(ValueError):
+        subgroup.search(df, attributes=ATTRIBUTES, a=a)
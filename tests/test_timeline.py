@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from bank import timeline
+
+
+@pytest.fixture(scope='module')
+def calls(df):
+    # A amostra está embaralhada: as linhas são divididas em três anos,
+    # cada um em ordem cronológica
+    parts = []
+    for part in np.array_split(np.arange(len(df)), 3):
+        part = df.iloc[part]
+        month = pd.Categorical(part['month'], categories=timeline.MONTHS)
+        order = np.lexsort((part['day'].values, month.codes))
+        parts.append(part.iloc[order])
+    return pd.concat(parts, ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def index(calls):
+    return timeline.build(calls)
+
+
+@pytest.fixture(scope='module')
+def frame(calls):
+    df = calls
+    # Colunas do índice como um DataFrame, para as consultas com máscaras
+    return pd.DataFrame({
+        'date': timeline.dates(df),
+        'pdays': df['pdays'].values,
+        'positives': (df['y'] == 'yes').values.astype(np.int64),
+        'campaign': df['campaign'].values.astype(np.int64),
+        'duration': df['duration'].values.astype(np.int64),
+    })
+
+
+def test_dates_reject_shuffled_rows(df):
+    with pytest.raises(ValueError):
+        timeline.dates(df)
+    assert len(timeline.dates(df, start=None)) == len(df)
+
+
+def test_dates_advance_the_year_on_wrap():
+    df = pd.DataFrame({'month': ['dec', 'dec', 'jan', 'may', 'feb'],
+                       'day': [30, 31, 2, 5, 1]})
+    expected = ['2008-12-30', '2008-12-31', '2009-01-02', '2009-05-05',
+                '2010-02-01']
+    np.testing.assert_array_equal(timeline.dates(df),
+                                  np.array(expected, dtype='datetime64[D]'))
+
+
+@pytest.mark.parametrize('lo, hi', [(None, None), ('2008-06-01', None),
+                                    (None, '2009-03-15'),
+                                    ('2008-07-10', '2010-01-31'),
+                                    ('2009-12-25', '2009-12-24')])
+def test_range_queries_match_masks(index, frame, lo, hi):
+    mask = np.ones(len(frame), dtype=bool)
+    if lo is not None:
+        mask &= frame['date'] >= np.datetime64(lo)
+    if hi is not None:
+        mask &= frame['date'] <= np.datetime64(hi)
+    selected = frame[mask]
+
+    result = timeline.totals(index['dates'], lo, hi)
+    assert result['count'] == len(selected)
+    for name in ('positives', 'campaign', 'duration'):
+        assert result[name] == selected[name].sum()
+    assert sorted(timeline.rows(index['dates'], lo, hi)) == \
+        list(np.flatnonzero(mask))
+
+    daily = timeline.series(index['dates'], lo, hi)
+    expected = selected.groupby('date')[['positives', 'campaign']].sum()
+    np.testing.assert_array_equal(daily.index.values, expected.index.values)
+    np.testing.assert_array_equal(daily['positives'], expected['positives'])
+    np.testing.assert_array_equal(daily['count'],
+                                  selected.groupby('date').size())
+
+
+def test_rolling_matches_masks(index, frame):
+    window = 30
+    result = timeline.rolling(index['dates'], window, '2009-01-01',
+                              '2009-06-30')
+    for day, row in result.iterrows():
+        mask = (frame['date'] > day - np.timedelta64(window, 'D')) & \
+            (frame['date'] <= day)
+        assert row['count'] == mask.sum()
+        assert row['positives'] == frame['positives'][mask].sum()
+
+
+def test_recency_matches_masks(index, frame):
+    result = timeline.recency(index)
+    edges = timeline.RECENCY
+    masks = [frame['pdays'] == -1]
+    masks += [(frame['pdays'] >= a) & (frame['pdays'] < b)
+              for a, b in zip(edges[:-1], edges[1:])]
+    assert list(result['count']) == [int(m.sum()) for m in masks]
+    assert list(result['positives']) == \
+        [int(frame['positives'][m].sum()) for m in masks]